@@ -84,6 +84,7 @@ Application options
   -a, --action=ACTION                    Specify action
   -p, --options=OPTIONS_STRING           Specify options
   -d, --debug=LOGGER_NAME                Enable debug logs
+  --profile-db                           Log the statistics of the database queries
   -l [FAMILY_TREE_PATTERN...]            List Family Trees
   -L [FAMILY_TREE_PATTERN...]            List Family Trees in Detail
   -t [FAMILY_TREE_PATTERN...]            List Family Trees, tab delimited
@@ -174,6 +175,7 @@ class ArgParser:
     -a, --action=ACTION             Specify action
     -p, --options=OPTIONS_STRING    Specify options
     -d, --debug=LOGGER_NAME         Enable debug logs
+    --profile-db                    Log the statistics of the database queries
     -l [FAMILY_TREE...]             List Family Trees
     -L [FAMILY_TREE...]             List Family Trees in Detail
     -t [FAMILY_TREE...]             List Family Trees, tab delimited
@@ -347,6 +349,10 @@ class ArgParser:
                 logger = logging.getLogger(value)
                 logger.setLevel(logging.DEBUG)
                 cleandbg += [opt_ix]
+            elif option in ["--profile-db"]:
+                # Databases record their queries while this logger is enabled
+                logging.getLogger(".querystats").setLevel(logging.INFO)
+                cleandbg += [opt_ix]
             elif option in ["-l"]:
                 self.list = True
             elif option in ["-L"]:
@@ -21,6 +21,7 @@
 
 """ Unittest for argparser.py """
 
+import logging
 import unittest
 from unittest.mock import Mock
 from ..argparser import ArgParser
@@ -72,6 +73,13 @@ class TestArgParser(unittest.TestCase):
         assert not bad, ap.errors
         assert ap.quiet
 
+    def test_profile_db_enables_query_stats(self):
+        logger = logging.getLogger(".querystats")
+        self.addCleanup(logger.setLevel, logger.level)
+        bad, ap = self.triggers_option_error("--profile-db")
+        assert not bad, ap.errors
+        assert logger.isEnabledFor(logging.INFO)
+
     def test_quiet_exists_by_default(self):
         ap = self.create_parser()
         assert hasattr(ap, "quiet")
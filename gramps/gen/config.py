@@ -195,11 +195,17 @@ register("csv.dialect", "excel")
 register("csv.delimiter", ",")
 
 register("database.backend", "sqlite")
+register("database.blob-codec", "pickle")  # codec of the data of new trees
 register("database.compress-backup", True)
 register("database.backup-path", USER_HOME)
 register("database.backup-on-exit", True)
+register("database.cache-size", 32)  # MiB of object data, 0 to disable
+register("database.slow-query-time", 0.0)  # seconds, 0 to disable
+register("database.undo-entries", 1000)  # transactions, 0 for no limit
+register("database.undo-size", 100)  # MiB of undo records, 0 for no limit
 register("database.autobackup", 0)
 register("database.path", os.path.join(USER_DATA, "grampsdb"))
+register("database.filter-processes", 1)  # workers of the command line
 register("database.host", "")
 register("database.port", "")
 
@@ -330,6 +330,7 @@ LONGOPTS = [
     "password=",
     "create=",
     "options=",
+    "profile-db",
     "safe",
     "screen=",
     "show",
@@ -1435,12 +1435,91 @@ class DbReadBase:
         """
         raise NotImplementedError
 
+    def read_snapshot(self):
+        """
+        Return a context manager giving the current thread a consistent,
+        read-only view of the database.
+        """
+        raise NotImplementedError
+
     def requires_login(self):
         """
         Returns True for backends that require a login dialog, else False.
         """
         return False
 
+    def get_ancestor_handles(self, handle, generations=None, main_family=False):
+        """
+        Return the set of the handles of the ancestors of a person, not more
+        than generations generations away, following only the main family
+        of each person if main_family is True.  Returns None if the
+        database cannot answer without reading the people and families.
+        """
+        return None
+
+    def get_descendant_handles(self, handle, generations=None):
+        """
+        Return the set of the handles of the descendants of a person, not
+        more than generations generations away, or None if the database
+        cannot answer without reading the people and families.
+        """
+        return None
+
+    def get_common_ancestor_handles(self, handle1, handle2):
+        """
+        Return the set of the handles of the people who are ancestors of
+        both people, or one of them and an ancestor of the other, or None
+        if the database cannot answer without reading the people and
+        families.
+        """
+        return None
+
+    def get_text_search(self, class_name, text):
+        """
+        Return an SQL condition, as a (where, args) tuple for
+        :meth:`select_handles`, selecting at least the objects of the given
+        class whose text data contains text ignoring case, or None if the
+        database has no text index.
+        """
+        return None
+
+    def select_handles(self, class_name, where=None, args=None):
+        """
+        Return the handles of the objects of the given class matching an
+        SQL condition on the columns of their table, or None if the database
+        cannot evaluate SQL.
+        """
+        return None
+
+    def get_reference_closure(self, handles, include_start=True, backlinks=None):
+        """
+        Return the handles of the objects reached from some objects by
+        following their references, and the references of the objects
+        reached, as a dictionary of sets of handles by class name, or None
+        if the database cannot find them without reading the objects.
+
+        :param handles: (class_name, handle) pairs of the objects to start
+                        from.
+        :type handles: iterable
+        :param include_start: if False, the objects to start from are only
+                              included if they are reached from another.
+        :type include_start: bool
+        :param backlinks: class names of the objects referring to the
+                          objects of a class which are followed as well,
+                          by class name.
+        :type backlinks: dict
+        """
+        return None
+
+    def get_place_hierarchy(self, handle):
+        """
+        Return a tuple of a place and of the places enclosing it, following
+        the first enclosing place of each place while that reference is
+        undated, or None if the database does not cache the hierarchy.
+        The places are shared and must not be changed.
+        """
+        return None
+
     def method(self, fmt, *args):
         """
         Convenience function to return database methods.
@@ -1607,6 +1686,13 @@ class DbWriteBase(DbReadBase):
         """
         raise NotImplementedError
 
+    def commit_many(self, objects, transaction, change_time=None):
+        """
+        Commit a sequence of primary objects, of any type, to the database,
+        storing the changes as part of the transaction.
+        """
+        raise NotImplementedError
+
     def commit_note(self, note, transaction, change_time=None):
         """
         Commit the specified Note to the database, storing the changes as part
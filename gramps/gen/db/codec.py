@@ -0,0 +1,334 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2024       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Codecs for the serialized data stored in the blob_data column.
+
+Two codecs are available:
+
+pickle
+    The historical format, ``pickle.dumps(obj.serialize())``.
+compact
+    A versioned, tagged binary format for the nested tuples and lists
+    produced by ``serialize()``.  Lowercase hex handles are packed into
+    bytes, ``GrampsType`` pairs with an empty custom string are stored as
+    a single type code, small integers take a single byte and repeated
+    strings within one object are stored as back references.
+
+Compact blobs start with a marker byte that never starts a pickle, so
+:func:`decode` accepts either format and a tree can be converted from
+one codec to the other a row at a time.
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard python modules
+#
+# -------------------------------------------------------------------------
+import pickle
+import re
+from struct import Struct
+
+# -------------------------------------------------------------------------
+#
+# Gramps modules
+#
+# -------------------------------------------------------------------------
+from .dbconst import (
+    PERSON_KEY,
+    FAMILY_KEY,
+    EVENT_KEY,
+    MEDIA_KEY,
+    PLACE_KEY,
+    REPOSITORY_KEY,
+    CITATION_KEY,
+    SOURCE_KEY,
+    NOTE_KEY,
+    TAG_KEY,
+)
+
+# -------------------------------------------------------------------------
+#
+# Constants
+#
+# -------------------------------------------------------------------------
+CODECS = ("pickle", "compact")
+DEFAULT_CODEC = "pickle"
+
+MAGIC = 0xC7
+VERSION = 1
+
+_NONE = 0x00
+_FALSE = 0x01
+_TRUE = 0x02
+_INT = 0x03
+_FLOAT = 0x04
+_STR = 0x05
+_EMPTY = 0x06
+_HANDLE = 0x07
+_REF = 0x08
+_TYPE = 0x09
+_TUPLE = 0x0A
+_LIST = 0x0B
+_SMALL = 0x10
+_SMALL_MAX = 0xFF - _SMALL
+
+_HEADER = bytes((MAGIC, VERSION))
+_DOUBLE = Struct("<d")
+_is_hex = re.compile(r"(?:[0-9a-f]{2})+\Z").match
+
+
+class CodecError(Exception):
+    """
+    Raised when a blob cannot be encoded or decoded.
+    """
+
+
+# -------------------------------------------------------------------------
+#
+# Encoding
+#
+# -------------------------------------------------------------------------
+def _varint(value, out):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _encode(value, out, strings):
+    kind = type(value)
+    if kind is str:
+        if not value:
+            out.append(_EMPTY)
+            return
+        index = strings.get(value)
+        if index is not None:
+            out.append(_REF)
+            _varint(index, out)
+            return
+        strings[value] = len(strings)
+        if _is_hex(value):
+            data = bytes.fromhex(value)
+            out.append(_HANDLE)
+        else:
+            data = value.encode("utf-8")
+            out.append(_STR)
+        _varint(len(data), out)
+        out += data
+    elif kind is int:
+        if 0 <= value <= _SMALL_MAX:
+            out.append(_SMALL + value)
+        else:
+            out.append(_INT)
+            _varint((-value << 1) - 1 if value < 0 else value << 1, out)
+    elif kind is tuple:
+        if (
+            len(value) == 2
+            and value[1] == ""
+            and type(value[0]) is int
+            and value[0] >= 0
+        ):
+            out.append(_TYPE)
+            _varint(value[0], out)
+            return
+        out.append(_TUPLE)
+        _varint(len(value), out)
+        for item in value:
+            _encode(item, out, strings)
+    elif kind is list:
+        out.append(_LIST)
+        _varint(len(value), out)
+        for item in value:
+            _encode(item, out, strings)
+    elif value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif kind is float:
+        out.append(_FLOAT)
+        out += _DOUBLE.pack(value)
+    else:
+        raise CodecError("cannot encode %s" % kind.__name__)
+
+
+def encode_compact(data):
+    """
+    Encode serialized object data in the compact format.
+    """
+    out = bytearray(_HEADER)
+    _encode(data, out, {})
+    return bytes(out)
+
+
+def encode_pickle(data):
+    """
+    Encode serialized object data with pickle.
+    """
+    return pickle.dumps(data)
+
+
+ENCODERS = {"pickle": encode_pickle, "compact": encode_compact}
+
+
+def get_encoder(codec):
+    """
+    Return the encode function for the named codec.
+    """
+    try:
+        return ENCODERS[codec]
+    except KeyError:
+        raise ValueError("unknown blob codec: %r" % codec) from None
+
+
+# -------------------------------------------------------------------------
+#
+# Decoding
+#
+# -------------------------------------------------------------------------
+def _decode(buf, pos, strings):
+    tag = buf[pos]
+    pos += 1
+    if tag >= _SMALL:
+        return tag - _SMALL, pos
+    if tag == _TUPLE or tag == _LIST:
+        count = buf[pos]
+        pos += 1
+        if count & 0x80:
+            count, pos = _read_varint(buf, pos, count)
+        items = []
+        append = items.append
+        for _index in range(count):
+            # Leaves that need no further reading are inlined, which
+            # saves a call for most items.
+            item = buf[pos]
+            if item >= _SMALL:
+                append(item - _SMALL)
+                pos += 1
+            elif item == _EMPTY:
+                append("")
+                pos += 1
+            elif item == _FALSE:
+                append(False)
+                pos += 1
+            else:
+                item, pos = _decode(buf, pos, strings)
+                append(item)
+        return (tuple(items) if tag == _TUPLE else items), pos
+    if tag == _STR or tag == _HANDLE:
+        size = buf[pos]
+        pos += 1
+        if size & 0x80:
+            size, pos = _read_varint(buf, pos, size)
+        end = pos + size
+        if tag == _STR:
+            value = buf[pos:end].decode("utf-8")
+        else:
+            value = buf[pos:end].hex()
+        strings.append(value)
+        return value, end
+    if tag == _EMPTY:
+        return "", pos
+    if tag == _TYPE:
+        value = buf[pos]
+        pos += 1
+        if value & 0x80:
+            value, pos = _read_varint(buf, pos, value)
+        return (value, ""), pos
+    if tag == _REF:
+        index = buf[pos]
+        pos += 1
+        if index & 0x80:
+            index, pos = _read_varint(buf, pos, index)
+        return strings[index], pos
+    if tag == _NONE:
+        return None, pos
+    if tag == _FALSE:
+        return False, pos
+    if tag == _TRUE:
+        return True, pos
+    if tag == _INT:
+        value, pos = _read_varint(buf, pos + 1, buf[pos])
+        return (value >> 1) ^ -(value & 1), pos
+    if tag == _FLOAT:
+        return _DOUBLE.unpack_from(buf, pos)[0], pos + 8
+    raise CodecError("unknown tag 0x%02x at offset %d" % (tag, pos - 1))
+
+
+def _read_varint(buf, pos, first):
+    value = first & 0x7F
+    shift = 7
+    while first & 0x80:
+        first = buf[pos]
+        pos += 1
+        value |= (first & 0x7F) << shift
+        shift += 7
+    return value, pos
+
+
+def decode(blob):
+    """
+    Decode a blob written by any of the codecs.
+    """
+    if blob[0] != MAGIC:
+        return pickle.loads(blob)
+    if blob[1] != VERSION:
+        raise CodecError("unsupported compact blob version %d" % blob[1])
+    return _decode(blob, 2, [])[0]
+
+
+def get_codec(blob):
+    """
+    Return the name of the codec that wrote a blob.
+    """
+    return "compact" if blob[0] == MAGIC else "pickle"
+
+
+def convert_blob_codec(db, codec):
+    """
+    Rewrite the data of every primary object with the given blob codec.
+
+    Each blob records the codec that wrote it, so a tree whose conversion
+    was interrupted stays readable, and converting again completes it.
+    """
+    keys = (
+        PERSON_KEY,
+        FAMILY_KEY,
+        EVENT_KEY,
+        MEDIA_KEY,
+        PLACE_KEY,
+        REPOSITORY_KEY,
+        CITATION_KEY,
+        SOURCE_KEY,
+        NOTE_KEY,
+        TAG_KEY,
+    )
+    handles = {key: list(db._iter_handles(key)) for key in keys}
+    db.set_total(sum(len(handle_list) for handle_list in handles.values()))
+    db._txn_begin()
+    for key in keys:
+        for handle in handles[key]:
+            db._commit_raw(db._get_raw_data(key, handle), key)
+            db.update()
+    db._txn_commit()
+    # Separate transaction to save metadata.
+    db._set_metadata("blob-codec", codec)
@@ -0,0 +1,129 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Bounded cache of the serialized data of the objects of a database.
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard python modules
+#
+# -------------------------------------------------------------------------
+import pickle
+import threading
+from collections import OrderedDict
+
+
+# -------------------------------------------------------------------------
+#
+# DataCache
+#
+# -------------------------------------------------------------------------
+class DataCache:
+    """
+    A least recently used cache of the serialized data of objects, keyed by
+    table and handle, and bounded by the size of the data.
+
+    The data is kept pickled, so that every read returns a new copy which
+    the caller may change freely.  The database discards the data of the
+    objects it writes, and clears the cache when a transaction is aborted.
+    """
+
+    def __init__(self, max_size):
+        """
+        Create a new cache.
+
+        :param max_size: maximum size of the cached data in bytes, 0 to
+                         disable the cache.
+        :type max_size: int
+        """
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.__data = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, obj_key, handle):
+        """
+        Return a copy of the cached data of an object, or None.
+        """
+        key = (obj_key, handle)
+        with self.__lock:
+            blob = self.__data.get(key)
+            if blob is None:
+                self.misses += 1
+                return None
+            self.__data.move_to_end(key)
+            self.hits += 1
+        return pickle.loads(blob)
+
+    def put(self, obj_key, handle, data):
+        """
+        Store the data of an object, dropping the least recently used
+        objects to keep within the maximum size.
+        """
+        if not self.max_size:
+            return
+        blob = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_size:
+            return
+        key = (obj_key, handle)
+        with self.__lock:
+            old_blob = self.__data.pop(key, None)
+            if old_blob is not None:
+                self.size -= len(old_blob)
+            self.__data[key] = blob
+            self.size += len(blob)
+            while self.size > self.max_size:
+                old_blob = self.__data.popitem(last=False)[1]
+                self.size -= len(old_blob)
+
+    def discard(self, obj_key, handle):
+        """
+        Drop the data of an object, if it is cached.
+        """
+        with self.__lock:
+            blob = self.__data.pop((obj_key, handle), None)
+            if blob is not None:
+                self.size -= len(blob)
+
+    def clear(self):
+        """
+        Drop all the cached data.
+        """
+        with self.__lock:
+            self.__data.clear()
+            self.size = 0
+
+    def get_stats(self):
+        """
+        Return a dictionary of the number of hits and misses, the number of
+        cached objects, and the size and maximum size of the data in bytes.
+        """
+        with self.__lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "objects": len(self.__data),
+                "size": self.size,
+                "max_size": self.max_size,
+            }
@@ -83,6 +83,7 @@ DBLOCKS = 100000  # Maximum number of locks supported
 DBOBJECTS = 100000  # Maximum number of simultaneously locked objects
 DBUNDO = 1000  # Maximum size of undo buffer
 ARRAYSIZE = 1000  # The arraysize for a SQL cursor
+BULKSIZE = 5000  # Number of objects written per chunk by a bulk commit
 
 PERSON_KEY = 0
 FAMILY_KEY = 1
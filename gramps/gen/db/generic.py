@@ -35,6 +35,8 @@ import ast
 import sys
 import datetime
 import glob
+from contextlib import contextmanager
+from itertools import chain
 from pathlib import Path
 
 # ------------------------------------------------------------------------
@@ -72,6 +74,9 @@ from ..errors import HandleError
 from ..utils.callback import Callback
 from ..updatecallback import UpdateCallback
 from .bookmarks import DbBookmarks
+from .datacache import DataCache
+from .querystats import QueryStats, LOG as QUERY_LOG
+from .undostore import UndoStore
 
 from ..utils.id import create_id
 from ..lib.researcher import Researcher
@@ -111,31 +116,44 @@ SIGBASE = (
 )
 
 
+def _id_number_pattern(prefix):
+    """
+    Return a regular expression matching the Gramps IDs in the format of an
+    ID prefix, with the number as its group, or None for unusual formats.
+    """
+    match = re.fullmatch(r"([^%]*)%[0 ]?\d*[diu]([^%]*)", prefix)
+    if match is None:
+        return None
+    return re.compile(
+        re.escape(match.group(1)) + r"\s*(\d+)" + re.escape(match.group(2))
+    )
+
+
 class DbGenericUndo(DbUndo):
     def __init__(self, grampsdb, path):
         super(DbGenericUndo, self).__init__(grampsdb)
-        self.undodb = []
+        self.undodb = UndoStore()
 
     def open(self, value=None):
         """
         Open the backing storage.  Needs to be overridden in the derived
         class.
         """
-        pass
+        self.undodb.open()
 
     def close(self):
         """
         Close the backing storage.  Needs to be overridden in the derived
         class.
         """
-        pass
+        self.clear()
+        self.undodb.close()
 
     def append(self, value):
         """
-        Add a new entry on the end.  Needs to be overridden in the derived
-        class.
+        Add a new entry on the end, and return its record number.
         """
-        self.undodb.append(value)
+        return self.undodb.append(value)
 
     def __getitem__(self, index):
         """
@@ -157,6 +175,31 @@ class DbGenericUndo(DbUndo):
         """
         return len(self.undodb)
 
+    def _after_commit(self, transaction):
+        """
+        Drop the oldest transactions beyond the limits on the number of
+        transactions and on the size of the undo log.  The last transaction
+        is always kept.
+        """
+        max_entries = config.get("database.undo-entries")
+        max_size = config.get("database.undo-size") << 20
+        while len(self.undoq) > 1 and (
+            (max_entries and len(self.undoq) > max_entries)
+            or (max_size and self.undodb.size > max_size)
+        ):
+            self.undoq.popleft()
+            self.__discard_records()
+
+    def __discard_records(self):
+        """
+        Drop the records older than those of the remaining transactions,
+        including those of aborted transactions.
+        """
+        firsts = [
+            txn.first for txn in chain(self.undoq, self.redoq) if txn.first is not None
+        ]
+        self.undodb.discard_before(min(firsts, default=self.undodb.get_next()))
+
     def _redo(self, update_history):
         """
         Access the last undone transaction, and revert the data to the state
@@ -181,6 +224,7 @@ class DbGenericUndo(DbUndo):
                 if key == REFERENCE_KEY:
                     self.db.undo_reference(new_data, handle)
                 else:
+                    self.db._discard_cached_data(key, handle)
                     self.db.undo_data(new_data, handle, key)
                     sigs[key][trans_type].append(handle)
             # now emit the signals
@@ -230,6 +274,7 @@ class DbGenericUndo(DbUndo):
                 if key == REFERENCE_KEY:
                     self.db.undo_reference(old_data, handle)
                 else:
+                    self.db._discard_cached_data(key, handle)
                     self.db.undo_data(old_data, handle, key)
                     sigs[key][trans_type].append(handle)
             # now emit the signals
@@ -578,6 +623,7 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         self.omap_index = 0
         self.rmap_index = 0
         self.nmap_index = 0
+        self._used_id_numbers = {}
         self.undo_callback = None
         self.redo_callback = None
         self.undo_history_callback = None
@@ -589,6 +635,9 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         self.surname_list = []
         self.genderStats = GenderStats()  # can pass in loaded stats as dict
         self.owner = Researcher()
+        self._data_cache = DataCache(0)
+        self._place_hierarchies = {}
+        self._query_stats = None
         if directory:
             self.load(directory)
 
@@ -643,6 +692,15 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         if not self.readonly and directory != ":memory:":
             write_lock_file(directory)
 
+        self._data_cache = DataCache(config.get("database.cache-size") << 20)
+        self._place_hierarchies = {}
+        self._used_id_numbers = {}
+        slow_time = config.get("database.slow-query-time")
+        if slow_time or QueryStats.is_enabled():
+            self._query_stats = QueryStats(slow_time)
+        else:
+            self._query_stats = None
+
         # run backend-specific code:
         self._initialize(directory, username, password)
 
@@ -809,6 +867,14 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
             except IOError:
                 pass
 
+        if self._query_stats is not None:
+            QUERY_LOG.info(
+                "Queries of %s:\n%s", self._directory, self._query_stats.get_report()
+            )
+        self._clear_cached_data()
+        self._used_id_numbers = {}
+        if self.undodb is not None:
+            self.undodb.close()
         self.db_is_open = False
         self._directory = None
 
@@ -1074,15 +1140,55 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
     #
     ################################################################
 
+    def _get_used_id_numbers(self, prefix, map_index, obj_key):
+        """
+        Return the set of the numbers, from map_index up, of the Gramps IDs
+        of a table in the format of prefix, or None if the format cannot be
+        parsed.
+
+        The numbers are read once per table and prefix.  They are read again
+        if map_index goes back, as when the user resets the next ID.
+        """
+        entry = self._used_id_numbers.get((obj_key, prefix))
+        if entry is None or map_index < entry[0]:
+            pattern = _id_number_pattern(prefix)
+            if pattern is None:
+                return None
+            used = set()
+            for gramps_id in self._get_gramps_ids(obj_key):
+                match = pattern.fullmatch(gramps_id or "")
+                if match:
+                    number = int(match.group(1))
+                    if number >= map_index and prefix % number == gramps_id:
+                        used.add(number)
+            entry = self._used_id_numbers[(obj_key, prefix)] = [map_index, used]
+        return entry[1]
+
     def _find_next_gramps_id(self, prefix, map_index, obj_key):
         """
         Helper function for find_next_<object>_gramps_id methods
+
+        The numbers in use above map_index are skipped in memory, so that
+        only the ID returned is looked up in the table; it may have been
+        given to an object since the numbers were read.
         """
-        index = prefix % map_index
-        while self._has_gramps_id(obj_key, index):
+        used = self._get_used_id_numbers(prefix, map_index, obj_key)
+        if used is None:
+            index = prefix % map_index
+            while self._has_gramps_id(obj_key, index):
+                map_index += 1
+                index = prefix % map_index
             map_index += 1
+            return (map_index, index)
+        while True:
+            while map_index in used:
+                used.discard(map_index)
+                map_index += 1
             index = prefix % map_index
-        map_index += 1
+            map_index += 1
+            if not self._has_gramps_id(obj_key, index):
+                break
+        self._used_id_numbers[(obj_key, prefix)][0] = map_index
         return (map_index, index)
 
     def find_next_person_gramps_id(self):
@@ -1334,9 +1440,9 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
             raise HandleError("Handle is None")
         if not handle:
             raise HandleError("Handle is empty")
-        data = self._get_raw_data(obj_key, handle)
+        data = self._get_cached_raw_data(obj_key, handle)
         if data:
-            return obj_class.create(data)
+            return self._create(obj_class, data)
         else:
             raise HandleError("Handle %s not found" % handle)
 
@@ -1378,39 +1484,39 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
 
     def get_person_from_gramps_id(self, gramps_id):
         data = self._get_raw_person_from_id_data(gramps_id)
-        return Person.create(data)
+        return self._create(Person, data)
 
     def get_family_from_gramps_id(self, gramps_id):
         data = self._get_raw_family_from_id_data(gramps_id)
-        return Family.create(data)
+        return self._create(Family, data)
 
     def get_citation_from_gramps_id(self, gramps_id):
         data = self._get_raw_citation_from_id_data(gramps_id)
-        return Citation.create(data)
+        return self._create(Citation, data)
 
     def get_source_from_gramps_id(self, gramps_id):
         data = self._get_raw_source_from_id_data(gramps_id)
-        return Source.create(data)
+        return self._create(Source, data)
 
     def get_event_from_gramps_id(self, gramps_id):
         data = self._get_raw_event_from_id_data(gramps_id)
-        return Event.create(data)
+        return self._create(Event, data)
 
     def get_media_from_gramps_id(self, gramps_id):
         data = self._get_raw_media_from_id_data(gramps_id)
-        return Media.create(data)
+        return self._create(Media, data)
 
     def get_place_from_gramps_id(self, gramps_id):
         data = self._get_raw_place_from_id_data(gramps_id)
-        return Place.create(data)
+        return self._create(Place, data)
 
     def get_repository_from_gramps_id(self, gramps_id):
         data = self._get_raw_repository_from_id_data(gramps_id)
-        return Repository.create(data)
+        return self._create(Repository, data)
 
     def get_note_from_gramps_id(self, gramps_id):
         data = self._get_raw_note_from_id_data(gramps_id)
-        return Note.create(data)
+        return self._create(Note, data)
 
     ################################################################
     #
@@ -1611,7 +1717,7 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         """
         cursor = self._get_table_func(class_.__name__, "cursor_func")
         for data in cursor():
-            yield class_.create(data[1])
+            yield self._create(class_, data[1])
 
     def iter_people(self):
         return self._iter_objects(Person)
@@ -1730,35 +1836,139 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         """
         raise NotImplementedError
 
+    def _use_data_cache(self):
+        """
+        Return True if reads may use the data cache.
+        """
+        return self._data_cache.max_size > 0
+
+    def _get_cached_raw_data(self, obj_key, handle):
+        """
+        Return the serialized object from handle, from the data cache if it
+        holds the object.
+        """
+        if not self._use_data_cache():
+            return self._get_raw_data(obj_key, handle)
+        data = self._data_cache.get(obj_key, handle)
+        if data is None:
+            data = self._get_raw_data(obj_key, handle)
+            if data is not None:
+                self._data_cache.put(obj_key, handle, data)
+        return data
+
+    def _discard_cached_data(self, obj_key, handle):
+        """
+        Drop an object about to be written from the data cache.
+        """
+        self._data_cache.discard(obj_key, handle)
+        if obj_key == PLACE_KEY:
+            self._place_hierarchies.clear()
+
+    def _clear_cached_data(self):
+        """
+        Drop all the cached data.
+        """
+        self._data_cache.clear()
+        self._place_hierarchies.clear()
+
+    def get_place_hierarchy(self, handle):
+        """
+        Return a tuple of a place and of the places enclosing it, following
+        the first enclosing place of each place while that reference is
+        undated.  The tuple ends with a place which is not enclosed, whose
+        first enclosing place is dated or missing, or which is enclosed by
+        a place already in the tuple.
+
+        The tuples are cached until a place is written, and the places are
+        shared between them: they must not be changed.
+        """
+        use_cache = self._use_data_cache()
+        if use_cache and handle in self._place_hierarchies:
+            return self._place_hierarchies[handle]
+        places = [self.get_place_from_handle(handle)]
+        handles = {handle}
+        while True:
+            placerefs = places[-1].get_placeref_list()
+            if not placerefs or not placerefs[0].get_date_object().is_empty():
+                break
+            parent = placerefs[0].ref
+            if parent in handles:
+                break
+            hierarchy = self._place_hierarchies.get(parent) if use_cache else None
+            if hierarchy is not None:
+                if handles.isdisjoint(place.handle for place in hierarchy):
+                    places.extend(hierarchy)
+                    break
+            try:
+                places.append(self.get_place_from_handle(parent))
+            except HandleError:
+                break
+            handles.add(parent)
+        hierarchy = tuple(places)
+        if use_cache:
+            self._place_hierarchies[handle] = hierarchy
+        return hierarchy
+
+    def _create(self, obj_class, data):
+        """
+        Create an object from its serialized data, counting it in the query
+        statistics.
+        """
+        if self._query_stats is not None and data:
+            self._query_stats.creates += 1
+        return obj_class.create(data)
+
+    def set_query_stats(self, stats):
+        """
+        Record the statistics of the queries of the open database in a
+        :class:`.QueryStats`, or stop recording them if stats is None.
+        """
+        self._query_stats = stats
+
+    def get_query_stats(self):
+        """
+        Return the :class:`.QueryStats` recording the statistics of the
+        queries, or None.
+        """
+        return self._query_stats
+
+    def get_cache_stats(self):
+        """
+        Return a dictionary of statistics on the data cache: the number of
+        hits and misses, the number of cached objects, and the size and the
+        maximum size of the cached data in bytes.
+        """
+        return self._data_cache.get_stats()
+
     def get_raw_person_data(self, handle):
-        return self._get_raw_data(PERSON_KEY, handle)
+        return self._get_cached_raw_data(PERSON_KEY, handle)
 
     def get_raw_family_data(self, handle):
-        return self._get_raw_data(FAMILY_KEY, handle)
+        return self._get_cached_raw_data(FAMILY_KEY, handle)
 
     def get_raw_source_data(self, handle):
-        return self._get_raw_data(SOURCE_KEY, handle)
+        return self._get_cached_raw_data(SOURCE_KEY, handle)
 
     def get_raw_citation_data(self, handle):
-        return self._get_raw_data(CITATION_KEY, handle)
+        return self._get_cached_raw_data(CITATION_KEY, handle)
 
     def get_raw_event_data(self, handle):
-        return self._get_raw_data(EVENT_KEY, handle)
+        return self._get_cached_raw_data(EVENT_KEY, handle)
 
     def get_raw_media_data(self, handle):
-        return self._get_raw_data(MEDIA_KEY, handle)
+        return self._get_cached_raw_data(MEDIA_KEY, handle)
 
     def get_raw_place_data(self, handle):
-        return self._get_raw_data(PLACE_KEY, handle)
+        return self._get_cached_raw_data(PLACE_KEY, handle)
 
     def get_raw_repository_data(self, handle):
-        return self._get_raw_data(REPOSITORY_KEY, handle)
+        return self._get_cached_raw_data(REPOSITORY_KEY, handle)
 
     def get_raw_note_data(self, handle):
-        return self._get_raw_data(NOTE_KEY, handle)
+        return self._get_cached_raw_data(NOTE_KEY, handle)
 
     def get_raw_tag_data(self, handle):
-        return self._get_raw_data(TAG_KEY, handle)
+        return self._get_cached_raw_data(TAG_KEY, handle)
 
     ################################################################
     #
@@ -2146,6 +2356,17 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
             ]
         )
 
+    def commit_many(self, objects, trans, change_time=None):
+        """
+        Commit a sequence of primary objects, of any type, to the database,
+        storing the changes as part of the transaction.
+
+        Backends may override this to write the objects in bulk.
+        """
+        for obj in objects:
+            commit_func = self.__tables[obj.__class__.__name__]["commit_func"]
+            commit_func(obj, trans, change_time)
+
     def _after_commit(self, transaction):
         """
         Post-transaction commit processing
@@ -2527,14 +2748,34 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         """
         return self._bm_changes > 0
 
+    @contextmanager
+    def read_snapshot(self):
+        """
+        Context manager giving the current thread a consistent, read-only
+        view of the database, for reports and tools run in worker threads.
+
+        Backends without snapshot support yield the database itself::
+
+            with db.read_snapshot() as snapshot:
+                for person in snapshot.iter_people():
+                    ...
+        """
+        yield self
+
     def get_undodb(self):
         return self.undodb
 
     def undo(self, update_history=True):
-        return self.undodb.undo(update_history)
+        if self.undodb.undo(update_history):
+            self.has_changed += 1
+            return True
+        return False
 
     def redo(self, update_history=True):
-        return self.undodb.redo(update_history)
+        if self.undodb.redo(update_history):
+            self.has_changed += 1
+            return True
+        return False
 
     def get_summary(self):
         """
@@ -2545,7 +2786,7 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         _("Version")
         _("Data version")
         """
-        return {
+        summary = {
             _("Number of people"): self.get_number_of_people(),
             _("Number of families"): self.get_number_of_families(),
             _("Number of sources"): self.get_number_of_sources(),
@@ -2558,6 +2799,18 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
             _("Number of tags"): self.get_number_of_tags(),
             _("Schema version"): ".".join([str(v) for v in self.VERSION]),
         }
+        if self._query_stats is not None:
+            totals = self._query_stats.get_totals()
+            summary.update(
+                {
+                    _("Queries"): totals["runs"],
+                    _("Query time"): "%.3f s" % totals["seconds"],
+                    _("Rows fetched or changed"): totals["rows"],
+                    _("Objects unpickled"): totals["decodes"],
+                    _("Objects created"): totals["creates"],
+                }
+            )
+        return summary
 
     def _order_by_person_key(self, person):
         """
@@ -0,0 +1,134 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Statistics of the queries run on a database.
+
+A database records them when the ``database.slow-query-time`` setting is
+not 0, or when the ``.querystats`` logger is enabled for INFO messages, as
+it is by the ``--profile-db`` command line option.  The report is then
+logged when the database is closed.
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard python modules
+#
+# -------------------------------------------------------------------------
+import logging
+import threading
+
+LOG = logging.getLogger(".querystats")
+
+
+# -------------------------------------------------------------------------
+#
+# QueryStats
+#
+# -------------------------------------------------------------------------
+class QueryStats:
+    """
+    The number of runs, the cumulative time and the number of rows of each
+    SQL statement run on a database, and the number of objects the
+    database unpickled and created.
+
+    Statements are told apart by their text, so the runs of a statement
+    with different parameters are added up.  The time of a statement
+    includes the time spent fetching its rows.
+    """
+
+    def __init__(self, slow_time=0):
+        """
+        Create new statistics.
+
+        :param slow_time: statements whose execution, or a fetch of whose
+                          rows, takes at least this time in seconds are
+                          logged as warnings.  0 to disable the log.
+        :type slow_time: float
+        """
+        self.slow_time = slow_time
+        self.decodes = 0
+        self.creates = 0
+        self.__statements = {}
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def is_enabled():
+        """
+        Return True if every database should record its statistics.
+        """
+        return LOG.isEnabledFor(logging.INFO)
+
+    def record(self, sql, seconds, rows=0, runs=1):
+        """
+        Add a run of a statement, or with runs 0, rows fetched for it.
+        """
+        with self.__lock:
+            entry = self.__statements.get(sql)
+            if entry is None:
+                entry = self.__statements[sql] = [0, 0.0, 0]
+            entry[0] += runs
+            entry[1] += seconds
+            entry[2] += rows
+        if self.slow_time and seconds >= self.slow_time:
+            LOG.warning("Slow query (%.3f s): %s", seconds, " ".join(sql.split()))
+
+    def get_statements(self):
+        """
+        Return a list of (statement, runs, seconds, rows) tuples, the
+        slowest statements first.
+        """
+        with self.__lock:
+            statements = [
+                (sql, runs, seconds, rows)
+                for sql, (runs, seconds, rows) in self.__statements.items()
+            ]
+        statements.sort(key=lambda item: item[2], reverse=True)
+        return statements
+
+    def get_totals(self):
+        """
+        Return a dictionary of the total number of runs, time and rows of
+        the statements, and of the number of unpickled and created objects.
+        """
+        statements = self.get_statements()
+        return {
+            "runs": sum(item[1] for item in statements),
+            "seconds": sum(item[2] for item in statements),
+            "rows": sum(item[3] for item in statements),
+            "decodes": self.decodes,
+            "creates": self.creates,
+        }
+
+    def get_report(self, limit=20):
+        """
+        Return a text report of the totals and of the slowest statements.
+        """
+        totals = self.get_totals()
+        lines = [
+            "%(runs)d queries, %(seconds).3f s, %(rows)d rows, "
+            "%(decodes)d objects unpickled, %(creates)d objects created" % totals,
+            "%8s %10s %10s  %s" % ("runs", "seconds", "rows", "statement"),
+        ]
+        for sql, runs, seconds, rows in self.get_statements()[:limit]:
+            lines.append(
+                "%8d %10.3f %10d  %s" % (runs, seconds, rows, " ".join(sql.split()))
+            )
+        return "\n".join(lines)
@@ -60,6 +60,7 @@ class DbTxn(defaultdict):
         "commitdb",
         "db",
         "batch",
+        "defer_references",
         "first",
         "last",
         "timestamp",
@@ -101,7 +102,7 @@ class DbTxn(defaultdict):
 
         return False
 
-    def __init__(self, msg, grampsdb, batch=False, **kwargs):
+    def __init__(self, msg, grampsdb, batch=False, defer_references=False, **kwargs):
         """
         Create a new transaction.
 
@@ -132,6 +133,12 @@ class DbTxn(defaultdict):
             list element = (handle, data) where:
                 handle = handle (database key) of the object in the transaction
                 data = pickled representation of the object
+
+        If defer_references is True in a batch transaction, backends may skip
+        maintaining the reference map for every commit and instead rebuild it
+        for all the committed objects when the transaction is committed. The
+        backlinks of objects committed in the transaction are then not
+        available until it has been committed.
         """
 
         # Conditional on __debug__ because all that frame stuff may be slow
@@ -164,6 +171,7 @@ class DbTxn(defaultdict):
         self.commitdb = grampsdb.get_undodb()
         self.db = grampsdb
         self.batch = batch
+        self.defer_references = defer_references
         for key, value in kwargs.items():
             setattr(self, key, value)
         self.first = None
@@ -0,0 +1,130 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Storage of the records of the undo log.
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard python modules
+#
+# -------------------------------------------------------------------------
+import sqlite3
+import zlib
+
+
+# -------------------------------------------------------------------------
+#
+# UndoStore
+#
+# -------------------------------------------------------------------------
+class UndoStore:
+    """
+    The records of the undo log, compressed, in a private temporary SQLite
+    database which is written to disk as it grows, so that the memory used
+    stays flat however long the session.
+
+    The records are numbered in the order they are appended, and the
+    numbers are never reused.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.__next = 0
+        self.__connection = None
+
+    def open(self):
+        """
+        Create the temporary database.
+        """
+        if self.__connection is not None:
+            return
+        # An empty file name gives a temporary database deleted on close
+        self.__connection = sqlite3.connect(
+            "", isolation_level=None, check_same_thread=False
+        )
+        self.__connection.execute("PRAGMA journal_mode = OFF")
+        self.__connection.execute("PRAGMA synchronous = OFF")
+        self.__connection.execute(
+            "CREATE TABLE record (recno INTEGER PRIMARY KEY, data BLOB)"
+        )
+
+    def close(self):
+        """
+        Drop the temporary database and all its records.
+        """
+        if self.__connection is not None:
+            self.__connection.close()
+            self.__connection = None
+        self.size = 0
+
+    def append(self, value):
+        """
+        Add a record, and return its number.
+        """
+        recno = self.__next
+        data = zlib.compress(value)
+        self.__connection.execute(
+            "INSERT INTO record (recno, data) VALUES (?, ?)", [recno, data]
+        )
+        self.__next += 1
+        self.size += len(data)
+        return recno
+
+    def __getitem__(self, recno):
+        row = self.__connection.execute(
+            "SELECT data FROM record WHERE recno = ?", [recno]
+        ).fetchone()
+        if row is None:
+            raise IndexError("undo record %s not found" % recno)
+        return zlib.decompress(row[0])
+
+    def __setitem__(self, recno, value):
+        row = self.__connection.execute(
+            "SELECT length(data) FROM record WHERE recno = ?", [recno]
+        ).fetchone()
+        if row is None:
+            raise IndexError("undo record %s not found" % recno)
+        data = zlib.compress(value)
+        self.__connection.execute(
+            "UPDATE record SET data = ? WHERE recno = ?", [data, recno]
+        )
+        self.size += len(data) - row[0]
+
+    def __len__(self):
+        return self.__connection.execute("SELECT COUNT(*) FROM record").fetchone()[0]
+
+    def get_next(self):
+        """
+        Return the number of the next record to be appended.
+        """
+        return self.__next
+
+    def discard_before(self, recno):
+        """
+        Drop the records numbered below recno.
+        """
+        row = self.__connection.execute(
+            "SELECT SUM(length(data)) FROM record WHERE recno < ?", [recno]
+        ).fetchone()
+        if row[0]:
+            self.__connection.execute("DELETE FROM record WHERE recno < ?", [recno])
+            self.size -= row[0]
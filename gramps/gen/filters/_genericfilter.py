@@ -24,6 +24,14 @@
 Package providing filtering framework for Gramps.
 """
 
+# ------------------------------------------------------------------------
+#
+# Python modules
+#
+# ------------------------------------------------------------------------
+import logging
+from time import perf_counter
+
 # ------------------------------------------------------------------------
 #
 # Gramps imports
@@ -39,10 +47,56 @@ from ..lib.repo import Repository
 from ..lib.media import Media
 from ..lib.note import Note
 from ..lib.tag import Tag
+from ..config import config
 from ..const import GRAMPS_LOCALE as glocale
 
 _ = glocale.translation.gettext
 
+LOG = logging.getLogger(".filter")
+
+# Number of objects between two reorderings of the rules
+REORDER_INTERVAL = 256
+
+# Number of calls to every rule before its measured cost is trusted
+MIN_CALLS = 20
+
+
+# -------------------------------------------------------------------------
+#
+# RuleStats
+#
+# -------------------------------------------------------------------------
+class RuleStats:
+    """
+    Statistics of the evaluation of a rule in a filter.
+    """
+
+    __slots__ = ("calls", "matches", "time")
+
+    def __init__(self):
+        self.calls = 0
+        self.matches = 0
+        self.time = 0.0
+
+    def get_selectivity(self):
+        """
+        Return the fraction of the objects matched by the rule.
+        """
+        return self.matches / self.calls if self.calls else 0.5
+
+    def get_mean_time(self):
+        """
+        Return the mean time of a call to the rule, in seconds.
+        """
+        return self.time / self.calls if self.calls else 0.0
+
+    def __repr__(self):
+        return "<RuleStats calls=%d matches=%d time=%.6f>" % (
+            self.calls,
+            self.matches,
+            self.time,
+        )
+
 
 # -------------------------------------------------------------------------
 #
@@ -69,6 +123,13 @@ class GenericFilter:
             self.comment = ""
             self.logical_op = "and"
             self.invert = False
+        # Rules evaluated in SQL by the last apply
+        self.pushed_rules = []
+        # Statistics of the rules, by rule id
+        self.rule_stats = {}
+        # Rules with their statistics, in the order they are evaluated
+        self._plan = None
+        self._evaluated = 0
 
     def match(self, handle, db):
         """
@@ -89,6 +150,7 @@ class GenericFilter:
             self.logical_op = val
         else:
             self.logical_op = "and"
+        self._plan = None
 
     def get_logical_op(self):
         return self.logical_op
@@ -113,12 +175,16 @@ class GenericFilter:
 
     def add_rule(self, rule):
         self.flist.append(rule)
+        self._plan = None
 
     def delete_rule(self, rule):
         self.flist.remove(rule)
+        self.rule_stats.pop(id(rule), None)
+        self._plan = None
 
     def set_rules(self, rules):
         self.flist = rules
+        self._plan = None
 
     def get_rules(self):
         return self.flist
@@ -167,35 +233,7 @@ class GenericFilter:
         return final_list
 
     def check_and(self, db, id_list, user=None, tupleind=None, tree=False):
-        final_list = []
-        flist = self.flist
-        if user:
-            user.begin_progress(_("Filter"), _("Applying ..."), self.get_number(db))
-        if id_list is None:
-            with self.get_tree_cursor(db) if tree else self.get_cursor(db) as cursor:
-                for handle, data in cursor:
-                    person = self.make_obj()
-                    person.unserialize(data)
-                    if user:
-                        user.step_progress()
-                    val = all(rule.apply(db, person) for rule in flist)
-                    if val != self.invert:
-                        final_list.append(handle)
-        else:
-            for data in id_list:
-                if tupleind is None:
-                    handle = data
-                else:
-                    handle = data[tupleind]
-                person = self.find_from_handle(db, handle)
-                if user:
-                    user.step_progress()
-                val = all(rule.apply(db, person) for rule in flist if person)
-                if val != self.invert:
-                    final_list.append(data)
-        if user:
-            user.end_progress()
-        return final_list
+        return self.check_func(db, id_list, self.and_test, user, tupleind, tree)
 
     def check_or(self, db, id_list, user=None, tupleind=None, tree=False):
         return self.check_func(db, id_list, self.or_test, user, tupleind, tree=False)
@@ -221,8 +259,81 @@ class GenericFilter:
                 found_one = True
         return found_one
 
+    def and_test(self, db, person):
+        if not person:
+            return True
+        return self.short_circuit_test(db, person, False)
+
     def or_test(self, db, person):
-        return any(rule.apply(db, person) for rule in self.flist)
+        return self.short_circuit_test(db, person, True)
+
+    def short_circuit_test(self, db, obj, stop):
+        """
+        Apply the rules until one of them returns stop, cheapest and most
+        likely to return stop first, and record their statistics.
+        """
+        if self._plan is None:
+            self.order_rules(stop)
+        result = not stop
+        for rule, stats in self._plan:
+            start = perf_counter()
+            value = bool(rule.apply(db, obj))
+            stats.time += perf_counter() - start
+            stats.calls += 1
+            stats.matches += value
+            if value is stop:
+                result = stop
+                break
+        self._evaluated += 1
+        if self._evaluated % REORDER_INTERVAL == 0:
+            self.order_rules(stop)
+        return result
+
+    def get_rank(self, rule, stop):
+        """
+        Return the measured time of a rule per object it decides, when the
+        rules are applied until one of them returns stop.
+        """
+        stats = self.rule_stats[id(rule)]
+        selectivity = stats.get_selectivity()
+        if not stop:
+            selectivity = 1 - selectivity
+        if not selectivity:
+            return float("inf")
+        return stats.get_mean_time() / selectivity
+
+    def order_rules(self, stop):
+        """
+        Order the rules for the short circuit evaluation of and (stop is
+        False) or or (stop is True).  Measured costs are only compared once
+        every rule has been measured; ties keep the order of the filter.
+        """
+        for rule in self.flist:
+            if id(rule) not in self.rule_stats:
+                self.rule_stats[id(rule)] = RuleStats()
+        if all(self.rule_stats[id(rule)].calls >= MIN_CALLS for rule in self.flist):
+            rules = sorted(self.flist, key=lambda rule: self.get_rank(rule, stop))
+        else:
+            rules = sorted(self.flist, key=lambda rule: rule.cost)
+        self._plan = [(rule, self.rule_stats[id(rule)]) for rule in rules]
+
+    def get_rule_stats(self):
+        """
+        Return the statistics of the rules as a list of (rule, RuleStats)
+        tuples, in the order of the filter.  The statistics accumulate over
+        the calls to apply until reset_rule_stats is called.
+        """
+        return [
+            (rule, self.rule_stats.setdefault(id(rule), RuleStats()))
+            for rule in self.flist
+        ]
+
+    def reset_rule_stats(self):
+        """
+        Clear the statistics of the rules.
+        """
+        self.rule_stats = {}
+        self._plan = None
 
     def get_check_func(self):
         try:
@@ -234,7 +345,86 @@ class GenericFilter:
     def check(self, db, handle):
         return self.get_check_func()(db, [handle])
 
-    def apply(self, db, id_list=None, tupleind=None, user=None, tree=False):
+    def get_sql_plan(self, db):
+        """
+        Split the rules into those evaluated by the database in SQL and
+        those evaluated in Python.
+
+        Returns a tuple (where, args, pushed, residual).  where is the SQL
+        condition selecting the candidates, or None if SQL cannot be used.
+        pushed are the rules fully answered by the condition; the residual
+        rules must still be applied to the candidates.
+        """
+        if self.logical_op not in ("and", "or"):
+            return None, [], [], self.flist
+        clauses = []
+        args = []
+        pushed = []
+        residual = []
+        for rule in self.flist:
+            sql = rule.to_sql(db)
+            if sql is None:
+                residual.append(rule)
+                continue
+            clauses.append("(%s)" % sql[0])
+            args += sql[1]
+            if rule.sql_exact:
+                pushed.append(rule)
+            else:
+                residual.append(rule)
+        if self.logical_op == "and" and clauses:
+            return " AND ".join(clauses), args, pushed, residual
+        if self.logical_op == "or" and clauses and not residual:
+            return " OR ".join(clauses), args, pushed, residual
+        return None, [], [], self.flist
+
+    def check_sql(self, db, user=None):
+        """
+        Apply the filter to all the objects, evaluating in SQL the rules
+        that support it.  Returns None if the database cannot evaluate SQL
+        or no rule can be pushed down.
+        """
+        class_name = self.make_obj().__class__.__name__
+        if db.select_handles(class_name, "1 = 0") is None:
+            return None
+        where, args, pushed, residual = self.get_sql_plan(db)
+        if where is None:
+            return None
+        handles = db.select_handles(class_name, where, args)
+        self.pushed_rules = pushed
+        LOG.debug(
+            "Filter %r: %d candidates, rules in SQL: %s, in Python: %s",
+            self.name,
+            len(handles),
+            [rule.__class__.__name__ for rule in pushed],
+            [rule.__class__.__name__ for rule in residual],
+        )
+        if residual:
+            residual.sort(key=lambda rule: rule.cost)
+            if user:
+                user.begin_progress(_("Filter"), _("Applying ..."), len(handles))
+            matches = []
+            for handle in handles:
+                obj = self.find_from_handle(db, handle)
+                if user:
+                    user.step_progress()
+                if all(rule.apply(db, obj) for rule in residual):
+                    matches.append(handle)
+            if user:
+                user.end_progress()
+            handles = matches
+        if self.invert:
+            matches = set(handles)
+            handles = [
+                handle
+                for handle in db.select_handles(class_name)
+                if handle not in matches
+            ]
+        return handles
+
+    def apply(
+        self, db, id_list=None, tupleind=None, user=None, tree=False, processes=None
+    ):
         """
         Apply the filter using db.
         If id_list given, the handles in id_list are used. If not given
@@ -246,15 +436,33 @@ class GenericFilter:
 
         user is optional. If present it must be an instance of a User class.
 
+        processes is the number of worker processes sharing the work, by
+        default the database.filter-processes setting.  Filters that cannot
+        be applied in parallel are applied in this process.
+
         :Returns: if id_list given, it is returned with the items that
                 do not match the filter, filtered out.
                 if id_list not given, all items in the database that
                 match the filter are returned as a list of handles
         """
+        if processes is None:
+            processes = config.get("database.filter-processes")
+        if processes > 1 and tupleind is None and not tree:
+            from ._parallel import apply_parallel
+
+            res = apply_parallel(self, db, id_list, processes, user)
+            if res is not None:
+                return res
         m = self.get_check_func()
         for rule in self.flist:
             rule.requestprepare(db, user)
-        res = m(db, id_list, user, tupleind, tree)
+        self.pushed_rules = []
+        self._plan = None
+        res = None
+        if id_list is None and not tree:
+            res = self.check_sql(db, user)
+        if res is None:
+            res = m(db, id_list, user, tupleind, tree)
         for rule in self.flist:
             rule.requestreset()
         return res
@@ -0,0 +1,154 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Apply a filter with a pool of worker processes.
+"""
+
+# ------------------------------------------------------------------------
+#
+# Python modules
+#
+# ------------------------------------------------------------------------
+import logging
+import multiprocessing
+import pickle
+
+# ------------------------------------------------------------------------
+#
+# GTK modules
+#
+# ------------------------------------------------------------------------
+from gi.repository import GLib
+
+# ------------------------------------------------------------------------
+#
+# Gramps imports
+#
+# ------------------------------------------------------------------------
+from ..db.dbconst import DBMODE_R
+from ..db.generic import DbGeneric
+from ..plug import BasePluginManager
+from ..const import GRAMPS_LOCALE as glocale
+from ._genericfilter import GenericFilter
+
+_ = glocale.translation.gettext
+
+LOG = logging.getLogger(".filter")
+
+# Below this number of handles, starting the workers costs more than it saves
+MIN_HANDLES = 1000
+
+# Number of slices of the handles per worker, to balance the load
+SLICES_PER_PROCESS = 4
+
+# State of a worker process
+_WORKER = {}
+
+
+def _get_backend(db):
+    """
+    Return the plugin id of the database backend, or None.
+    """
+    pmgr = BasePluginManager.get_instance()
+    for pdata in pmgr.get_reg_databases():
+        if pdata.databaseclass == db.__class__.__name__:
+            return pdata.id
+    return None
+
+
+def _init_worker(backend, directory, data):
+    """
+    Open the database read-only and prepare the filter, once per worker.
+    """
+    from ..db.utils import make_database
+
+    db = make_database(backend)
+    db.load(directory, mode=DBMODE_R)
+    filter_ = pickle.loads(data)
+    for rule in filter_.flist:
+        rule.requestprepare(db, None)
+    _WORKER["db"] = db
+    _WORKER["filter"] = filter_
+
+
+def _apply_slice(handles):
+    """
+    Apply the prepared filter of the worker to a slice of the handles.
+    """
+    filter_ = _WORKER["filter"]
+    return filter_.get_check_func()(_WORKER["db"], handles)
+
+
+def apply_parallel(filter_, db, id_list=None, processes=2, user=None):
+    """
+    Apply a filter using a pool of processes.
+
+    The handles are split into contiguous slices, and each worker process
+    opens its own read-only connection to the database, prepares the rules
+    once and applies them to the slices it is given.  The results are
+    merged in the order of the handles.
+
+    Returns None, without consuming id_list, if the filter cannot be
+    applied in parallel: the GUI is running, the database is not a file
+    opened by a backend, the rules are already prepared or cannot be sent
+    to the workers.
+    """
+    if _WORKER or not isinstance(db, DbGeneric):
+        return None
+    if GLib.main_depth() or "fork" not in multiprocessing.get_all_start_methods():
+        # The workers are forked, as spawning them would run the script that
+        # started Gramps again.  A process running the GUI main loop is not
+        # forked: its workers could deadlock on the GLib or GTK state.
+        return None
+    directory = db.get_save_path()
+    if not directory or directory == ":memory:":
+        return None
+    backend = _get_backend(db)
+    if backend is None or any(rule.nrprepare for rule in filter_.flist):
+        return None
+    try:
+        data = pickle.dumps(filter_)
+    except (pickle.PicklingError, TypeError, AttributeError) as err:
+        LOG.debug("Filter %r cannot be applied in parallel: %s", filter_.name, err)
+        return None
+
+    if id_list is None:
+        class_name = filter_.make_obj().__class__.__name__
+        handles = db.method("get_%s_handles", class_name)()
+    else:
+        handles = list(id_list)
+    if len(handles) < MIN_HANDLES:
+        return GenericFilter.apply(filter_, db, handles, user=user, processes=1)
+
+    size = -(-len(handles) // (processes * SLICES_PER_PROCESS))
+    slices = [handles[start : start + size] for start in range(0, len(handles), size)]
+    if user:
+        user.begin_progress(_("Filter"), _("Applying ..."), len(slices))
+    result = []
+    context = multiprocessing.get_context("fork")
+    with context.Pool(processes, _init_worker, (backend, directory, data)) as pool:
+        for matches in pool.imap(_apply_slice, slices):
+            result.extend(matches)
+            if user:
+                user.step_progress()
+    if user:
+        user.end_progress()
+    return result
@@ -62,12 +62,14 @@ _HasReferenceCountBase       Object has </>/= number of references
 _HasSourceCountBase          Object has </>/= number of sources
 
 _Rule                        Base rule class
+_Closure                     Ancestors and descendants shared by the rules
 _Everything                  Match every object in the database
 """
 
 # Need to expose this to be available for filter plugins:
 # the plugins should say: from .. import Rule
 from ._rule import Rule
+from ._closure import Closure
 
 from ._everything import Everything
 from ._hasgrampsid import HasGrampsId
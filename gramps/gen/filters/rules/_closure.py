@@ -0,0 +1,298 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Ancestors and descendants shared by the rules of a filter run.
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard Python modules
+#
+# -------------------------------------------------------------------------
+from collections import deque
+
+# -------------------------------------------------------------------------
+#
+# Gramps modules
+#
+# -------------------------------------------------------------------------
+from ...errors import HandleError
+
+# Indexes in the serialized data of the handles the closures walk
+PERSON_FAMILY_LIST = 8
+PERSON_PARENT_FAMILY_LIST = 9
+FAMILY_FATHER = 2
+FAMILY_MOTHER = 3
+FAMILY_CHILD_REF_LIST = 4
+CHILD_REF_REF = 3
+
+
+# -------------------------------------------------------------------------
+#
+# Closure
+#
+# -------------------------------------------------------------------------
+class Closure:
+    """
+    Ancestors and descendants of people, found by walking the parent and
+    child edges of a database breadth first, without recursion.
+
+    The closures are found with the recursive queries of the database
+    when it supports them.  Otherwise only the handles linking people and
+    families are read, from the serialized data, and every edge is read
+    once.  The closures are memoized by root, direction and depth.
+
+    The rules of a filter run share one instance per database: each rule
+    gets it with :meth:`acquire` in prepare and gives it back with
+    :meth:`release` in reset.  The instance is dropped when the last rule
+    releases it, so changes to the database are seen by the next run.
+    """
+
+    _instances = {}
+
+    def __init__(self, db):
+        self.db = db
+        self.users = 0
+        self.person_families = {}
+        self.person_parent_families = {}
+        self.family_parents = {}
+        self.family_children = {}
+        self.closures = {}
+
+    @classmethod
+    def acquire(cls, db):
+        """
+        Return the instance shared by the rules applied to db.
+        """
+        closure = cls._instances.get(id(db))
+        if closure is None or closure.db is not db:
+            closure = cls._instances[id(db)] = cls(db)
+        closure.users += 1
+        return closure
+
+    def release(self):
+        """
+        Give back an instance obtained with :meth:`acquire`.
+        """
+        self.users -= 1
+        if self.users <= 0 and Closure._instances.get(id(self.db)) is self:
+            del Closure._instances[id(self.db)]
+
+    def _get_data(self, get_raw_data, handle):
+        try:
+            return get_raw_data(handle)
+        except (HandleError, AttributeError):
+            # Proxies fail to serialize the objects they hide
+            return None
+
+    def _read_person(self, handle):
+        data = self._get_data(self.db.get_raw_person_data, handle)
+        if data:
+            self.person_families[handle] = data[PERSON_FAMILY_LIST]
+            self.person_parent_families[handle] = data[PERSON_PARENT_FAMILY_LIST]
+        else:
+            self.person_families[handle] = []
+            self.person_parent_families[handle] = []
+
+    def _read_family(self, handle):
+        data = self._get_data(self.db.get_raw_family_data, handle)
+        if data:
+            self.family_parents[handle] = [
+                parent
+                for parent in (data[FAMILY_FATHER], data[FAMILY_MOTHER])
+                if parent
+            ]
+            self.family_children[handle] = [
+                child_ref[CHILD_REF_REF] for child_ref in data[FAMILY_CHILD_REF_LIST]
+            ]
+        else:
+            self.family_parents[handle] = []
+            self.family_children[handle] = []
+
+    def get_families(self, handle):
+        """
+        Return the handles of the families in which a person is a parent.
+        """
+        if handle not in self.person_families:
+            self._read_person(handle)
+        return self.person_families[handle]
+
+    def get_parent_families(self, handle):
+        """
+        Return the handles of the families in which a person is a child,
+        the main family first.
+        """
+        if handle not in self.person_parent_families:
+            self._read_person(handle)
+        return self.person_parent_families[handle]
+
+    def get_family_parents(self, handle):
+        """
+        Return the handles of the father and mother of a family.
+        """
+        if handle not in self.family_parents:
+            self._read_family(handle)
+        return self.family_parents[handle]
+
+    def get_family_children(self, handle):
+        """
+        Return the handles of the children of a family.
+        """
+        if handle not in self.family_children:
+            self._read_family(handle)
+        return self.family_children[handle]
+
+    def get_parents(self, handle, main=True):
+        """
+        Return the handles of the parents of a person, in the main family
+        only, or in all the families in which the person is a child.
+        """
+        families = self.get_parent_families(handle)
+        if main:
+            families = families[:1]
+        return [
+            parent for family in families for parent in self.get_family_parents(family)
+        ]
+
+    def get_children(self, handle):
+        """
+        Return the handles of the children of a person.
+        """
+        return [
+            child
+            for family in self.get_families(handle)
+            for child in self.get_family_children(family)
+        ]
+
+    def _walk(self, starts, neighbours, depth):
+        """
+        Return a dictionary of the people reached from the starts, with
+        the number of generations of the shortest line to each of them.
+        The starts are only included if a loop leads back to them.
+        """
+        generations = {}
+        queue = deque((handle, 0) for handle in starts)
+        while queue:
+            handle, gen = queue.popleft()
+            gen += 1
+            if depth is not None and gen > depth:
+                continue
+            for other in neighbours(handle):
+                if other not in generations:
+                    generations[other] = gen
+                    queue.append((other, gen))
+        return generations
+
+    def _walk_far(self, root, neighbours, depth):
+        """
+        Return the set of the people with a line of at least depth
+        generations from the root.
+        """
+        seen = {(root, 0)}
+        queue = deque(seen)
+        matches = set()
+        while queue:
+            handle, gen = queue.popleft()
+            if gen >= depth:
+                matches.add(handle)
+            # Lines longer than depth generations need not be told apart
+            gen = min(gen + 1, depth)
+            for other in neighbours(handle):
+                if (other, gen) not in seen:
+                    seen.add((other, gen))
+                    queue.append((other, gen))
+        return matches
+
+    def _memoize(self, key, func, *args):
+        if key not in self.closures:
+            self.closures[key] = func(*args)
+        return self.closures[key]
+
+    def _find_ancestors(self, root, depth, main):
+        handles = self.db.get_ancestor_handles(root, depth, main)
+        if handles is None:
+            handles = set(
+                self._walk([root], lambda handle: self.get_parents(handle, main), depth)
+            )
+        return handles
+
+    def _find_descendants(self, root, depth):
+        handles = self.db.get_descendant_handles(root, depth)
+        if handles is None:
+            handles = set(self._walk([root], self.get_children, depth))
+        return handles
+
+    def get_ancestors(self, root, depth=None, main=True):
+        """
+        Return the set of the ancestors of a person not more than depth
+        generations away.  Only the main family of each person is followed
+        unless main is False.
+        """
+        return self._memoize(
+            (root, "ancestors" if main else "all-ancestors", depth),
+            self._find_ancestors,
+            root,
+            depth,
+            main,
+        )
+
+    def get_descendants(self, root, depth=None):
+        """
+        Return the set of the descendants of a person not more than depth
+        generations away.
+        """
+        return self._memoize(
+            (root, "descendants", depth), self._find_descendants, root, depth
+        )
+
+    def get_far_ancestors(self, root, depth):
+        """
+        Return the set of the ancestors of a person at least depth
+        generations away, through the main families.
+        """
+        return self._memoize(
+            (root, "far-ancestors", depth),
+            self._walk_far,
+            root,
+            self.get_parents,
+            depth,
+        )
+
+    def get_far_descendants(self, root, depth):
+        """
+        Return the set of the descendants of a person at least depth
+        generations away.
+        """
+        return self._memoize(
+            (root, "far-descendants", depth),
+            self._walk_far,
+            root,
+            self.get_children,
+            depth,
+        )
+
+    def get_descendants_of(self, handles):
+        """
+        Return the set of the given people and all their descendants.
+        """
+        people = set(handles)
+        people.update(self._walk(people, self.get_children, None))
+        return people
@@ -45,9 +45,19 @@ class HasNoteSubstrBase(Rule):
     name = "Objects having notes containing <substring>"
     description = "Matches objects whose notes contain text matching a " "substring"
     category = _("General filters")
+    cost = 10
+
+    def prepare(self, db, user):
+        # Notes that may match, from the text index of the database
+        self.notes = self.search_text(db, "Note", self.list[0])
+
+    def reset(self):
+        self.notes = None
 
     def apply(self, db, person):
         notelist = person.get_note_list()
+        if self.notes is not None:
+            notelist = [handle for handle in notelist if handle in self.notes]
         for notehandle in notelist:
             note = db.get_note_from_handle(notehandle)
             n = note.get()
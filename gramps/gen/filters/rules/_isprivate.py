@@ -45,3 +45,6 @@ class IsPrivate(Rule):
 
     def apply(self, db, obj):
         return obj.get_privacy()
+
+    def to_sql(self, db):
+        return "private = 1", []
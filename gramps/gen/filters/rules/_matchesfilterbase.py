@@ -59,6 +59,7 @@ class MatchesFilterBase(Rule):
     name = "Objects matching the <filter>"
     description = "Matches objects matched by the specified filter name"
     category = _("General filters")
+    cost = 10
 
     def prepare(self, db, user):
         if gramps.gen.filters.CustomFilters:
@@ -58,3 +58,6 @@ class RegExpIdBase(Rule):
 
     def apply(self, db, obj):
         return self.match_substring(0, obj.gramps_id)
+
+    def to_sql(self, db):
+        return self.sql_match_substring(0, "gramps_id")
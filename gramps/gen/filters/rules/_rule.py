@@ -58,6 +58,22 @@ class Rule:
     category = _("Miscellaneous filters")
     description = _("No description")
     allow_regex = False
+    # True if to_sql matches exactly the objects the rule applies to, False
+    # if it only narrows down the candidates
+    sql_exact = True
+    # Estimated cost of apply: 1 for a test of the object itself, about 10
+    # for each kind of related object read from the database
+    cost = 1
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Drop the SQL condition inherited by a rule that replaces apply, as
+        the family rules on the father, mother or children do, since it
+        would be evaluated on the wrong object.
+        """
+        super().__init_subclass__(**kwargs)
+        if "apply" in cls.__dict__ and "to_sql" not in cls.__dict__:
+            cls.to_sql = Rule.to_sql
 
     def __init__(self, arg, use_regex=False, use_case=False):
         self.list = []
@@ -68,6 +84,22 @@ class Rule:
         self.use_case = use_case
         self.nrprepare = 0
 
+    def __getstate__(self):
+        """
+        Return the state of the rule for pickling, without the bound
+        matching method, which cannot be pickled by name.
+        """
+        state = self.__dict__.copy()
+        del state["match_substring"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.use_regex and self.nrprepare:
+            self.match_substring = self.match_regex
+        else:
+            self.match_substring = self.__match_substring
+
     def is_empty(self):
         return False
 
@@ -154,6 +186,37 @@ class Rule:
         """Apply the rule to some database entry; must be overwritten."""
         return True
 
+    def to_sql(self, db):
+        """
+        Return the rule as an SQL condition on the columns of the table of
+        the filtered objects, as a (where, args) tuple, or None if the rule
+        cannot be evaluated in SQL.  Called after prepare.
+        """
+        return None
+
+    def sql_match_substring(self, param_index, column):
+        """
+        Return the SQL condition matching a column like match_substring or
+        match_regex match a value.
+        """
+        if not self.list[param_index]:
+            return "1 = 1", []
+        if self.use_regex:
+            flags = "" if self.use_case else "(?i)"
+            return "%s REGEXP ?" % column, [flags + self.regex[param_index].pattern]
+        return "match_substring(?, %s)" % column, [self.list[param_index]]
+
+    def search_text(self, db, class_name, text):
+        """
+        Return the set of the handles of the objects of the given class
+        whose text data may contain text, ignoring case, from the text index
+        of the database, or None if the database has no such index.
+        """
+        sql = db.get_text_search(class_name, text)
+        if sql is None:
+            return None
+        return set(db.select_handles(class_name, *sql))
+
     def display_values(self):
         """Return the labels and values of this rule."""
         l_v = (
@@ -54,3 +54,7 @@ class HasSourceIdOf(HasGrampsId):
         if HasGrampsId.apply(self, dbase, source):
             return True
         return False
+
+    def to_sql(self, dbase):
+        where, args = HasGrampsId.to_sql(self, dbase)
+        return "source_handle IN (SELECT handle FROM source WHERE %s)" % where, args
@@ -59,3 +59,7 @@ class RegExpSourceIdOf(RegExpIdBase):
         if RegExpIdBase.apply(self, dbase, source):
             return True
         return False
+
+    def to_sql(self, dbase):
+        where, args = RegExpIdBase.to_sql(self, dbase)
+        return "source_handle IN (SELECT handle FROM source WHERE %s)" % where, args
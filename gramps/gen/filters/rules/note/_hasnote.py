@@ -52,6 +52,7 @@ class HasNote(Rule):
     description = _("Matches Notes with particular parameters")
     category = _("General filters")
     allow_regex = True
+    sql_exact = False
 
     def prepare(self, db, user):
         if self.list[1]:
@@ -72,3 +73,11 @@ class HasNote(Rule):
                 return False
 
         return True
+
+    def to_sql(self, db):
+        """
+        Narrow down the candidates with the text index of the database.
+        """
+        if self.use_regex or not self.list[0]:
+            return None
+        return db.get_text_search("Note", self.list[0])
@@ -46,6 +46,15 @@ class MatchesSubstringOf(Rule):
     name = _("Notes containing <substring>")
     description = _("Matches notes that contain text " "which matches a substring")
     category = _("General filters")
+    sql_exact = False
+
+    def to_sql(self, db):
+        """
+        Narrow down the candidates with the text index of the database.
+        """
+        if not self.list[0]:
+            return None
+        return db.get_text_search("Note", self.list[0])
 
     def apply(self, db, note):
         """Apply the filter"""
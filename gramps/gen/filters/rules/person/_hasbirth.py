@@ -52,6 +52,7 @@ class HasBirth(Rule):
     description = _("Matches people with birth data of a particular value")
     category = _("Event filters")
     allow_regex = True
+    cost = 10
 
     def prepare(self, db, user):
         if self.list[0]:
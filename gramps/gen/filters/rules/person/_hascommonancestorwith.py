@@ -33,7 +33,7 @@ _ = glocale.translation.gettext
 #
 # -------------------------------------------------------------------------
 from ....utils.db import for_each_ancestor
-from .. import Rule
+from .. import Rule, Closure
 
 
 # -------------------------------------------------------------------------
@@ -53,61 +53,37 @@ class HasCommonAncestorWith(Rule):
 
     def prepare(self, db, user):
         self.db = db
-        # For each(!) person we keep track of who their ancestors
-        # are, in a set(). So we only have to compute a person's
-        # ancestor list once.
-        # Start with filling the cache for root person (gramps_id in self.list[0])
-        self.ancestor_cache = {}
+        self.closure = Closure.acquire(db)
         root_person = db.get_person_from_gramps_id(self.list[0])
         if root_person:
-            self.add_ancs(db, root_person)
             self.with_people = [root_person.handle]
         else:
             self.with_people = []
+        self.init_map()
 
-    def add_ancs(self, db, person):
-        if person and person.handle not in self.ancestor_cache:
-            self.ancestor_cache[person.handle] = set()
-            # We are going to compare ancestors of one person with that of
-            # another person; if that other person is an ancestor and itself
-            # has no ancestors is must be included, this is achieved by the
-            # little trick of making a person his own ancestor.
-            self.ancestor_cache[person.handle].add(person.handle)
-        else:
-            return
-
-        for fam_handle in person.get_parent_family_handle_list():
-            parentless_fam = True
-            fam = db.get_family_from_handle(fam_handle)
-            if fam:
-                for par_handle in (fam.get_father_handle(), fam.get_mother_handle()):
-                    if par_handle:
-                        parentless_fam = False
-                        par = db.get_person_from_handle(par_handle)
-                        if par and par.handle not in self.ancestor_cache:
-                            self.add_ancs(db, par)
-                        if par:
-                            self.ancestor_cache[person.handle] |= self.ancestor_cache[
-                                par.handle
-                            ]
-                if parentless_fam:
-                    self.ancestor_cache[person.handle].add(fam_handle)
+    def init_map(self):
+        """
+        Find the people sharing an ancestor with one of the people in
+        with_people: the descendants of their ancestors.
+        """
+        ancestors = set(self.with_people)
+        for handle in self.with_people:
+            ancestors.update(self.closure.get_ancestors(handle, main=False))
+        # We are going to compare ancestors of one person with that of
+        # another person; if that other person is an ancestor and itself
+        # has no ancestors is must be included, this is achieved by the
+        # little trick of making a person his own ancestor.  Children of a
+        # family without parents have that family as common ancestor.
+        roots = set(ancestors)
+        for handle in ancestors:
+            for fam_handle in self.closure.get_parent_families(handle):
+                if not self.closure.get_family_parents(fam_handle):
+                    roots.update(self.closure.get_family_children(fam_handle))
+        self.map = self.closure.get_descendants_of(roots)
 
     def reset(self):
-        self.ancestor_cache = {}
-
-    def has_common_ancestor(self, other):
-        for handle in self.with_people:
-            if (handle in self.ancestor_cache and self.ancestor_cache[handle]) & (
-                other
-                and other.handle in self.ancestor_cache
-                and self.ancestor_cache[other.handle]
-            ):
-                return True
-        return False
+        self.closure.release()
+        self.map = set()
 
     def apply(self, db, person):
-        if person and person.handle not in self.ancestor_cache:
-            self.add_ancs(db, person)
-
-        return self.has_common_ancestor(person)
+        return bool(person) and person.handle in self.map
@@ -33,6 +33,7 @@ _ = glocale.translation.gettext
 #
 # -------------------------------------------------------------------------
 from ....utils.db import for_each_ancestor
+from .. import Closure
 from ._hascommonancestorwith import HasCommonAncestorWith
 from ._matchesfilter import MatchesFilter
 
@@ -53,17 +54,9 @@ class HasCommonAncestorWithFilterMatch(HasCommonAncestorWith):
     )
     category = _("Ancestral filters")
 
-    def __init__(self, list, use_regex=False, use_case=False):
-        HasCommonAncestorWith.__init__(self, list, use_regex, use_case)
-        self.ancestor_cache = {}
-
     def prepare(self, db, user):
         self.db = db
-        # For each(!) person we keep track of who their ancestors
-        # are, in a set(). So we only have to compute a person's
-        # ancestor list once.
-        # Start with filling the cache for root person (gramps_id in self.list[0])
-        self.ancestor_cache = {}
+        self.closure = Closure.acquire(db)
         self.with_people = []
         self.filt = MatchesFilter(self.list)
         self.filt.requestprepare(db, user)
@@ -80,12 +73,11 @@ class HasCommonAncestorWithFilterMatch(HasCommonAncestorWith):
             if person and self.filt.apply(db, person):
                 # store all people in the filter so as to compare later
                 self.with_people.append(person.handle)
-                # fill list of ancestor of person if not present yet
-                if handle not in self.ancestor_cache:
-                    self.add_ancs(db, person)
         if user:
             user.end_progress()
+        self.init_map()
 
     def reset(self):
         self.filt.requestreset()
-        self.ancestor_cache = {}
+        self.closure.release()
+        self.map = set()
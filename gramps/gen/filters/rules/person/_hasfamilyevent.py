@@ -52,6 +52,7 @@ class HasFamilyEvent(Rule):
     description = _("Matches people with a family event of a particular value")
     category = _("Event filters")
     allow_regex = True
+    cost = 20
 
     def prepare(self, db, user):
         self.date = None
@@ -62,6 +62,43 @@ class HasNameOf(Rule):
     description = _("Matches people with a specified (partial) name")
     category = _("General filters")
     allow_regex = True
+    sql_exact = False
+
+    # JSON keys of the name fields, in the order of the labels
+    json_keys = (
+        "first_name",
+        "surname",
+        "title",
+        "suffix",
+        "call",
+        "nick",
+        "prefix",
+        "surname",
+        "connector",
+        "surname",
+        "famnick",
+    )
+
+    def to_sql(self, db):
+        """
+        Narrow down the candidates to the people with a name field matching
+        each given value, using the JSON data if the database stores it.
+        """
+        if not db.get_json_data():
+            return None
+        clauses = []
+        args = []
+        for index, (key, value) in enumerate(zip(self.json_keys, self.list)):
+            if value:
+                where, match_args = self.sql_match_substring(index, "value")
+                clauses.append(
+                    "EXISTS (SELECT 1 FROM json_tree(json_data) "
+                    "WHERE key = ? AND %s)" % where
+                )
+                args += [key] + match_args
+        if not clauses:
+            return None
+        return " AND ".join(clauses), args
 
     def apply(self, db, person):
         for name in [person.get_primary_name()] + person.get_alternate_names():
@@ -55,4 +55,6 @@ class HasTextMatchingRegexpOf(HasTextMatchingSubstringOf):
         self.media_map = set()
         self.case_sensitive = False
         self.regexp_match = True
+        # The text index cannot tell which objects match a regular expression
+        self.candidates = {}
         self.cache_sources()
@@ -51,6 +51,7 @@ class HasTextMatchingSubstringOf(Rule):
     description = _("Matches people whose records contain text " "matching a substring")
     category = _("General filters")
     allow_regex = True
+    cost = 50
 
     def prepare(self, db, user):
         self.db = db
@@ -68,6 +69,22 @@ class HasTextMatchingSubstringOf(Rule):
                 self.case_sensitive = False
         except IndexError:
             self.case_sensitive = False
+        # Objects that may match, from the text index of the database
+        self.candidates = {}
+        if not self.use_regex:
+            for class_name in (
+                "Person",
+                "Family",
+                "Event",
+                "Place",
+                "Media",
+                "Repository",
+                "Source",
+                "Citation",
+            ):
+                self.candidates[class_name] = self.search_text(
+                    db, class_name, self.list[0]
+                )
         self.cache_repos()
         self.cache_sources()
 
@@ -79,6 +96,7 @@ class HasTextMatchingSubstringOf(Rule):
         self.family_map.clear()
         self.place_map.clear()
         self.media_map.clear()
+        self.candidates = {}
 
     def apply(self, db, person):
         if person.handle in self.person_map:  # Cached by matching Source?
@@ -158,7 +176,7 @@ class HasTextMatchingSubstringOf(Rule):
         if not place_handle:
             return False
         # search inside the place and cache the result
-        if place_handle not in self.place_map:
+        if place_handle not in self.place_map and self.may_match("Place", place_handle):
             place = self.db.get_place_from_handle(place_handle)
             if self.match_object(place):
                 self.place_map.add(place_handle)
@@ -168,7 +186,7 @@ class HasTextMatchingSubstringOf(Rule):
         if not media_handle:
             return False
         # search inside the media object and cache the result
-        if media_handle not in self.media_map:
+        if media_handle not in self.media_map and self.may_match("Media", media_handle):
             media = self.db.get_media_from_handle(media_handle)
             if self.match_object(media):
                 self.media_map.add(media_handle)
@@ -200,6 +218,15 @@ class HasTextMatchingSubstringOf(Rule):
                         "cache_sources repomatch %s string %s source %s"
                         % (match, self.list[0], source.gramps_id)
                     )
+            if not match and self.candidates.get("Citation") is not None:
+                # Skip the referents unless a citation may match
+                if not any(
+                    self.may_match("Citation", citation_handle)
+                    for _class, citation_handle in self.db.find_backlink_handles(
+                        source.handle, ["Citation"]
+                    )
+                ):
+                    continue
             (
                 citation_list,
                 citation_referents_list,
@@ -236,9 +263,18 @@ class HasTextMatchingSubstringOf(Rule):
                     self.media_map.update(media_list)
                     self.repo_map.update(repo_list)
 
+    def may_match(self, class_name, handle):
+        """
+        Return False if the text index rules out a match of the object.
+        """
+        handles = self.candidates.get(class_name)
+        return handles is None or handle in handles
+
     def match_object(self, obj):
         if not obj:
             return False
+        if not self.may_match(obj.__class__.__name__, obj.handle):
+            return False
         if self.use_regex:
             return obj.matches_regexp(self.list[0], self.case_sensitive)
         return obj.matches_string(self.list[0], self.case_sensitive)
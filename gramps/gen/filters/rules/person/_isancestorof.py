@@ -32,7 +32,7 @@ _ = glocale.translation.gettext
 # Gramps modules
 #
 # -------------------------------------------------------------------------
-from .. import Rule
+from .. import Rule, Closure
 
 
 # -------------------------------------------------------------------------
@@ -52,6 +52,7 @@ class IsAncestorOf(Rule):
         """Assume that if 'Inclusive' not defined, assume inclusive"""
         self.db = db
         self.map = set()
+        self.closure = Closure.acquire(db)
         try:
             first = 0 if int(self.list[1]) else 1
         except IndexError:
@@ -63,6 +64,7 @@ class IsAncestorOf(Rule):
             pass
 
     def reset(self):
+        self.closure.release()
         self.map.clear()
 
     def apply(self, db, person):
@@ -71,18 +73,6 @@ class IsAncestorOf(Rule):
     def init_ancestor_list(self, db, person, first):
         if not person:
             return
-        if person.handle in self.map:
-            return
         if not first:
             self.map.add(person.handle)
-        fam_id = person.get_main_parents_family_handle()
-        if fam_id:
-            fam = db.get_family_from_handle(fam_id)
-            if fam:
-                f_id = fam.get_father_handle()
-                m_id = fam.get_mother_handle()
-
-                if f_id:
-                    self.init_ancestor_list(db, db.get_person_from_handle(f_id), 0)
-                if m_id:
-                    self.init_ancestor_list(db, db.get_person_from_handle(m_id), 0)
+        self.map.update(self.closure.get_ancestors(person.handle))
@@ -32,6 +32,7 @@ _ = glocale.translation.gettext
 # Gramps modules
 #
 # -------------------------------------------------------------------------
+from .. import Closure
 from ._isancestorof import IsAncestorOf
 from ._matchesfilter import MatchesFilter
 
@@ -55,6 +56,7 @@ class IsAncestorOfFilterMatch(IsAncestorOf):
     def prepare(self, db, user):
         self.db = db
         self.map = set()
+        self.closure = Closure.acquire(db)
         try:
             if int(self.list[1]):
                 first = 0
@@ -81,6 +83,7 @@ class IsAncestorOfFilterMatch(IsAncestorOf):
 
     def reset(self):
         self.filt.requestreset()
+        self.closure.release()
         self.map.clear()
 
     def apply(self, db, person):
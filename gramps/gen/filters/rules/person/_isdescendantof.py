@@ -32,7 +32,7 @@ _ = glocale.translation.gettext
 # Gramps modules
 #
 # -------------------------------------------------------------------------
-from .. import Rule
+from .. import Rule, Closure
 
 
 # -------------------------------------------------------------------------
@@ -52,6 +52,7 @@ class IsDescendantOf(Rule):
     def prepare(self, db, user):
         self.db = db
         self.map = set()
+        self.closure = Closure.acquire(db)
         try:
             first = False if int(self.list[1]) else True
         except IndexError:
@@ -63,20 +64,15 @@ class IsDescendantOf(Rule):
             pass
 
     def reset(self):
+        self.closure.release()
         self.map.clear()
 
     def apply(self, db, person):
         return person.handle in self.map
 
     def init_list(self, person, first):
-        if not person or person.handle in self.map:
-            # if we have been here before, skip
+        if not person:
             return
         if not first:
             self.map.add(person.handle)
-
-        for fam_id in person.get_family_handle_list():
-            fam = self.db.get_family_from_handle(fam_id)
-            if fam:
-                for child_ref in fam.get_child_ref_list():
-                    self.init_list(self.db.get_person_from_handle(child_ref.ref), 0)
+        self.map.update(self.closure.get_descendants(person.handle))
@@ -33,7 +33,7 @@ _ = glocale.translation.gettext
 # Gramps modules
 #
 # -------------------------------------------------------------------------
-from .. import Rule
+from .. import Rule, Closure
 
 
 # -------------------------------------------------------------------------
@@ -56,34 +56,26 @@ class IsDuplicatedAncestorOf(Rule):
         self.db = db
         self.map = set()
         self.map2 = set()
+        self.closure = Closure.acquire(db)
         root_person = db.get_person_from_gramps_id(self.list[0])
         if root_person:
-            self.init_ancestor_list(db, root_person)
+            self.init_ancestor_list(root_person.handle)
 
     def reset(self):
+        self.closure.release()
         self.map.clear()
         self.map2.clear()
 
     def apply(self, db, person):
         return person.handle in self.map2
 
-    def init_ancestor_list(self, db, person):
-        fam_id = person.get_main_parents_family_handle()
-        if fam_id:
-            fam = db.get_family_from_handle(fam_id)
-            if fam:
-                f_id = fam.get_father_handle()
-                m_id = fam.get_mother_handle()
-                if m_id:
-                    self.go_deeper(db, db.get_person_from_handle(m_id))
-                if f_id:
-                    self.go_deeper(db, db.get_person_from_handle(f_id))
-
-    def go_deeper(self, db, person):
-        if person and person.handle in self.map:
-            self.map2.add((person.handle))
-            # the following keeps from scanning same parts of tree multiple
-            # times and avoids crash on tree loops.
-            return
-        self.map.add((person.handle))
-        self.init_ancestor_list(db, person)
+    def init_ancestor_list(self, root_handle):
+        # An ancestor is duplicated when it is the parent of two people in
+        # the tree of the root person.
+        people = self.closure.get_ancestors(root_handle) | {root_handle}
+        for handle in people:
+            for parent in self.closure.get_parents(handle):
+                if parent in self.map:
+                    self.map2.add(parent)
+                else:
+                    self.map.add(parent)
@@ -32,7 +32,7 @@ _ = glocale.translation.gettext
 # Gramps modules
 #
 # -------------------------------------------------------------------------
-from .. import Rule
+from .. import Rule, Closure
 
 
 # -------------------------------------------------------------------------
@@ -55,6 +55,7 @@ class IsLessThanNthGenerationAncestorOf(Rule):
     def prepare(self, db, user):
         self.db = db
         self.map = set()
+        self.closure = Closure.acquire(db)
         person = db.get_person_from_gramps_id(self.list[0])
         if person:
             root_handle = person.get_handle()
@@ -62,29 +63,14 @@ class IsLessThanNthGenerationAncestorOf(Rule):
                 self.init_ancestor_list(root_handle)
 
     def init_ancestor_list(self, root_handle):
-        queue = [(root_handle, 1)]  # generation 1 is root
-        while queue:
-            handle, gen = queue.pop(0)  # pop off front of queue
-            if handle in self.map:
-                # if we have been here before, skip
-                continue
-            self.map.add(handle)
-            gen += 1
-            if gen <= int(self.list[1]):
-                p = self.db.get_person_from_handle(handle)
-                fam_id = p.get_main_parents_family_handle()
-                if fam_id:
-                    fam = self.db.get_family_from_handle(fam_id)
-                    if fam:
-                        f_id = fam.get_father_handle()
-                        m_id = fam.get_mother_handle()
-                        # append to back of queue:
-                        if f_id:
-                            queue.append((f_id, gen))
-                        if m_id:
-                            queue.append((m_id, gen))
+        # generation 1 is root
+        self.map.add(root_handle)
+        depth = int(self.list[1]) - 1
+        if depth > 0:
+            self.map.update(self.closure.get_ancestors(root_handle, depth))
 
     def reset(self):
+        self.closure.release()
         self.map.clear()
 
     def apply(self, db, person):
@@ -37,7 +37,7 @@ except:
 # Gramps modules
 #
 # -------------------------------------------------------------------------
-from .. import Rule
+from .. import Rule, Closure
 
 
 # -------------------------------------------------------------------------
@@ -62,6 +62,7 @@ class IsLessThanNthGenerationAncestorOfBookmarked(Rule):
         self.db = db
         bookmarks = db.get_bookmarks().get()
         self.map = set()
+        self.closure = Closure.acquire(db)
         if len(bookmarks) == 0:
             self.apply = lambda db, p: False
         else:
@@ -71,32 +72,16 @@ class IsLessThanNthGenerationAncestorOfBookmarked(Rule):
                 self.init_ancestor_list(self.bookmarkhandle, 1)
 
     def init_ancestor_list(self, handle, gen):
-        #        if p.get_handle() in self.map:
-        #            loop_error(self.orig,p)
-        if not handle or handle in self.map:
-            # if been here already, skip
+        if not handle:
             return
-        if gen:
-            self.map.add(handle)
-            if gen >= int(self.list[0]):
-                return
-
-        p = self.db.get_person_from_handle(handle)
-        fam_id = p.get_main_parents_family_handle()
-        if not fam_id:
-            return
-        fam = self.db.get_family_from_handle(fam_id)
-        if fam:
-            f_id = fam.get_father_handle()
-            m_id = fam.get_mother_handle()
-
-            if f_id:
-                self.init_ancestor_list(f_id, gen + 1)
-            if m_id:
-                self.init_ancestor_list(m_id, gen + 1)
+        self.map.add(handle)
+        depth = int(self.list[0]) - gen
+        if depth > 0:
+            self.map.update(self.closure.get_ancestors(handle, depth))
 
     def apply_real(self, db, person):
         return person.handle in self.map
 
     def reset(self):
+        self.closure.release()
         self.map.clear()
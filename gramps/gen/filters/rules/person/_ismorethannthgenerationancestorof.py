@@ -32,7 +32,7 @@ _ = glocale.translation.gettext
 # Gramps modules
 #
 # -------------------------------------------------------------------------
-from .. import Rule
+from .. import Rule, Closure
 
 
 # -------------------------------------------------------------------------
@@ -55,6 +55,7 @@ class IsMoreThanNthGenerationAncestorOf(Rule):
     def prepare(self, db, user):
         self.db = db
         self.map = set()
+        self.closure = Closure.acquire(db)
         person = db.get_person_from_gramps_id(self.list[0])
         if person:
             root_handle = person.get_handle()
@@ -62,26 +63,10 @@ class IsMoreThanNthGenerationAncestorOf(Rule):
                 self.init_ancestor_list(root_handle)
 
     def init_ancestor_list(self, root_handle):
-        queue = [(root_handle, 1)]  # generation 1 is root
-        while queue:
-            handle, gen = queue.pop(0)  # pop off front of queue
-            if gen > int(self.list[1]):
-                self.map.add(handle)
-            gen += 1
-            p = self.db.get_person_from_handle(handle)
-            fam_id = p.get_main_parents_family_handle()
-            if fam_id:
-                fam = self.db.get_family_from_handle(fam_id)
-                if fam:
-                    f_id = fam.get_father_handle()
-                    m_id = fam.get_mother_handle()
-                    # append to back of queue:
-                    if f_id:
-                        queue.append((f_id, gen))
-                    if m_id:
-                        queue.append((m_id, gen))
+        self.map.update(self.closure.get_far_ancestors(root_handle, int(self.list[1])))
 
     def reset(self):
+        self.closure.release()
         self.map.clear()
 
     def apply(self, db, person):
@@ -32,7 +32,7 @@ _ = glocale.translation.gettext
 # Gramps modules
 #
 # -------------------------------------------------------------------------
-from .. import Rule
+from .. import Rule, Closure
 
 
 # -------------------------------------------------------------------------
@@ -55,6 +55,7 @@ class IsMoreThanNthGenerationDescendantOf(Rule):
     def prepare(self, db, user):
         self.db = db
         self.map = set()
+        self.closure = Closure.acquire(db)
         try:
             root_person = db.get_person_from_gramps_id(self.list[0])
             self.init_list(root_person, 0)
@@ -62,6 +63,7 @@ class IsMoreThanNthGenerationDescendantOf(Rule):
             pass
 
     def reset(self):
+        self.closure.release()
         self.map.clear()
 
     def apply(self, db, person):
@@ -70,13 +72,6 @@ class IsMoreThanNthGenerationDescendantOf(Rule):
     def init_list(self, person, gen):
         if not person:
             return
-        if gen >= int(self.list[1]):
-            self.map.add(person.handle)
-
-        for fam_id in person.get_family_handle_list():
-            fam = self.db.get_family_from_handle(fam_id)
-            if fam:
-                for child_ref in fam.get_child_ref_list():
-                    self.init_list(
-                        self.db.get_person_from_handle(child_ref.ref), gen + 1
-                    )
+        self.map.update(
+            self.closure.get_far_descendants(person.handle, int(self.list[1]))
+        )
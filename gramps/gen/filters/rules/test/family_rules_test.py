@@ -317,6 +317,24 @@ class BaseTest(unittest.TestCase):
         rule = ChildHasIdOf(["I0001"])
         self.assertEqual(self.filter_with_rule(rule), set(["48TJQCGNNIR5SJRCAK"]))
 
+    def test_member_rules_sql(self):
+        """
+        Test that the rules on the members of a family are not evaluated
+        in SQL on the family.
+        """
+        rules = [
+            FatherHasIdOf(["I0106"]),
+            MotherHasIdOf(["I0107"]),
+            ChildHasIdOf(["I0001"]),
+            FatherHasNameOf(["", "", "Dr.", "", "", "", "", "", "", "", ""]),
+        ]
+        for rule in rules:
+            self.assertIsNone(rule.to_sql(self.db))
+        filter_ = GenericFamilyFilter()
+        filter_.add_rule(rules[0])
+        filter_.add_rule(rules[1])
+        self.assertEqual(set(filter_.apply(self.db)), set(["8OUJQCUVZ0XML7BQLF"]))
+
     def test_changedsince(self):
         """
         Test ChangedSince rule.
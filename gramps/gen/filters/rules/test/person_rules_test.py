@@ -94,6 +94,7 @@ from ..person import (
     PeoplePublic,
     PersonWithIncompleteEvent,
     ProbablyAlive,
+    RegExpIdOf,
     RegExpName,
     RelationshipPathBetweenBookmarks,
 )
@@ -1270,6 +1271,70 @@ class BaseTest(unittest.TestCase):
         )
         self.assertEqual(self.filter_with_rule(rule), set(["GNUJQCL9MD64AM56OH"]))
 
+    def test_sql_pushdown(self):
+        """
+        Test that the simple rules of a filter are evaluated in SQL, with the
+        same results as in Python.
+        """
+        filter_ = GenericFilter()
+        filter_.set_rules(
+            [
+                IsMale([]),
+                RegExpIdOf(["I00[0-4]"], use_regex=True),
+                HasNameOf(["", "Garner"] + [""] * 9),
+            ]
+        )
+        handles = self.db.get_person_handles()
+        for invert in (False, True):
+            filter_.set_invert(invert)
+            results = filter_.apply(self.db)
+            self.assertEqual(
+                [rule.__class__.__name__ for rule in filter_.pushed_rules],
+                ["IsMale", "RegExpIdOf"],
+            )
+            self.assertEqual(set(results), set(filter_.apply(self.db, handles)))
+            self.assertEqual(filter_.pushed_rules, [])
+            self.assertEqual("GNUJQCL9MD64AM56OH" in results, not invert)
+
+    def test_shared_closure(self):
+        """
+        Test that the ancestral rules of a filter run walk the tree once,
+        with the same results as one at a time.
+        """
+        rule1 = IsLessThanNthGenerationAncestorOf(["I0005", 10])
+        rule2 = IsMoreThanNthGenerationAncestorOf(["I0005", 3])
+        expected = self.filter_with_rule(rule1) & self.filter_with_rule(rule2)
+        for rule in (rule1, rule2):
+            rule.requestprepare(self.db, None)
+        self.assertIs(rule1.closure, rule2.closure)
+        for rule in (rule1, rule2):
+            rule.requestreset()
+        self.assertEqual(self.filter_with_rule([rule1, rule2]), expected)
+
+    def test_rule_order(self):
+        """
+        Test that the rules are evaluated cheapest first, with the same
+        results as in the order of the filter, and that their statistics
+        are recorded.
+        """
+        text = HasTextMatchingRegexpOf(
+            [".*(Dahl|Akron|Smith|Attic|" "of Lessard).*", False], use_regex=True
+        )
+        female = IsFemale([])
+        handles = self.db.get_person_handles()
+        expected = set(self.filter_with_rule(text)) & set(self.filter_with_rule(female))
+        filter_ = GenericFilter()
+        filter_.set_rules([text, female])
+        self.assertEqual(set(filter_.apply(self.db, handles)), expected)
+        stats = dict(filter_.get_rule_stats())
+        self.assertLess(stats[text].calls, len(handles))
+        filter_.set_logical_op("or")
+        filter_.reset_rule_stats()
+        expected = set(self.filter_with_rule(text)) | set(self.filter_with_rule(female))
+        self.assertEqual(set(filter_.apply(self.db, handles)), expected)
+        stats = dict(filter_.get_rule_stats())
+        self.assertLess(stats[text].calls, len(handles))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -229,6 +229,7 @@ class GrampsType(object, metaclass=GrampsTypeMeta):
             "title": _("Type"),
             "properties": {
                 "_class": {"enum": [cls.__name__]},
+                "value": {"type": "integer", "title": _("Value")},
                 "string": {"type": "string", "title": _("Type")},
             },
         }
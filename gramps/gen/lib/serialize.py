@@ -40,6 +40,7 @@ import gramps.gen.lib as lib
 def __default(obj):
     obj_dict = {"_class": obj.__class__.__name__}
     if isinstance(obj, lib.GrampsType):
+        obj_dict["value"] = getattr(obj, "value")
         obj_dict["string"] = getattr(obj, "string")
     if isinstance(obj, lib.Date):
         if obj.is_empty() and not obj.text:
@@ -56,7 +57,14 @@ def __default(obj):
 
 def __object_hook(obj_dict):
     obj = getattr(lib, obj_dict["_class"])()
+    standard_type = (
+        isinstance(obj, lib.GrampsType)
+        and obj_dict.get("value", obj._CUSTOM) != obj._CUSTOM
+    )
     for key, value in obj_dict.items():
+        if key == "string" and standard_type:
+            # The integer value of a standard type does not depend on the locale
+            continue
         if key != "_class":
             if key in ("dateval", "rect") and value is not None:
                 value = tuple(value)
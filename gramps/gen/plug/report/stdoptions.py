@@ -139,6 +139,7 @@ def run_private_data_option(report, menu):
     include_private_data = menu.get_option_by_name("incl_private").get_value()
     if not include_private_data:
         report.database = PrivateProxyDb(report.database)
+        report.database.memoize()
 
 
 def add_living_people_option(
@@ -253,6 +254,7 @@ def run_living_people_option(report, menu, llocale=glocale):
             years_after_death=years_past_death,
             llocale=llocale,
         )
+        report.database.memoize()
     return option
 
 
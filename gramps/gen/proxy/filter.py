@@ -58,30 +58,54 @@ class FilterProxyDb(ProxyDbBase):
     """
 
     def __init__(
-        self, db, person_filter=None, event_filter=None, note_filter=None, user=None
+        self,
+        db,
+        person_filter=None,
+        event_filter=None,
+        note_filter=None,
+        user=None,
+        processes=None,
     ):
         """
         Create a new FilterProxyDb instance.
+
+        processes is the number of worker processes applying each filter,
+        by default the database.filter-processes setting.
         """
         ProxyDbBase.__init__(self, db)
         self.person_filter = person_filter
         if person_filter:
             self.plist = set(
-                person_filter.apply(self.db, self.db.iter_person_handles(), user=user)
+                person_filter.apply(
+                    self.db,
+                    self.db.iter_person_handles(),
+                    user=user,
+                    processes=processes,
+                )
             )
         else:
             self.plist = set(self.db.iter_person_handles())
 
         if event_filter:
             self.elist = set(
-                event_filter.apply(self.db, self.db.iter_event_handles(), user=user)
+                event_filter.apply(
+                    self.db,
+                    self.db.iter_event_handles(),
+                    user=user,
+                    processes=processes,
+                )
             )
         else:
             self.elist = set(self.db.iter_event_handles())
 
         if note_filter:
             self.nlist = set(
-                note_filter.apply(self.db, self.db.iter_note_handles(), user=user)
+                note_filter.apply(
+                    self.db,
+                    self.db.iter_note_handles(),
+                    user=user,
+                    processes=processes,
+                )
             )
         else:
             self.nlist = set(self.db.iter_note_handles())
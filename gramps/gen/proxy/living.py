@@ -45,7 +45,7 @@ from ..lib import (
     Note,
     Tag,
 )
-from ..utils.alive import probably_alive
+from ..utils.alive import get_bulk_probably_alive
 from ..config import config
 from ..const import GRAMPS_LOCALE as glocale
 
@@ -258,8 +258,8 @@ class LivingProxyDb(ProxyDbBase):
         """
         person_handle = person.get_handle()
         unfil_person = self.get_unfiltered_person(person_handle)
-        return probably_alive(
-            unfil_person, self.db, self.current_date, self.years_after_death
+        return get_bulk_probably_alive(self.db).probably_alive(
+            unfil_person, self.current_date, self.years_after_death
         )
 
     def __remove_living_from_family(self, family):
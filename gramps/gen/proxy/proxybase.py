@@ -28,6 +28,7 @@ Proxy class for the Gramps databases. Filter out all data marked private.
 # Python modules
 #
 # -------------------------------------------------------------------------
+import pickle
 import types
 
 # -------------------------------------------------------------------------
@@ -49,6 +50,24 @@ from ..lib import (
     Tag,
 )
 from ..const import GRAMPS_LOCALE as glocale
+from ..utils.lru import LRU
+
+# Classes of the objects kept by ProxyDbBase.memoize, by name
+MEMO_CLASSES = {
+    "person": Person,
+    "family": Family,
+    "event": Event,
+    "place": Place,
+    "source": Source,
+    "citation": Citation,
+    "repository": Repository,
+    "media": Media,
+    "note": Note,
+    "tag": Tag,
+}
+
+# Number of objects and lookups kept by each memoized proxy
+MEMO_SIZE = 131071
 
 
 class ProxyCursor:
@@ -104,6 +123,8 @@ class ProxyDbBase(DbReadBase):
     database interface is properly implemented.
     """
 
+    __memo = None
+
     def __init__(self, db):
         """
         Create a new ProxyDb instance.
@@ -145,6 +166,61 @@ class ProxyDbBase(DbReadBase):
         """
         return self.db.is_open()
 
+    def memoize(self):
+        """
+        Keep the objects returned by this proxy, and by the proxies below it,
+        for the life of the proxy.
+
+        Each proxy then sanitizes or filters an object once, however often
+        it is asked for, by the caller or by the proxies above it.  The
+        objects are kept serialized and pickled, as the serialized data
+        shares its lists with the object, and each request gets a new copy
+        that the caller may change.  Only use this while the database does not
+        change, as in an export or a report.
+        """
+        proxy = self
+        while isinstance(proxy, ProxyDbBase):
+            proxy.__memoize()
+            proxy = proxy.db
+
+    def __memoize(self):
+        """
+        Replace the lookups by handle of this proxy with memoized ones.
+        """
+        if self.__memo is not None:
+            return
+        self.__memo = LRU(MEMO_SIZE)
+        for name, obj_class in MEMO_CLASSES.items():
+            self.__memoize_get("get_%s_from_handle" % name, obj_class)
+            self.__memoize_has("has_%s_handle" % name)
+
+    def __memoize_get(self, name, obj_class):
+        method = getattr(self, name)
+        memo = self.__memo
+
+        def get_from_handle(handle):
+            key = (name, handle)
+            if key in memo:
+                data = memo[key]
+                return None if data is None else obj_class.create(pickle.loads(data))
+            obj = method(handle)
+            memo[key] = None if obj is None else pickle.dumps(obj.serialize())
+            return obj
+
+        setattr(self, name, get_from_handle)
+
+    def __memoize_has(self, name):
+        method = getattr(self, name)
+        memo = self.__memo
+
+        def has_handle(handle):
+            key = (name, handle)
+            if key not in memo:
+                memo[key] = method(handle)
+            return memo[key]
+
+        setattr(self, name, has_handle)
+
     def get_researcher(self):
         """returns the Researcher instance, providing information about
         the owner of the database"""
@@ -67,6 +67,8 @@ class ReferencedBySelectionProxyDb(ProxyDbBase):
         # If restricted_to["Person"] is a set, restrict process to
         # them, and do not process others outside of them
         self.restricted_to = {"Person": None}
+        if self.find_references(all_people):
+            return
         # Build lists of referenced objects
         # iter through whatever object(s) you want to start
         # the trace.
@@ -95,6 +97,32 @@ class ReferencedBySelectionProxyDb(ProxyDbBase):
             obj_type, handle, reference = self.queue.pop()
             self.process_object(obj_type, handle, reference)
 
+    def find_references(self, all_people):
+        """
+        Find the referenced objects from the reference table of the
+        database, without reading the objects, if the database can.
+        Return False if it cannot.
+
+        The objects found are those of the walk below: the references of
+        each object are followed, and so are the people and families
+        referring to a person.  Without all_people, the walk starts from
+        every person but only adds the people reached from another object.
+        """
+        backlinks = {"Person": ("Person", "Family")}
+        people = {handle for handle in self.db.iter_person_handles() if handle}
+        closure = self.db.get_reference_closure(
+            [("Person", handle) for handle in people], all_people, backlinks
+        )
+        if closure is None:
+            return False
+        closure["Person"] = closure.get("Person", set()) & people
+        # an empty set restricts nothing, as after the walk without all_people
+        self.restricted_to["Person"] = people if all_people else set()
+        for class_name, handles in closure.items():
+            if class_name in self.referenced:
+                self.referenced[class_name] = handles
+        return True
+
     def queue_object(self, obj_type, handle, reference=True):
         self.queue.append((obj_type, handle, reference))
 
@@ -0,0 +1,203 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+# -------------------------------------------------------------------------
+#
+# Standard python modules
+#
+# -------------------------------------------------------------------------
+import unittest
+
+# -------------------------------------------------------------------------
+#
+# Gramps modules
+#
+# -------------------------------------------------------------------------
+from ...db import DbTxn
+from ...db.utils import make_database
+from ...lib import (
+    ChildRef,
+    Citation,
+    Date,
+    Event,
+    EventRef,
+    EventType,
+    Family,
+    Note,
+    Person,
+    Place,
+    Source,
+    Tag,
+)
+from .. import LivingProxyDb, PrivateProxyDb, ReferencedBySelectionProxyDb
+
+
+# -------------------------------------------------------------------------
+#
+# MemoizeTest class
+#
+# -------------------------------------------------------------------------
+class MemoizeTest(unittest.TestCase):
+    """
+    Tests for the memoized proxies.
+    """
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+        with DbTxn("Add people", self.db) as trans:
+            self.events = []
+            for private in (False, True):
+                event = Event()
+                event.set_privacy(private)
+                if not private:
+                    # born long ago, so the living proxy keeps the events
+                    event.set_type(EventType.BIRTH)
+                    event.set_date_object(Date(1800))
+                self.db.add_event(event, trans)
+                self.events.append(event)
+            self.person = Person()
+            for event in self.events:
+                event_ref = EventRef()
+                event_ref.ref = event.handle
+                self.person.add_event_ref(event_ref)
+            self.person.set_birth_ref(self.person.get_event_ref_list()[0])
+            self.db.add_person(self.person, trans)
+            self.private = Person()
+            self.private.set_privacy(True)
+            self.db.add_person(self.private, trans)
+
+    def tearDown(self):
+        self.db.close(update=False)
+
+    def __make_proxy(self):
+        return LivingProxyDb(
+            PrivateProxyDb(self.db), LivingProxyDb.MODE_INCLUDE_LAST_NAME_ONLY
+        )
+
+    def test_same_objects(self):
+        proxy = self.__make_proxy()
+        memoized = self.__make_proxy()
+        memoized.memoize()
+        for _index in range(2):
+            self.assertEqual(
+                memoized.get_person_from_handle(self.person.handle).serialize(),
+                proxy.get_person_from_handle(self.person.handle).serialize(),
+            )
+            self.assertIsNone(memoized.get_person_from_handle(self.private.handle))
+            self.assertTrue(memoized.has_event_handle(self.events[0].handle))
+            self.assertFalse(memoized.has_event_handle(self.events[1].handle))
+
+    def test_copies(self):
+        proxy = self.__make_proxy()
+        proxy.memoize()
+        person = proxy.get_person_from_handle(self.person.handle)
+        person.set_gramps_id("X0001")
+        self.assertNotEqual(
+            proxy.get_person_from_handle(self.person.handle).get_gramps_id(),
+            "X0001",
+        )
+        person.get_event_ref_list().clear()
+        person.add_family_handle(self.private.handle)
+        person = proxy.get_person_from_handle(self.person.handle)
+        self.assertEqual(len(person.get_event_ref_list()), 1)
+        self.assertEqual(person.get_family_handle_list(), [])
+
+
+# -------------------------------------------------------------------------
+#
+# ReferencedBySelectionTest class
+#
+# -------------------------------------------------------------------------
+class ReferencedBySelectionTest(unittest.TestCase):
+    """
+    Tests for the references found from the reference table.
+    """
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+        with DbTxn("Add objects", self.db) as trans:
+            tag = Tag()
+            tag.set_name("Tag")
+            self.db.add_tag(tag, trans)
+            source = Source()
+            self.db.add_source(source, trans)
+            citation = Citation()
+            citation.set_reference_handle(source.handle)
+            self.db.add_citation(citation, trans)
+            place = Place()
+            self.db.add_place(place, trans)
+            event = Event()
+            event.set_place_handle(place.handle)
+            event.add_citation(citation.handle)
+            self.db.add_event(event, trans)
+            note = Note()
+            note.add_tag(tag.handle)
+            self.db.add_note(note, trans)
+            father = Person()
+            event_ref = EventRef()
+            event_ref.ref = event.handle
+            father.add_event_ref(event_ref)
+            self.db.add_person(father, trans)
+            child = Person()
+            child.add_note(note.handle)
+            self.db.add_person(child, trans)
+            family = Family()
+            family.set_father_handle(father.handle)
+            child_ref = ChildRef()
+            child_ref.ref = child.handle
+            family.add_child_ref(child_ref)
+            self.db.add_family(family, trans)
+            father.add_family_handle(family.handle)
+            self.db.commit_person(father, trans)
+            child.add_parent_family_handle(family.handle)
+            self.db.commit_person(child, trans)
+            # An orphan, with an event of its own
+            orphan = Person()
+            event = Event()
+            self.db.add_event(event, trans)
+            event_ref = EventRef()
+            event_ref.ref = event.handle
+            orphan.add_event_ref(event_ref)
+            self.db.add_person(orphan, trans)
+
+    def tearDown(self):
+        self.db.close(update=False)
+
+    def test_same_references(self):
+        for all_people in (True, False):
+            proxy = ReferencedBySelectionProxyDb(self.db, all_people)
+            # The walk, as the private proxy cannot use the reference table
+            walked = ReferencedBySelectionProxyDb(PrivateProxyDb(self.db), all_people)
+            for class_name, handles in walked.referenced.items():
+                self.assertEqual(proxy.referenced[class_name], handles)
+            self.assertEqual(
+                set(proxy.restricted_to["Person"]),
+                set(walked.restricted_to["Person"]),
+            )
+        self.assertEqual(len(proxy.referenced["Person"]), 2)
+        # the event of the orphan is kept, as in the walk
+        self.assertEqual(len(proxy.referenced["Event"]), 2)
+        self.assertEqual(len(proxy.referenced["Tag"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
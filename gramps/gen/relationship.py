@@ -26,7 +26,9 @@ Classes for relationships.
 # Python modules
 #
 # -------------------------------------------------------------------------
+import copy
 import logging
+import weakref
 
 # -------------------------------------------------------------------------
 #
@@ -36,6 +38,7 @@ import logging
 from .lib import Person, ChildRefType, EventType, FamilyRelType
 from .plug import PluginRegister, BasePluginManager
 from .const import GRAMPS_LOCALE as glocale
+from .errors import HandleError
 
 _ = glocale.translation.sgettext
 
@@ -949,6 +952,12 @@ class RelationshipCalculator:
         self.map_handle = None
         self.map_meta = None
         self.__db_connected = False
+        # paths to the common ancestors with an anchor person, by person
+        self.__anchor_db = None
+        self.__anchor_key = None
+        self.__anchor_map = None
+        self.__anchor_crosslinks = False
+        self.__anchor_paths = {}
         self.depth = 15
         try:
             from .config import config
@@ -1421,6 +1430,290 @@ class RelationshipCalculator:
             self.dirtymap = False
             self.map_handle = orig_person.handle
 
+        common = self._get_common_paths(first_map, second_map)
+        # check for extra messages
+        if self.__max_depth_reached:
+            self.__msg += [
+                _(
+                    "Family Tree reaches back more than the maximum "
+                    "%d generations searched.\nIt is possible that "
+                    "relationships have been missed"
+                )
+                % (self.__max_depth)
+            ]
+
+        if common and not self.__all_dist:
+            rank = common[0][0]
+            person_handle = common[0][1]
+            first_rel = common[0][2]
+            first_fam = common[0][3]
+            second_rel = common[0][4]
+            second_fam = common[0][5]
+            return (
+                rank,
+                person_handle,
+                first_rel,
+                first_fam,
+                second_rel,
+                second_fam,
+            ), self.__msg
+        if common:
+            # list with tuples (rank, handle person,rel_str_orig,rel_fam_orig,
+            #       rel_str_other,rel_fam_str) and messages
+            return common, self.__msg
+        if not self.__all_dist:
+            return (-1, None, "", [], "", []), self.__msg
+        else:
+            return [(-1, None, "", [], "", [])], self.__msg
+
+    def get_relationship_distance_map(self, db, orig_person, handles=None):
+        """
+        Return a dictionary of the relations to orig_person of the people
+        with the given handles, or of all the people of the database, by
+        person handle. The relations are the lists of (rank, person handle,
+        firstRel_str, firstRel_fam, secondRel_str, secondRel_fam) tuples
+        which get_relationship_distance_new returns with all_families and
+        all_dist, and not only_birth. The people without a common ancestor
+        with orig_person are left out.
+
+        The paths of a person to the common ancestors are made from the
+        paths of the parents, so that the ancestors shared by the people
+        are only searched once. They are kept for orig_person until the
+        next change of a person or a family, and also serve
+        get_one_relationship.
+
+        :param db: database to work on
+        :param orig_person: the person to which the relations are sought
+        :type orig_person: Person Obj
+        :param handles: handles of the people, None for all the people
+        :type handles: list
+        """
+        if handles is None:
+            people = db.iter_people()
+        else:
+            people = (db.get_person_from_handle(handle) for handle in handles)
+        relations = {}
+        for person in people:
+            if person is None:
+                continue
+            data = self.__get_anchor_relations(db, orig_person, person)
+            if data[0][0] != -1:
+                relations[person.handle] = data
+        return relations
+
+    def get_one_relationship_map(
+        self, db, orig_person, handles=None, extra_info=False, olocale=glocale
+    ):
+        """
+        Return a dictionary of the most relevant relationships of the people
+        with the given handles, or of all the people of the database, to
+        orig_person, by person handle, as get_one_relationship returns them.
+        The people without a relationship are left out.
+
+        The searches share the paths to the common ancestors, see
+        get_relationship_distance_map.
+        """
+        if handles is None:
+            people = db.iter_people()
+        else:
+            people = (db.get_person_from_handle(handle) for handle in handles)
+        relationships = {}
+        for person in people:
+            if person is None:
+                continue
+            rel = self.get_one_relationship(
+                db, orig_person, person, extra_info=extra_info, olocale=olocale
+            )
+            if (rel[0] if extra_info else rel) != "":
+                relationships[person.handle] = rel
+        return relationships
+
+    def __get_anchor_relations(self, db, orig_person, other_person):
+        """
+        Return the relations of other_person to orig_person, as
+        get_relationship_distance_new with all_families and all_dist, and
+        not only_birth, from the stored paths of other_person.
+        """
+        try:
+            self.__load_anchor(db, orig_person)
+            paths = self.__get_anchor_paths(db, other_person)
+        except RuntimeError:
+            # a loop in the parents, forget the unfinished people
+            self.__anchor_paths = {
+                handle: paths
+                for handle, paths in self.__anchor_paths.items()
+                if paths is not None
+            }
+            paths = None
+        if paths is None or self.__has_loop(paths):
+            # the search of other_person stops at the loop, do it
+            data, msg = self.get_relationship_distance_new(
+                db,
+                orig_person,
+                other_person,
+                all_dist=True,
+                all_families=True,
+                only_birth=False,
+            )
+            return data
+        common = self._get_common_paths(self.__anchor_map, paths)
+        if common:
+            # collapse_relations changes the family lists, keep the stored
+            return copy.deepcopy(common)
+        return [(-1, None, "", [], "", [])]
+
+    def __load_anchor(self, db, orig_person):
+        """
+        Make the map of the ancestors of orig_person, unless it is stored
+        and neither the database nor the depth have changed since.
+        """
+        has_changed = getattr(db, "has_changed", None)
+        key = (orig_person.handle, self.get_depth(), has_changed)
+        if (
+            has_changed is not None
+            and key == self.__anchor_key
+            and self.__anchor_db is not None
+            and self.__anchor_db() is db
+        ):
+            return
+        self.__clear_anchor()
+        self.__max_depth_reached = False
+        self.__loop_detected = False
+        self.__max_depth = self.get_depth()
+        self.__all_families = True
+        self.__all_dist = True
+        self.__only_birth = False
+        self.__crosslinks = False
+        self.__msg = []
+        first_map = {}
+        self.__apply_filter(db, orig_person, "", [], first_map)
+        self.__anchor_db = weakref.ref(db, self.__clear_anchor)
+        self.__anchor_key = key
+        self.__anchor_map = first_map
+        self.__anchor_crosslinks = self.__crosslinks
+
+    def __clear_anchor(self, db_ref=None):
+        """
+        Forget the stored paths, also when their database is deleted.
+        """
+        if db_ref is not None and db_ref is not self.__anchor_db:
+            return
+        self.__anchor_db = None
+        self.__anchor_key = None
+        self.__anchor_map = None
+        self.__anchor_paths = {}
+
+    def __get_anchor_paths(self, db, person):
+        """
+        Return the map of the paths from person to the common ancestors with
+        the anchor person, as the second search of
+        get_relationship_distance_new makes it, from the maps of the
+        parents.
+        """
+        if person is None or not person.handle:
+            return {}
+        paths = self.__anchor_paths.get(person.handle)
+        if paths is not None:
+            return paths
+        if person.handle in self.__anchor_paths:
+            raise RuntimeError("Relationship loop detected")
+        self.__anchor_paths[person.handle] = None
+        paths = {}
+        max_len = self.__anchor_key[1] - 1
+        if max_len >= 0 and person.handle in self.__anchor_map:
+            paths[person.handle] = [[""], [[]]]
+            if not self.__anchor_crosslinks:
+                self.__anchor_paths[person.handle] = paths
+                return paths
+        for parent, addstr, fam in self.__get_parent_steps(db, person):
+            for handle, (rels, fams) in self.__get_anchor_paths(db, parent).items():
+                for rel, rel_fam in zip(rels, fams):
+                    if len(rel) < max_len:
+                        new = paths.setdefault(handle, [[], []])
+                        new[0].append(addstr + rel)
+                        new[1].append([fam] + rel_fam)
+        self.__anchor_paths[person.handle] = paths
+        return paths
+
+    def __get_parent_steps(self, db, person):
+        """
+        Return the (parent, rel_str, family number) of the parents of person
+        in the order __apply_filter searches them, with all families and not
+        only birth. The family number is a list for a parent in several
+        families.
+        """
+        parentstodo = {}
+        fam = 0
+        try:
+            for family_handle in person.get_parent_family_handle_list():
+                family = db.get_family_from_handle(family_handle)
+                if not family:
+                    continue
+                childrel = [
+                    (ref.get_mother_relation(), ref.get_father_relation())
+                    for ref in family.get_child_ref_list()
+                    if ref.ref == person.handle
+                ]
+                if not childrel:
+                    # __apply_filter gives up on the parents too
+                    return []
+                for handle, birth, notbirth, childtype in (
+                    (
+                        family.father_handle,
+                        self.REL_FATHER,
+                        self.REL_FATHER_NOTBIRTH,
+                        childrel[0][1],
+                    ),
+                    (
+                        family.mother_handle,
+                        self.REL_MOTHER,
+                        self.REL_MOTHER_NOTBIRTH,
+                        childrel[0][0],
+                    ),
+                ):
+                    if not handle:
+                        continue
+                    if handle not in parentstodo:
+                        if childtype == ChildRefType.BIRTH:
+                            addstr = birth
+                        else:
+                            addstr = notbirth
+                        parentstodo[handle] = (addstr, fam)
+                    else:
+                        addstr, famlist = parentstodo[handle]
+                        if not isinstance(famlist, list) and fam != famlist:
+                            famlist = [famlist]
+                        if isinstance(famlist, list) and fam not in famlist:
+                            parentstodo[handle] = (addstr, famlist + [fam])
+                fam += 1
+            return [
+                (db.get_person_from_handle(handle), addstr, famlist)
+                for handle, (addstr, famlist) in parentstodo.items()
+            ]
+        except HandleError:
+            return []
+
+    @staticmethod
+    def __has_loop(paths):
+        """
+        Return True if a path to a common ancestor starts with another one,
+        for which __apply_filter stops the search.
+        """
+        for rels, fams in paths.values():
+            for rel1 in rels:
+                for rel2 in rels:
+                    if len(rel1) < len(rel2) and rel1 == rel2[: len(rel1)]:
+                        return True
+        return False
+
+    def _get_common_paths(self, first_map, second_map):
+        """
+        Return the list of the paths through the common ancestors of the
+        maps of two people, as (rank, person handle, firstRel_str,
+        firstRel_fam, secondRel_str, secondRel_fam) tuples sorted by rank,
+        without the paths which extend a shorter one.
+        """
+        common = []
         for person_handle in second_map:
             if person_handle in first_map:
                 com = []
@@ -1484,40 +1777,7 @@ class RelationshipCalculator:
                         deletelist.reverse()
                         for index in deletelist:
                             del common[index]
-        # check for extra messages
-        if self.__max_depth_reached:
-            self.__msg += [
-                _(
-                    "Family Tree reaches back more than the maximum "
-                    "%d generations searched.\nIt is possible that "
-                    "relationships have been missed"
-                )
-                % (self.__max_depth)
-            ]
-
-        if common and not self.__all_dist:
-            rank = common[0][0]
-            person_handle = common[0][1]
-            first_rel = common[0][2]
-            first_fam = common[0][3]
-            second_rel = common[0][4]
-            second_fam = common[0][5]
-            return (
-                rank,
-                person_handle,
-                first_rel,
-                first_fam,
-                second_rel,
-                second_fam,
-            ), self.__msg
-        if common:
-            # list with tuples (rank, handle person,rel_str_orig,rel_fam_orig,
-            #       rel_str_other,rel_fam_str) and messages
-            return common, self.__msg
-        if not self.__all_dist:
-            return (-1, None, "", [], "", []), self.__msg
-        else:
-            return [(-1, None, "", [], "", [])], self.__msg
+        return common
 
     def __apply_filter(
         self, db, person, rel_str, rel_fam, pmap, depth=1, stoprecursemap=None
@@ -1921,14 +2181,7 @@ class RelationshipCalculator:
             else:
                 return rel_str
 
-        data, msg = self.get_relationship_distance_new(
-            db,
-            orig_person,
-            other_person,
-            all_dist=True,
-            all_families=True,
-            only_birth=False,
-        )
+        data = self.__get_anchor_relations(db, orig_person, other_person)
         if data[0][0] == -1:
             if extra_info:
                 return ("", -1, -1)
@@ -2555,6 +2808,7 @@ class RelationshipCalculator:
         list(map(dbstate.db.disconnect, self.signal_keys))
         self.storemap = False
         self.stored_map = None
+        self.__clear_anchor()
 
     def _dbchange_callback(self, db):
         """
@@ -2562,6 +2816,7 @@ class RelationshipCalculator:
         Connects must be remade
         """
         self.dirtymap = True
+        self.__clear_anchor()
         # signals are disconnected on close of old database, connect to new
         self.__connect_db_signals(db)
 
@@ -2573,6 +2828,7 @@ class RelationshipCalculator:
         will be checked
         """
         self.dirtymap = True
+        self.__clear_anchor()
 
 
 # -------------------------------------------------------------------------
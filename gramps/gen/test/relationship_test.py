@@ -0,0 +1,144 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Unittest for relationship.py """
+
+# -------------------------------------------------------------------------
+#
+# Standard python modules
+#
+# -------------------------------------------------------------------------
+import unittest
+
+# -------------------------------------------------------------------------
+#
+# Gramps modules
+#
+# -------------------------------------------------------------------------
+from ..db import DbTxn
+from ..db.utils import make_database
+from ..lib import ChildRef, ChildRefType, Family, Person
+from ..relationship import RelationshipCalculator
+
+
+# -------------------------------------------------------------------------
+#
+# RelationshipMapTest class
+#
+# -------------------------------------------------------------------------
+class RelationshipMapTest(unittest.TestCase):
+    """
+    Tests for the relations of all the people to one person.
+    """
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+        self.rcalc = RelationshipCalculator()
+        with DbTxn("Add people", self.db) as trans:
+            self.grandfather = self.__add_person(trans, Person.MALE)
+            grandmother = self.__add_person(trans, Person.FEMALE)
+            second_wife = self.__add_person(trans, Person.FEMALE)
+            self.father = self.__add_person(trans, Person.MALE)
+            mother = self.__add_person(trans, Person.FEMALE)
+            self.aunt = self.__add_person(trans, Person.FEMALE)
+            self.half_uncle = self.__add_person(trans, Person.MALE)
+            self.home = self.__add_person(trans, Person.MALE)
+            self.cousin = self.__add_person(trans, Person.FEMALE)
+            self.stranger = self.__add_person(trans, Person.MALE)
+            self.__add_family(
+                trans, self.grandfather, grandmother, [self.father, self.aunt]
+            )
+            self.__add_family(trans, self.grandfather, second_wife, [self.half_uncle])
+            self.__add_family(trans, self.father, mother, [self.home])
+            self.__add_family(
+                trans, None, self.aunt, [self.cousin], ChildRefType.ADOPTED
+            )
+
+    def tearDown(self):
+        self.db.close(update=False)
+
+    def __add_person(self, trans, gender):
+        person = Person()
+        person.set_gender(gender)
+        self.db.add_person(person, trans)
+        return person
+
+    def __add_family(self, trans, father, mother, children, rel=ChildRefType.BIRTH):
+        family = Family()
+        self.db.add_family(family, trans)
+        for parent in (father, mother):
+            if parent is not None:
+                parent.add_family_handle(family.handle)
+                self.db.commit_person(parent, trans)
+        if father is not None:
+            family.set_father_handle(father.handle)
+        if mother is not None:
+            family.set_mother_handle(mother.handle)
+        for child in children:
+            child_ref = ChildRef()
+            child_ref.ref = child.handle
+            child_ref.set_mother_relation(rel)
+            child_ref.set_father_relation(rel)
+            family.add_child_ref(child_ref)
+            child.add_parent_family_handle(family.handle)
+            self.db.commit_person(child, trans)
+        self.db.commit_family(family, trans)
+
+    def test_same_relations(self):
+        relations = self.rcalc.get_relationship_distance_map(self.db, self.home)
+        for person in self.db.iter_people():
+            data, _msg = self.rcalc.get_relationship_distance_new(
+                self.db,
+                self.home,
+                person,
+                all_dist=True,
+                all_families=True,
+                only_birth=False,
+            )
+            if data[0][0] == -1:
+                self.assertNotIn(person.handle, relations)
+            else:
+                self.assertEqual(relations[person.handle], data)
+        self.assertIn(self.cousin.handle, relations)
+        self.assertNotIn(self.stranger.handle, relations)
+
+    def test_one_relationship(self):
+        relationships = self.rcalc.get_one_relationship_map(self.db, self.home)
+        self.assertEqual(relationships[self.father.handle], "father")
+        self.assertEqual(relationships[self.aunt.handle], "aunt")
+        self.assertIn(self.half_uncle.handle, relationships)
+        self.assertNotIn(self.home.handle, relationships)
+        self.assertNotIn(self.stranger.handle, relationships)
+        self.assertEqual(len(relationships), 7)
+
+    def test_change(self):
+        self.assertNotIn(
+            self.stranger.handle,
+            self.rcalc.get_relationship_distance_map(self.db, self.home),
+        )
+        with DbTxn("Add family", self.db) as trans:
+            self.__add_family(trans, self.father, None, [self.stranger])
+        relations = self.rcalc.get_relationship_distance_map(self.db, self.home)
+        self.assertEqual(relations[self.stranger.handle][0][0], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -31,6 +31,8 @@ privacy in reports and exports.
 #
 # -------------------------------------------------------------------------
 import logging
+import weakref
+from collections import defaultdict
 
 LOG = logging.getLogger(".gen.utils.alive")
 
@@ -361,6 +363,24 @@ class ProbablyAlive:
 
         # Try looking for descendants that were born more than a lifespan
         # ago.
+        date1, date2, explain, other = self._descendants_too_old(person)
+        if date1 and date2:
+            return (date1, date2, explain, other)
+
+        date1, date2, explain, other = self._ancestors_too_old(person)
+        if date1 and date2:
+            return (date1, date2, explain, other)
+
+        # If we can't find any reason to believe that they are dead we
+        # must assume they are alive.
+
+        return (None, None, "", None)
+
+    def _descendants_too_old(self, person):
+        """
+        Return the range of a person from the dates of their descendants,
+        or (None, None, "", None).
+        """
 
         def descendants_too_old(person, years):
             if person.handle in self.pset:
@@ -442,19 +462,19 @@ class ProbablyAlive:
         # If there are descendants that are too old for the person to have
         # been alive in the current year then they must be dead.
 
-        date1, date2, explain, other = None, None, "", None
         try:
-            date1, date2, explain, other = descendants_too_old(
-                person, self.AVG_GENERATION_GAP
-            )
+            return descendants_too_old(person, self.AVG_GENERATION_GAP)
         except RuntimeError:
             raise DatabaseError(
                 _("Database error: loop in %s's descendants")
                 % name_displayer.display(person)
             )
 
-        if date1 and date2:
-            return (date1, date2, explain, other)
+    def _ancestors_too_old(self, person):
+        """
+        Return the range of a person from the dates of their ancestors,
+        or (None, None, "", None).
+        """
 
         def ancestors_too_old(person, year):
             if person.handle in self.pset:
@@ -616,21 +636,238 @@ class ProbablyAlive:
         try:
             # If there are ancestors that would be too old in the current year
             # then assume our person must be dead too.
-            date1, date2, explain, other = ancestors_too_old(
-                person, -self.AVG_GENERATION_GAP
-            )
+            return ancestors_too_old(person, -self.AVG_GENERATION_GAP)
         except RuntimeError:
             raise DatabaseError(
                 _("Database error: loop in %s's ancestors")
                 % name_displayer.display(person)
             )
-        if date1 and date2:
-            return (date1, date2, explain, other)
 
-        # If we can't find any reason to believe that they are dead we
-        # must assume they are alive.
 
-        return (None, None, "", None)
+# -------------------------------------------------------------------------
+#
+# BulkProbablyAlive class
+#
+# -------------------------------------------------------------------------
+class _TreeReader:
+    """
+    The people and families of a database, read at once, and its events,
+    read once each as they are needed.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.people = {person.handle: person for person in db.iter_people()}
+        self.families = {family.handle: family for family in db.iter_families()}
+        self.events = {}
+
+    def get_person_from_handle(self, handle):
+        return self.people.get(handle)
+
+    def get_family_from_handle(self, handle):
+        return self.families.get(handle)
+
+    def get_event_from_handle(self, handle):
+        if handle not in self.events:
+            self.events[handle] = self.db.get_event_from_handle(handle)
+        return self.events[handle]
+
+
+class BulkProbablyAlive(ProbablyAlive):
+    """
+    A ProbablyAlive for all the people of a database together.
+
+    The people and families are read once, and each event at most once.
+    The evidence in the descendants of every person is found in one pass
+    over the family graph, children before their parents, so that each
+    person's descendants are searched once for the whole tree instead of
+    once for each of their ancestors.  The ranges are kept until the
+    database changes; use :func:`get_bulk_probably_alive` to share them.
+
+    People in a loop of descendants, and their ancestors, are left to the
+    walk of :class:`ProbablyAlive`.
+    """
+
+    def __init__(
+        self,
+        db,
+        max_sib_age_diff=None,
+        max_age_prob_alive=None,
+        avg_generation_gap=None,
+    ):
+        super().__init__(db, max_sib_age_diff, max_age_prob_alive, avg_generation_gap)
+        self.has_changed = getattr(db, "has_changed", None)
+        self.path = db.get_save_path()
+        self.db = _TreeReader(db)
+        self.__ranges = {}
+        self.__descendants = {}
+        self.__find_descendants()
+
+    def is_current(
+        self,
+        db,
+        max_sib_age_diff=None,
+        max_age_prob_alive=None,
+        avg_generation_gap=None,
+    ):
+        """
+        Return True if the ranges are still those of the database, for the
+        given parameters.
+        """
+        if max_sib_age_diff is None:
+            max_sib_age_diff = _MAX_SIB_AGE_DIFF
+        if max_age_prob_alive is None:
+            max_age_prob_alive = _MAX_AGE_PROB_ALIVE
+        if avg_generation_gap is None:
+            avg_generation_gap = _AVG_GENERATION_GAP
+        return (
+            self.has_changed is not None
+            and self.has_changed == getattr(db, "has_changed", None)
+            and self.path == db.get_save_path()
+            and self.MAX_SIB_AGE_DIFF == max_sib_age_diff
+            and self.MAX_AGE_PROB_ALIVE == max_age_prob_alive
+            and self.AVG_GENERATION_GAP == avg_generation_gap
+        )
+
+    def __find_descendants(self):
+        """
+        Find the first evidence in the descendants of every person, as
+        (generation, is_death, date, explain, descendant), or None.
+        """
+        children = {}
+        parents = defaultdict(set)
+        for handle, person in self.db.people.items():
+            children[handle] = []
+            for family_handle in person.get_family_handle_list():
+                family = self.db.families.get(family_handle)
+                if family is None:
+                    continue
+                for child_ref in family.get_child_ref_list():
+                    child = self.db.people.get(child_ref.ref)
+                    if child is not None:
+                        children[handle].append(child)
+                        parents[child.handle].add(handle)
+        pending = {
+            handle: len({child.handle for child in child_list})
+            for handle, child_list in children.items()
+        }
+        ready = [handle for handle, count in pending.items() if count == 0]
+        while ready:
+            handle = ready.pop()
+            self.__descendants[handle] = self.__find_evidence(children[handle])
+            for parent_handle in parents[handle]:
+                pending[parent_handle] -= 1
+                if pending[parent_handle] == 0:
+                    ready.append(parent_handle)
+
+    def __get_date(self, event_ref):
+        """
+        Return the date of a referenced event, or None if it is empty.
+        """
+        event = self.db.get_event_from_handle(event_ref.ref)
+        if event and event.get_date_object().get_start_date() != Date.EMPTY:
+            return event.get_date_object()
+        return None
+
+    def __find_evidence(self, children):
+        """
+        Find the first evidence among children and their descendants, in
+        the order of the walk of :class:`ProbablyAlive`.
+        """
+        for child in children:
+            birth_ref = child.get_birth_ref()
+            date = birth_ref and self.__get_date(birth_ref)
+            if date:
+                return (1, False, date, _("descendant birth date"), child)
+            death_ref = child.get_death_ref()
+            date = death_ref and self.__get_date(death_ref)
+            if date:
+                return (1, True, date, _("descendant death date"), child)
+            evidence = self.__descendants[child.handle]
+            if evidence:
+                return (evidence[0] + 1,) + evidence[1:]
+            for event_ref in child.get_primary_event_ref_list():
+                event = self.db.get_event_from_handle(event_ref.ref)
+                if event and event.type.is_birth_fallback():
+                    date = self.__get_date(event_ref)
+                    if date:
+                        explain = _("descendant birth-related date")
+                        return (1, False, date, explain, child)
+                elif event and event.type.is_death_fallback():
+                    date = self.__get_date(event_ref)
+                    if date:
+                        explain = _("descendant death-related date")
+                        return (1, True, date, explain, child)
+        return None
+
+    def _descendants_too_old(self, person):
+        if person.handle not in self.__descendants:
+            return super()._descendants_too_old(person)
+        # The walk leaves the person visited for the search of ancestors
+        self.pset.add(person.handle)
+        evidence = self.__descendants[person.handle]
+        if evidence is None:
+            return (None, None, "", None)
+        generation, is_death, dobj, explain, other = evidence
+        if is_death:
+            return (
+                dobj.copy_offset_ymd(-self.AVG_GENERATION_GAP),
+                dobj.copy_offset_ymd(
+                    -self.AVG_GENERATION_GAP + self.MAX_AGE_PROB_ALIVE
+                ),
+                explain,
+                other,
+            )
+        date = Date(dobj)
+        date.set_year(date.get_year() - generation * self.AVG_GENERATION_GAP)
+        return (
+            date,
+            date.copy_offset_ymd(self.MAX_AGE_PROB_ALIVE),
+            explain,
+            other,
+        )
+
+    def probably_alive_range(self, person, is_spouse=False):
+        if person is None:
+            return (None, None, "", None)
+        key = (person.handle, is_spouse)
+        if key not in self.__ranges:
+            self.__ranges[key] = super().probably_alive_range(person, is_spouse)
+        return self.__ranges[key]
+
+    def probably_alive(self, person, current_date=None, limit=0):
+        """
+        Return True if the person may be alive on current_date.
+
+        :param current_date: a date object that is not estimated or modified
+                             (defaults to today)
+        :param limit: number of years to check beyond death_date
+        """
+        birth, death, explain, relative = self.probably_alive_range(person)
+        return _in_range(birth, death, current_date, limit)
+
+
+# The bulk engines of the databases, kept while they are current
+_BULK_ENGINES = weakref.WeakKeyDictionary()
+
+
+def get_bulk_probably_alive(
+    db, max_sib_age_diff=None, max_age_prob_alive=None, avg_generation_gap=None
+):
+    """
+    Return the BulkProbablyAlive of the real database behind db, making a
+    new one if the database has changed since the last call.
+    """
+    basedb = _get_base_db(db)
+    engine = _BULK_ENGINES.get(basedb)
+    if engine is None or not engine.is_current(
+        basedb, max_sib_age_diff, max_age_prob_alive, avg_generation_gap
+    ):
+        engine = BulkProbablyAlive(
+            basedb, max_sib_age_diff, max_age_prob_alive, avg_generation_gap
+        )
+        _BULK_ENGINES[basedb] = engine
+    return engine
 
 
 # -------------------------------------------------------------------------
@@ -679,17 +916,42 @@ def probably_alive(
     if not birth or not death:
         # no evidence, must consider alive
         return (True, None, None, _("no evidence"), None) if return_range else True
-    # must have dates from here:
-    if limit:
-        death += limit  # add these years to death
-    # Finally, check to see if current_date is between dates
-    result = current_date.match(birth, ">=") and current_date.match(death, "<=")
+    result = _in_range(birth, death, current_date, limit)
     if return_range:
         return (result, birth, death, explain, relative)
     else:
         return result
 
 
+def _in_range(birth, death, current_date=None, limit=0):
+    """
+    Return True if current_date is within a range of probably_alive_range,
+    or if the range is empty.
+    """
+    if not birth or not death:
+        # no evidence, must consider alive
+        return True
+    if current_date is None or not current_date.is_valid():
+        current_date = Today()
+    # must have dates from here:
+    if limit:
+        death += limit  # add these years to death
+    # Finally, check to see if current_date is between dates
+    return current_date.match(birth, ">=") and current_date.match(death, "<=")
+
+
+def _get_base_db(db):
+    """
+    Return the real database behind any proxies, to use all people for
+    determining alive status.
+    """
+    from ..proxy.proxybase import ProxyDbBase
+
+    while isinstance(db, ProxyDbBase):
+        db = db.db
+    return db
+
+
 def probably_alive_range(
     person, db, max_sib_age_diff=None, max_age_prob_alive=None, avg_generation_gap=None
 ):
@@ -699,11 +961,7 @@ def probably_alive_range(
     """
     # First, find the real database to use all people
     # for determining alive status:
-    from ..proxy.proxybase import ProxyDbBase
-
-    basedb = db
-    while isinstance(basedb, ProxyDbBase):
-        basedb = basedb.db
+    basedb = _get_base_db(db)
     # Now, we create a wrapper for doing work:
     pb = ProbablyAlive(basedb, max_sib_age_diff, max_age_prob_alive, avg_generation_gap)
     return pb.probably_alive_range(person)
@@ -46,11 +46,18 @@ def get_location_list(db, place, date=None, lang=""):
                 break
         if handle is None or handle in visited:
             break
-        place = db.get_place_from_handle(handle)
-        if place is None:
-            break
-        visited.append(handle)
-        lines.append((__get_name(place, date, lang), place.get_type()))
+        # Take the undated part of the hierarchy from the database cache
+        places = db.get_place_hierarchy(handle)
+        if places is None:
+            place = db.get_place_from_handle(handle)
+            if place is None:
+                break
+            places = [place]
+        for place in places:
+            if place.handle in visited:
+                return lines
+            visited.append(place.handle)
+            lines.append((__get_name(place, date, lang), place.get_type()))
     return lines
 
 
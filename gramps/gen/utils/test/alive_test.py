@@ -0,0 +1,110 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+# -------------------------------------------------------------------------
+#
+# Standard python modules
+#
+# -------------------------------------------------------------------------
+import unittest
+
+# -------------------------------------------------------------------------
+#
+# Gramps modules
+#
+# -------------------------------------------------------------------------
+from ...db import DbTxn
+from ...db.utils import make_database
+from ...lib import ChildRef, Date, Event, EventRef, EventType, Family, Person
+from ..alive import get_bulk_probably_alive, probably_alive_range
+
+
+# -------------------------------------------------------------------------
+#
+# BulkProbablyAliveTest class
+#
+# -------------------------------------------------------------------------
+class BulkProbablyAliveTest(unittest.TestCase):
+    """
+    Tests for the bulk probably alive engine.
+    """
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+        # Four generations, of which only the youngest has a date
+        with DbTxn("Add people", self.db) as trans:
+            self.people = [self.__add_person(trans) for _index in range(4)]
+            self.__add_person(trans, self.people[-1], 1800)
+            for parent, child in zip(self.people, self.people[1:]):
+                self.__add_family(trans, parent, child)
+
+    def tearDown(self):
+        self.db.close(update=False)
+
+    def __add_person(self, trans, parent=None, year=None):
+        person = Person()
+        if year is not None:
+            event = Event()
+            event.set_type(EventType.BIRTH)
+            event.set_date_object(Date(year))
+            self.db.add_event(event, trans)
+            event_ref = EventRef()
+            event_ref.ref = event.handle
+            person.add_event_ref(event_ref)
+            person.set_birth_ref(event_ref)
+        self.db.add_person(person, trans)
+        if parent is not None:
+            self.__add_family(trans, parent, person)
+        return person
+
+    def __add_family(self, trans, parent, child):
+        family = Family()
+        family.set_father_handle(parent.handle)
+        child_ref = ChildRef()
+        child_ref.ref = child.handle
+        family.add_child_ref(child_ref)
+        self.db.add_family(family, trans)
+        parent.add_family_handle(family.handle)
+        child.add_parent_family_handle(family.handle)
+        self.db.commit_person(parent, trans)
+        self.db.commit_person(child, trans)
+
+    def test_same_ranges(self):
+        alive = get_bulk_probably_alive(self.db)
+        for person in self.db.iter_people():
+            self.assertEqual(
+                alive.probably_alive_range(person),
+                probably_alive_range(person, self.db),
+            )
+        birth = alive.probably_alive_range(self.people[0])[0]
+        self.assertEqual(birth.get_year(), 1800 - 4 * alive.AVG_GENERATION_GAP)
+        self.assertFalse(alive.probably_alive(self.people[0]))
+
+    def test_cache(self):
+        alive = get_bulk_probably_alive(self.db)
+        self.assertIs(get_bulk_probably_alive(self.db), alive)
+        with DbTxn("Add person", self.db) as trans:
+            self.__add_person(trans)
+        self.assertIsNot(get_bulk_probably_alive(self.db), alive)
+
+
+if __name__ == "__main__":
+    unittest.main()
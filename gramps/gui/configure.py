@@ -52,6 +52,7 @@ from gramps.gen.config import config
 from gramps.gen.const import GRAMPS_LOCALE as glocale
 from gramps.gen.const import USER_DATA, URL_WIKISTRING, URL_MANUAL_PAGE
 from gramps.gen.datehandler import get_date_formats
+from gramps.gen.db.codec import CODECS
 from gramps.gen.display.name import displayer as _nd
 from gramps.gen.display.name import NameDisplayError
 from gramps.gen.display.place import displayer as _pd
@@ -2199,6 +2200,12 @@ class GrampsPreferences(ConfigureDialog):
         config.set("database.backend", db_choice)
         self.set_connection_widgets(db_choice)
 
+    def blob_codec_changed(self, obj, constant):
+        """
+        Update the codec of the data of new family trees.
+        """
+        config.set(constant, CODECS[obj.get_active()])
+
     def set_connection_widgets(self, db_choice):
         """
         Sets the connection widgets insensitive for embedded databases.
@@ -2238,6 +2245,18 @@ class GrampsPreferences(ConfigureDialog):
         obox = self.__create_backend_combo()
         grid.attach(obox, 2, row, 1, 1)
 
+        row += 1
+        codec = config.get("database.blob-codec")
+        self.add_combo(
+            grid,
+            _("Data format of new trees"),
+            row,
+            "database.blob-codec",
+            [(0, _("Pickle")), (1, _("Compact"))],
+            callback=self.blob_codec_changed,
+            setactive=CODECS.index(codec) if codec in CODECS else 0,
+        )
+
         row += 1
         label = self.add_text(
             grid,
@@ -48,6 +48,7 @@ from gramps.gen.proxy import (
     FilterProxyDb,
     ReferencedBySelectionProxyDb,
 )
+from gramps.gen.proxy.proxybase import ProxyDbBase
 
 # -------------------------------------------------------------------------
 #
@@ -618,6 +619,9 @@ class WriterOptionBox:
                         "{number_of} Person", "{number_of} People", people_count
                     ).format(number_of=people_count)
                 )
+        if isinstance(dbase, ProxyDbBase):
+            # The tree does not change while it is exported
+            dbase.memoize()
         return dbase
 
     def apply_proxy(self, proxy_name, dbase, progress=None):
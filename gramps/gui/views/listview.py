@@ -76,6 +76,7 @@ from ..plug.quick import create_quickreport_menu, create_web_connect_menu
 from ..utils import is_right_click
 from ..widgets.interactivesearchbox import InteractiveSearchBox
 from ..widgets.persistenttreeview import PersistentTreeView
+from .treemodels.flatbasemodel import FlatBaseModel
 
 # ----------------------------------------------------------------
 #
@@ -326,6 +327,9 @@ class ListView(NavigationView):
         """
         NavigationView.set_inactive(self)
         self.uistate.viewmanager.tags.tag_disable()
+        if self.__cancel_build():
+            # read the rows again when the page is displayed
+            self.dirty = True
 
     def build_tree(self, force_sidebar=False, preserve_col=True):
         if self.list.get_columns()[0].get_width() > 0:
@@ -348,6 +352,7 @@ class ListView(NavigationView):
                     self.sort_col,
                     search=filter_info,
                     sort_map=self.column_order(),
+                    **self.__build_options(),
                 )
             else:
                 # the entire data to show is already in memory.
@@ -396,6 +401,42 @@ class ListView(NavigationView):
         else:
             self.dirty = True
 
+    def __build_options(self):
+        """
+        Return the extra arguments of the model: flat models are built
+        incrementally.
+        """
+        if issubclass(self.make_model, FlatBaseModel):
+            return {"build_callback": self.__build_progress}
+        return {}
+
+    def __build_progress(self, model, done):
+        """
+        Show the rows read so far by the incremental build of the model.
+        """
+        if model is not self.model:
+            return
+        handle = self.first_selected()
+        self.list.set_model(None)
+        self.list.set_model(self.model)
+        if handle:
+            self.goto_handle(handle)
+        elif done:
+            self.goto_active(None)
+        if self.active:
+            self.uistate.show_filter_results(
+                self.dbstate, self.model.displayed(), self.model.total()
+            )
+
+    def __cancel_build(self):
+        """
+        Stop the incremental build of the model, if any. Return True if
+        the model misses rows.
+        """
+        if isinstance(self.model, FlatBaseModel):
+            return self.model.cancel_build()
+        return False
+
     def search_build_tree(self):
         self.build_tree()
 
@@ -796,6 +837,7 @@ class ListView(NavigationView):
                 self.model.reverse_order()
                 self.list.set_model(self.model)
         else:
+            self.__cancel_build()
             self.model = self.make_model(
                 self.dbstate.db,
                 self.uistate,
@@ -803,6 +845,7 @@ class ListView(NavigationView):
                 self.sort_order,
                 search=filter_info,
                 sort_map=self.column_order(),
+                **self.__build_options(),
             )
 
             self.list.set_model(self.model)
@@ -843,6 +886,7 @@ class ListView(NavigationView):
         """
         Called when the database is changed.
         """
+        self.__cancel_build()
         self.list.set_model(None)
         self._change_db(db)
         self.connect_signals()
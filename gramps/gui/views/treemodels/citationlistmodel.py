@@ -68,6 +68,7 @@ class CitationListModel(CitationBaseModel, FlatBaseModel):
         search=None,
         skip=set(),
         sort_map=None,
+        build_callback=None,
     ):
         self.map = db.get_raw_citation_data
         self.gen_cursor = db.get_citation_cursor
@@ -106,7 +107,15 @@ class CitationListModel(CitationBaseModel, FlatBaseModel):
             self.citation_tag_color,
         ]
         FlatBaseModel.__init__(
-            self, db, uistate, scol, order, search=search, skip=skip, sort_map=sort_map
+            self,
+            db,
+            uistate,
+            scol,
+            order,
+            search=search,
+            skip=skip,
+            sort_map=sort_map,
+            build_callback=build_callback,
         )
 
     def destroy(self):
@@ -81,6 +81,7 @@ class EventModel(FlatBaseModel):
         search=None,
         skip=set(),
         sort_map=None,
+        build_callback=None,
     ):
         self.gen_cursor = db.get_event_cursor
         self.map = db.get_raw_event_data
@@ -110,7 +111,15 @@ class EventModel(FlatBaseModel):
             self.column_tag_color,
         ]
         FlatBaseModel.__init__(
-            self, db, uistate, scol, order, search=search, skip=skip, sort_map=sort_map
+            self,
+            db,
+            uistate,
+            scol,
+            order,
+            search=search,
+            skip=skip,
+            sort_map=sort_map,
+            build_callback=build_callback,
         )
 
     def destroy(self):
@@ -66,6 +66,7 @@ class FamilyModel(FlatBaseModel):
         search=None,
         skip=set(),
         sort_map=None,
+        build_callback=None,
     ):
         self.gen_cursor = db.get_family_cursor
         self.map = db.get_raw_family_data
@@ -94,7 +95,15 @@ class FamilyModel(FlatBaseModel):
             self.column_tag_color,
         ]
         FlatBaseModel.__init__(
-            self, db, uistate, scol, order, search=search, skip=skip, sort_map=sort_map
+            self,
+            db,
+            uistate,
+            scol,
+            order,
+            search=search,
+            skip=skip,
+            sort_map=sort_map,
+            build_callback=build_callback,
         )
 
     def destroy(self):
@@ -44,6 +44,11 @@ corresponds to the path.
 
 The class FlatBaseModel, is the base class for all flat treeview models.
 It keeps a FlatNodeMap, and obtains data from database as needed
+
+Reading and sorting the keys of a large table takes long. If a build callback
+is given, the model reads them in slices from idle callbacks instead, showing
+the rows read so far as their number doubles, so that the interface stays
+responsive.
 """
 
 # -------------------------------------------------------------------------
@@ -62,6 +67,7 @@ _LOG = logging.getLogger(".gui.basetreemodel")
 # GNOME/GTK modules
 #
 # -------------------------------------------------------------------------
+from gi.repository import GLib
 from gi.repository import GObject
 from gi.repository import Gtk
 
@@ -72,7 +78,9 @@ from gi.repository import Gtk
 # -------------------------------------------------------------------------
 from gramps.gen.filters import SearchFilter, ExactSearchFilter
 from gramps.gen.const import GRAMPS_LOCALE as glocale
+from gramps.gen.errors import FilterError
 from .basemodel import BaseModel
+from ...dialog import ErrorDialog
 from ...user import User
 from gramps.gen.proxy.cache import CacheProxyDb
 
@@ -83,6 +91,9 @@ from gramps.gen.proxy.cache import CacheProxyDb
 # -------------------------------------------------------------------------
 
 UEMPTY = ""
+# time in seconds an incremental build reads rows before it lets the
+# interface run
+BUILD_SLICE = 0.05
 
 
 class FlatNodeMap:
@@ -458,7 +469,14 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         search=None,
         skip=set(),
         sort_map=None,
+        build_callback=None,
     ):
+        """
+        :param build_callback: if given, the rows are read by an incremental
+                    build, and build_callback(model, done) is called each
+                    time more rows are shown, done being True once all
+                    rows are read.
+        """
         cput = perf_counter()
         GObject.GObject.__init__(self)
         BaseModel.__init__(self)
@@ -486,6 +504,11 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         self.sort_col = scol
         self.skip = skip
         self._in_build = False
+        self._build_callback = build_callback
+        self._build_iter = None
+        self._build_source = None
+        self._build_keys = None
+        self._build_ignore = None
 
         self.node_map = FlatNodeMap()
         self.set_search(search)
@@ -501,6 +524,7 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """
         Unset all elements that prevent garbage collection
         """
+        self.cancel_build()
         BaseModel.destroy(self)
         self.db = None
         self.sort_func = None
@@ -580,6 +604,107 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
             srt_keys.sort()
             return srt_keys
 
+    def _all_sort_keys(self, ignore):
+        """
+        Return the (sort_key, handle) list of all data that can maximally
+        be shown, or None while an incremental build reads it.
+        """
+        if self._build_keys is not None:
+            # the rows read by the incremental build
+            allkeys = self._build_keys
+            self._build_keys = None
+            return allkeys
+        if self._build_iter is not None:
+            # the build shows the rows once read
+            self._build_ignore = ignore
+            return None
+        allkeys = self.node_map.full_srtkey_hndl_map()
+        if allkeys:
+            return allkeys
+        if self._build_callback is None:
+            return self.sort_keys()
+        self._start_build(ignore)
+        return None
+
+    def _start_build(self, ignore):
+        """
+        Start an incremental build. The first slice of rows is read at once,
+        so that small tables are shown without delay.
+        """
+        self.cancel_build()
+        self._build_ignore = ignore
+        self._build_iter = self._build_sort_keys()
+        if next(self._build_iter):
+            self._build_source = GLib.idle_add(self._build_iter.__next__)
+
+    def _build_sort_keys(self):
+        """
+        Read the sort keys of an incremental build, BUILD_SLICE seconds
+        at a time, yielding True after each slice and False when done.
+        The rows read so far are shown each time their number doubles,
+        unless a filter of the sidebar needs all rows at once.
+        """
+        srt_keys = []
+        shown = 0
+        with self.gen_cursor() as cursor:
+            cput = perf_counter()
+            self._in_build = True
+            for key, data in cursor:
+                srt_keys.append((self.sort_func(data), key))
+                if perf_counter() - cput < BUILD_SLICE:
+                    continue
+                self._in_build = False
+                if (
+                    self.rebuild_data == self._rebuild_search
+                    and len(srt_keys) >= 2 * shown
+                ):
+                    srt_keys.sort()
+                    shown = len(srt_keys)
+                    self._build_keys = list(srt_keys)
+                    self.rebuild_data(self._build_ignore)
+                    self._build_callback(self, False)
+                yield True
+                cput = perf_counter()
+                self._in_build = True
+        srt_keys.sort()
+        self._in_build = False
+        self._build_iter = None
+        self._build_source = None
+        self._build_keys = srt_keys
+        try:
+            self.rebuild_data(self._build_ignore)
+        except FilterError as msg:
+            msg1, msg2 = msg.messages()
+            ErrorDialog(msg1, msg2, parent=self.uistate.window)
+        self._build_callback(self, True)
+        yield False
+
+    def cancel_build(self):
+        """
+        Stop the incremental build, if any. Return True if the build was
+        stopped before all rows were read.
+        """
+        if self._build_iter is None:
+            return False
+        if self._build_source is not None:
+            GLib.source_remove(self._build_source)
+        self._build_iter.close()
+        self._build_iter = None
+        self._build_source = None
+        self._build_keys = None
+        self._in_build = False
+        return True
+
+    def _restart_build(self):
+        """
+        Read the rows again if an incremental build is running, as the rows
+        read so far may miss a change. Return True if it was restarted.
+        """
+        if self._build_iter is None:
+            return False
+        self._start_build(self._build_ignore)
+        return True
+
     def _rebuild_search(self, ignore=None):
         """function called when view must be build, given a search text
         in the top search bar
@@ -587,9 +712,10 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         self.clear_cache()
         self._in_build = True
         if (self.db is not None) and self.db.is_open():
-            allkeys = self.node_map.full_srtkey_hndl_map()
-            if not allkeys:
-                allkeys = self.sort_keys()
+            allkeys = self._all_sort_keys(ignore)
+            if allkeys is None:
+                self._in_build = False
+                return
             if self.search and self.search.text:
                 dlist = [
                     h
@@ -620,10 +746,11 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         self.clear_cache()
         self._in_build = True
         if (self.db is not None) and self.db.is_open():
+            allkeys = self._all_sort_keys(ignore)
+            if allkeys is None:
+                self._in_build = False
+                return
             cdb = CacheProxyDb(self.db)
-            allkeys = self.node_map.full_srtkey_hndl_map()
-            if not allkeys:
-                allkeys = self.sort_keys()
             if self.search:
                 ident = False
                 if ignore is None:
@@ -651,6 +778,8 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         Row is only added if search/filter data is such that it must be shown
         """
         assert isinstance(handle, str)
+        if self._restart_build():
+            return
         if self.node_map.get_path_from_handle(handle) is not None:
             return  # row is already displayed
         data = self.map(handle)
@@ -669,6 +798,8 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """
         Delete a row, called after the object with handle is deleted
         """
+        if self._restart_build():
+            return
         delete_path = self.node_map.delete(handle)
         # delete_path is an integer from 0 to n-1
         if delete_path is not None:
@@ -679,6 +810,8 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """
         Update a row, called after the object with handle is changed
         """
+        if self._restart_build():
+            return
         if self.node_map.get_path_from_handle(handle) is None:
             return  # row is not currently displayed
         self.clear_cache(handle)
@@ -63,6 +63,7 @@ class MediaModel(FlatBaseModel):
         search=None,
         skip=set(),
         sort_map=None,
+        build_callback=None,
     ):
         self.gen_cursor = db.get_media_cursor
         self.map = db.get_raw_media_data
@@ -91,7 +92,15 @@ class MediaModel(FlatBaseModel):
             self.column_tag_color,
         ]
         FlatBaseModel.__init__(
-            self, db, uistate, scol, order, search=search, skip=skip, sort_map=sort_map
+            self,
+            db,
+            uistate,
+            scol,
+            order,
+            search=search,
+            skip=skip,
+            sort_map=sort_map,
+            build_callback=build_callback,
         )
 
     def destroy(self):
@@ -63,6 +63,7 @@ class NoteModel(FlatBaseModel):
         search=None,
         skip=set(),
         sort_map=None,
+        build_callback=None,
     ):
         """Setup initial values for instance variables."""
         self.gen_cursor = db.get_note_cursor
@@ -86,7 +87,15 @@ class NoteModel(FlatBaseModel):
             self.column_tag_color,
         ]
         FlatBaseModel.__init__(
-            self, db, uistate, scol, order, search=search, skip=skip, sort_map=sort_map
+            self,
+            db,
+            uistate,
+            scol,
+            order,
+            search=search,
+            skip=skip,
+            sort_map=sort_map,
+            build_callback=build_callback,
         )
 
     def destroy(self):
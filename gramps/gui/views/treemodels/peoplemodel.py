@@ -593,6 +593,7 @@ class PersonListModel(PeopleBaseModel, FlatBaseModel):
         search=None,
         skip=set(),
         sort_map=None,
+        build_callback=None,
     ):
         PeopleBaseModel.__init__(self, db)
         FlatBaseModel.__init__(
@@ -604,6 +605,7 @@ class PersonListModel(PeopleBaseModel, FlatBaseModel):
             scol=scol,
             order=order,
             sort_map=sort_map,
+            build_callback=build_callback,
         )
 
     def destroy(self):
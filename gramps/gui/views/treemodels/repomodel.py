@@ -60,6 +60,7 @@ class RepositoryModel(FlatBaseModel):
         search=None,
         skip=set(),
         sort_map=None,
+        build_callback=None,
     ):
         self.gen_cursor = db.get_repository_cursor
         self.get_handles = db.get_repository_handles
@@ -103,7 +104,15 @@ class RepositoryModel(FlatBaseModel):
         ]
 
         FlatBaseModel.__init__(
-            self, db, uistate, scol, order, search=search, skip=skip, sort_map=sort_map
+            self,
+            db,
+            uistate,
+            scol,
+            order,
+            search=search,
+            skip=skip,
+            sort_map=sort_map,
+            build_callback=build_callback,
         )
 
     def destroy(self):
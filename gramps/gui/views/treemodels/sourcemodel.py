@@ -59,6 +59,7 @@ class SourceModel(FlatBaseModel):
         search=None,
         skip=set(),
         sort_map=None,
+        build_callback=None,
     ):
         self.map = db.get_raw_source_data
         self.gen_cursor = db.get_source_cursor
@@ -85,7 +86,15 @@ class SourceModel(FlatBaseModel):
             self.column_tag_color,
         ]
         FlatBaseModel.__init__(
-            self, db, uistate, scol, order, search=search, skip=skip, sort_map=sort_map
+            self,
+            db,
+            uistate,
+            scol,
+            order,
+            search=search,
+            skip=skip,
+            sort_map=sort_map,
+            build_callback=build_callback,
         )
 
     def destroy(self):
@@ -0,0 +1,86 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from gi.repository import GLib
+
+from gramps.gen.db import DbTxn
+from gramps.gen.db.utils import make_database
+from gramps.gen.lib import Note
+from .. import flatbasemodel
+from ..notemodel import NoteModel
+
+# main loop iterations after which a build is taken to hang
+MAX_ITERATIONS = 1000
+
+
+class IncrementalBuildTest(unittest.TestCase):
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+        self.uistate = SimpleNamespace(window=None)
+        with DbTxn("Add notes", self.db) as trans:
+            for text in ("delta", "alpha", "charlie", "bravo", "echo"):
+                note = Note(text)
+                self.db.add_note(note, trans)
+        self.calls = []
+
+    def tearDown(self):
+        self.db.close(update=False)
+
+    def __progress(self, model, done):
+        self.calls.append((model.displayed(), done))
+
+    def __make_model(self):
+        # every row is a slice of its own
+        with patch.object(flatbasemodel, "BUILD_SLICE", 0):
+            model = NoteModel(self.db, self.uistate, build_callback=self.__progress)
+            context = GLib.MainContext.default()
+            for _index in range(MAX_ITERATIONS):
+                if self.calls and self.calls[-1][1]:
+                    break
+                context.iteration(False)
+        self.assertTrue(self.calls and self.calls[-1][1], "build did not finish")
+        return model
+
+    def test_same_rows(self):
+        model = self.__make_model()
+        full = NoteModel(self.db, self.uistate)
+        self.assertEqual(
+            model.node_map.full_srtkey_hndl_map(),
+            full.node_map.full_srtkey_hndl_map(),
+        )
+        self.assertEqual(self.calls[-1], (5, True))
+        # the rows read so far are shown as their number doubles
+        self.assertEqual([count for count, done in self.calls[:-1]], [1, 2, 4])
+
+    def test_cancel(self):
+        with patch.object(flatbasemodel, "BUILD_SLICE", 0):
+            model = NoteModel(self.db, self.uistate, build_callback=self.__progress)
+        self.assertTrue(model.cancel_build())
+        self.assertFalse(model.cancel_build())
+        self.assertEqual(model.displayed(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -27,7 +27,12 @@
 import os
 import time
 import pickle
+import hashlib
 import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from itertools import islice
 
 # ------------------------------------------------------------------------
 #
@@ -37,8 +42,10 @@ import logging
 from gramps.gen.db.dbconst import (
     DBLOGNAME,
     DBBACKEND,
+    BULKSIZE,
     KEY_TO_NAME_MAP,
     KEY_TO_CLASS_MAP,
+    CLASS_TO_KEY_MAP,
     TXNADD,
     TXNUPD,
     TXNDEL,
@@ -54,6 +61,13 @@ from gramps.gen.db.dbconst import (
     REPOSITORY_KEY,
     REFERENCE_KEY,
 )
+from gramps.gen.db.codec import (
+    CODECS,
+    DEFAULT_CODEC,
+    convert_blob_codec,
+    decode,
+    get_encoder,
+)
 from gramps.gen.db.generic import DbGeneric
 from gramps.gen.updatecallback import UpdateCallback
 from gramps.gen.lib import (
@@ -69,17 +83,181 @@ from gramps.gen.lib import (
     Note,
 )
 from gramps.gen.lib.genderstats import GenderStats
+from gramps.gen.lib.serialize import to_json
+from gramps.gen.config import config
 from gramps.gen.const import GRAMPS_LOCALE as glocale
 
 LOG = logging.getLogger(".dbapi")
 _LOG = logging.getLogger(DBLOGNAME)
 
+# Maximum number of parameters bound to a single "IN (...)" clause
+MAX_VARIABLES = 500
+
+# Indexed columns generated from json_data: table -> (column, JSON path)
+JSON_COLUMNS = {
+    "event": (("event_type", "$.type.value"), ("sortval", "$.date.sortval")),
+    "place": (("place_type", "$.place_type.value"),),
+    "note": (("note_type", "$.type.value"),),
+}
+
+# Secondary columns that are also indexed when the JSON data is stored
+JSON_INDEXES = {
+    "person": ("gender", "birth_ref_index", "death_ref_index"),
+}
+
+# Tables of the parent and child edges between people and families:
+# class of the owner object -> (table, owner column, columns)
+EDGE_TABLES = {
+    "Family": ("family_parent", "family_handle", ("family_handle", "person_handle")),
+    "Person": (
+        "family_child",
+        "person_handle",
+        ("family_handle", "person_handle", "main"),
+    ),
+}
+
+# Items of the serialized data from which the edge rows are made
+EDGE_DATA = {"Family": slice(2, 4), "Person": slice(9, 10)}
+
+# Classes of the primary objects in the full-text index of the text data
+TEXT_CLASSES = (
+    "Person",
+    "Family",
+    "Event",
+    "Place",
+    "Source",
+    "Citation",
+    "Repository",
+    "Media",
+    "Note",
+)
+
+# Shortest text that the trigram index can look up
+MIN_TEXT_SEARCH = 3
+
+# Columns from which the sort keys of the sorted handle lists are made:
+# class -> (first key, second key)
+SORT_KEY_FIELDS = {
+    "Person": ("surname", "given_name"),
+    "Citation": ("page",),
+    "Source": ("title",),
+    "Place": ("title",),
+    "Media": ("desc",),
+    "Tag": ("name",),
+}
+
+# Texts whose sort keys tell apart the versions of a collation
+SORT_KEY_PROBE = (
+    "a",
+    "A",
+    "á",
+    "Æ",
+    "ß",
+    "ss",
+    "Ø",
+    "Ł",
+    "İ",
+    "ı",
+    "Zoë",
+    "-",
+    "1",
+)
+
+PRIMARY_TABLES = (
+    "person",
+    "family",
+    "source",
+    "citation",
+    "event",
+    "media",
+    "place",
+    "repository",
+    "note",
+    "tag",
+)
+
+
+class BulkWrite:
+    """
+    Rows collected for one chunk of a bulk commit, waiting to be written.
+    """
+
+    def __init__(self):
+        self.existing = set()  # (obj_key, handle) rows already in the table
+        self.old_data = {}  # (obj_key, handle) -> last committed data
+        self.rows = defaultdict(dict)  # obj_key -> {handle: row}
+        self.fields = {}  # obj_key -> secondary field names
+        self.edges = defaultdict(dict)  # class name -> {handle: edge rows}
+        self.texts = {}  # (obj_key, handle) -> text index row
+        self.sort_keys = {}  # (obj_key, handle) -> sort key rows
+
 
 class DBAPI(DbGeneric):
     """
     Database backends class for DB-API 2.0 databases
     """
 
+    _bulk = None
+    _deferred_references = None
+    _edge_tables = None
+    _encoder = None
+    _json_data = None
+    _read_pool = None
+    _sort_key_table = None
+    _sort_locales = None
+    _text_index = None
+
+    def __init__(self, directory=None):
+        # Per-thread state of read_snapshot
+        self._snapshot = threading.local()
+        super().__init__(directory)
+
+    @property
+    def dbapi(self):
+        """
+        The connection used by the current thread: its snapshot connection
+        inside read_snapshot, otherwise the main connection.
+        """
+        connection = getattr(self._snapshot, "connection", None)
+        if connection is None:
+            return self._dbapi
+        return connection
+
+    @dbapi.setter
+    def dbapi(self, connection):
+        self._dbapi = connection
+
+    @contextmanager
+    def read_snapshot(self):
+        """
+        Context manager giving the current thread a consistent, read-only
+        view of the database.
+
+        If the backend has a pool of read-only connections, one of them is
+        used by the current thread for the duration of the context, inside
+        a single read transaction. Otherwise the main connection is shared.
+        """
+        if self._read_pool is None or getattr(self._snapshot, "connection", None):
+            yield self
+            return
+        connection = self._read_pool.acquire()
+        self._snapshot.connection = connection
+        try:
+            yield self
+        finally:
+            self._snapshot.connection = None
+            self._read_pool.release(connection)
+
+    def _use_data_cache(self):
+        """
+        Bypass the data cache inside read_snapshot, whose view of the
+        database may be older than the cached data.
+        """
+        return (
+            super()._use_data_cache()
+            and getattr(self._snapshot, "connection", None) is None
+        )
+
     def _initialize(self, directory, username, password):
         raise NotImplementedError
 
@@ -207,6 +385,9 @@ class DBAPI(DbGeneric):
         )
 
         self._create_secondary_columns()
+        self._create_edge_tables()
+        self._create_text_index()
+        self._create_sort_key_table()
 
         ## Indices:
         self.dbapi.execute("CREATE INDEX person_gramps_id " "ON person(gramps_id)")
@@ -222,22 +403,174 @@ class DBAPI(DbGeneric):
         self.dbapi.execute("CREATE INDEX place_enclosed_by " "ON place(enclosed_by)")
         self.dbapi.execute("CREATE INDEX place_gramps_id " "ON place(gramps_id)")
         self.dbapi.execute("CREATE INDEX tag_name " "ON tag(name)")
-        self.dbapi.execute(
-            "CREATE INDEX reference_ref_handle " "ON reference(ref_handle)"
-        )
         self.dbapi.execute("CREATE INDEX family_gramps_id " "ON family(gramps_id)")
         self.dbapi.execute("CREATE INDEX event_gramps_id " "ON event(gramps_id)")
         self.dbapi.execute(
             "CREATE INDEX repository_gramps_id " "ON repository(gramps_id)"
         )
         self.dbapi.execute("CREATE INDEX note_gramps_id " "ON note(gramps_id)")
+        self._create_reference_indexes()
+
+        self.dbapi.commit()
+
+        # A new tree is written with the codec chosen in the preferences
+        codec = config.get("database.blob-codec")
+        if codec in CODECS:
+            self._set_metadata("blob-codec", codec)
+
+    def _create_reference_indexes(self):
+        """
+        Create the indexes on the reference table.
+        """
+        self.dbapi.execute(
+            "CREATE INDEX reference_ref_handle " "ON reference(ref_handle)"
+        )
         self.dbapi.execute(
             "CREATE INDEX reference_obj_handle " "ON reference(obj_handle)"
         )
 
-        self.dbapi.commit()
+    def _drop_reference_indexes(self):
+        """
+        Drop the indexes on the reference table.
+        """
+        self.dbapi.execute("DROP INDEX reference_ref_handle")
+        self.dbapi.execute("DROP INDEX reference_obj_handle")
+
+    def _create_edge_tables(self):
+        """
+        Create the tables of the parent and child edges.
+
+        family_parent has a row for the father and the mother of each
+        family, and is owned by the families.  family_child has a row for
+        each family in which a person is a child, and is owned by the
+        people; main is 1 for the main family of the person.
+        """
+        self.dbapi.execute(
+            "CREATE TABLE family_parent "
+            "("
+            "family_handle VARCHAR(50), "
+            "person_handle VARCHAR(50)"
+            ")"
+        )
+        self.dbapi.execute(
+            "CREATE TABLE family_child "
+            "("
+            "family_handle VARCHAR(50), "
+            "person_handle VARCHAR(50), "
+            "main INTEGER"
+            ")"
+        )
+        for table in ("family_parent", "family_child"):
+            for column in ("family_handle", "person_handle"):
+                self.dbapi.execute(
+                    "CREATE INDEX %s_%s ON %s(%s)" % (table, column, table, column)
+                )
+
+    def _create_sort_key_table(self):
+        """
+        Create the table of the sort keys of the sorted handle lists.
+
+        sort_key has a row for each object of the classes in SORT_KEY_FIELDS
+        and each collation, with the binary sort keys of its fields.  The
+        lists are then read in the order of an index, instead of being
+        sorted with a call of the collation for every comparison.
+        """
+        self.dbapi.execute(
+            "CREATE TABLE sort_key "
+            "("
+            "obj_class VARCHAR(50), "
+            "handle VARCHAR(50), "
+            "collation VARCHAR(50), "
+            "sort_key TEXT, "
+            "sort_key2 TEXT, "
+            "PRIMARY KEY (obj_class, handle, collation)"
+            ")"
+        )
+        self.dbapi.execute(
+            "CREATE INDEX sort_key_order "
+            "ON sort_key(collation, obj_class, sort_key, sort_key2, handle)"
+        )
+
+    def _create_text_index(self):
+        """
+        Create the full-text index of the text data of the primary objects.
+
+        text_data has a row with the text of each object and of its child
+        objects, upper cased the way the filter rules compare text.
+        text_index is an FTS5 trigram index over it, kept in step by
+        triggers, which finds the rows containing any text of three
+        characters or more.
+
+        Returns False, creating nothing, if SQLite lacks the trigram
+        tokenizer.
+        """
+        if not self.dbapi.has_trigram_index():
+            LOG.warning("SQLite has no trigram tokenizer, text is not indexed")
+            return False
+        self.dbapi.execute(
+            "CREATE TABLE text_data "
+            "("
+            "id INTEGER PRIMARY KEY, "
+            "obj_class VARCHAR(50), "
+            "handle VARCHAR(50), "
+            "text TEXT"
+            ")"
+        )
+        self.dbapi.execute("CREATE INDEX text_data_handle ON text_data(handle)")
+        self.dbapi.execute(
+            "CREATE VIRTUAL TABLE text_index USING fts5"
+            "(text, content = 'text_data', content_rowid = 'id', "
+            "tokenize = 'trigram')"
+        )
+        self.dbapi.execute(
+            "CREATE TRIGGER text_data_insert AFTER INSERT ON text_data BEGIN "
+            "INSERT INTO text_index (rowid, text) VALUES (new.id, new.text); "
+            "END"
+        )
+        self.dbapi.execute(
+            "CREATE TRIGGER text_data_delete AFTER DELETE ON text_data BEGIN "
+            "INSERT INTO text_index (text_index, rowid, text) "
+            "VALUES ('delete', old.id, old.text); "
+            "END"
+        )
+        return True
+
+    def load(self, directory, *args, **kwargs):
+        super().load(directory, *args, **kwargs)
+        self._sort_locales = {}
+        if not self.db_is_open or self.readonly:
+            return
+        if not self.dbapi.table_exists("family_parent"):
+            # Tree created before the edge tables
+            self._txn_begin()
+            self._create_edge_tables()
+            self._rebuild_edges()
+            self._txn_commit()
+            self._edge_tables = None
+        if not self.dbapi.table_exists("text_data"):
+            # Tree created before the text index, or with an older SQLite
+            self._txn_begin()
+            if self._create_text_index():
+                self._rebuild_text_index()
+            self._txn_commit()
+            self._text_index = None
+        if not self.dbapi.table_exists("sort_key"):
+            # Tree created before the sort keys
+            self._txn_begin()
+            self._create_sort_key_table()
+            self._txn_commit()
+        self._load_sort_keys()
 
     def _close(self):
+        if self._read_pool is not None:
+            self._read_pool.close()
+            self._read_pool = None
+        self._encoder = None
+        self._json_data = None
+        self._edge_tables = None
+        self._text_index = None
+        self._sort_key_table = None
+        self._sort_locales = None
         self.dbapi.close()
 
     def _txn_begin(self):
@@ -265,6 +598,7 @@ class DBAPI(DbGeneric):
         """
         if self.transaction == None:
             self.dbapi.rollback()
+            self._clear_cached_data()
 
     def _collation(self, locale):
         """
@@ -290,6 +624,9 @@ class DBAPI(DbGeneric):
             # A batch transaction does not store the commits
             # Aborting the session completely will become impossible.
             self.abort_possible = False
+            if transaction.defer_references:
+                # Handles of the objects whose references need rebuilding
+                self._deferred_references = defaultdict(set)
         self.transaction = transaction
         self.dbapi.begin()
         return transaction
@@ -306,6 +643,8 @@ class DBAPI(DbGeneric):
         )
 
         action = {TXNADD: "-add", TXNUPD: "-update", TXNDEL: "-delete", None: "-delete"}
+        if self._deferred_references is not None:
+            self._rebuild_deferred_references()
         self.dbapi.commit()
         if not txn.batch:
             # Now, emit signals:
@@ -338,7 +677,10 @@ class DBAPI(DbGeneric):
         Executed after a batch operation abort.
         """
         self.dbapi.rollback()
+        # The cache may hold data read inside the transaction
+        self._clear_cached_data()
         self.transaction = None
+        self._deferred_references = None
         txn.clear()
         txn.first = None
         txn.last = None
@@ -383,6 +725,122 @@ class DBAPI(DbGeneric):
             )
         self._txn_commit()
 
+    def get_blob_codec(self):
+        """
+        Return the name of the codec used to write the object data.
+        """
+        return self._get_metadata("blob-codec", DEFAULT_CODEC)
+
+    def set_blob_codec(self, codec, callback=None):
+        """
+        Select the codec used to write the object data of this tree, and
+        convert the data already stored.
+        """
+        self._encoder = get_encoder(codec)
+        UpdateCallback.__init__(self, callback)
+        convert_blob_codec(self, codec)
+
+    def _encode(self, data):
+        """
+        Encode serialized object data with the codec of this tree.
+        """
+        if self._encoder is None:
+            self._encoder = get_encoder(self.get_blob_codec())
+        return self._encoder(data)
+
+    def _decode(self, blob):
+        """
+        Decode a blob of serialized object data, counting it in the query
+        statistics.
+        """
+        if self._query_stats is not None:
+            self._query_stats.decodes += 1
+        return decode(blob)
+
+    def set_query_stats(self, stats):
+        """
+        Record the statistics of the queries of the open database in a
+        :class:`.QueryStats`, or stop recording them if stats is None.
+        """
+        super().set_query_stats(stats)
+        self._dbapi.stats = stats
+        if self._read_pool is not None:
+            self._read_pool.stats = stats
+
+    def get_json_data(self):
+        """
+        Return True if the objects are also stored as JSON.
+        """
+        return self._get_metadata("json-data", False)
+
+    def set_json_data(self, value, callback=None):
+        """
+        Start or stop storing the objects as JSON in the json_data column.
+
+        The JSON data is readable with json_extract, and indexed columns
+        are generated from it for commonly filtered fields, so that their
+        predicates can be evaluated in SQL.
+        """
+        self._txn_begin()
+        if value:
+            self._create_json_columns()
+        else:
+            self._drop_json_indexes()
+            for table in PRIMARY_TABLES:
+                if self.dbapi.column_exists(table, "json_data"):
+                    self.dbapi.execute("UPDATE %s SET json_data = NULL" % table)
+        self._txn_commit()
+        self._set_metadata("json-data", bool(value))
+        self._json_data = bool(value)
+        if value:
+            self.rebuild_secondary(callback)
+
+    def _create_json_columns(self):
+        """
+        Create the json_data columns, the columns generated from them and
+        their indexes, if they do not exist yet.
+        """
+        for table in PRIMARY_TABLES:
+            if not self.dbapi.column_exists(table, "json_data"):
+                self.dbapi.execute("ALTER TABLE %s ADD COLUMN json_data TEXT" % table)
+        for table, columns in JSON_COLUMNS.items():
+            for column, path in columns:
+                if not self.dbapi.column_exists(table, column):
+                    self.dbapi.execute(
+                        "ALTER TABLE %s ADD COLUMN %s INTEGER GENERATED ALWAYS "
+                        "AS (json_extract(json_data, '%s')) VIRTUAL"
+                        % (table, column, path)
+                    )
+        for table, column in self._json_indexes():
+            self.dbapi.execute(
+                "CREATE INDEX IF NOT EXISTS %s_%s ON %s(%s)"
+                % (table, column, table, column)
+            )
+
+    def _drop_json_indexes(self):
+        """
+        Drop the indexes on the columns generated from the JSON data.
+        """
+        for table, column in self._json_indexes():
+            self.dbapi.execute("DROP INDEX IF EXISTS %s_%s" % (table, column))
+
+    @staticmethod
+    def _json_indexes():
+        """
+        Return the (table, column) pairs indexed with the JSON data.
+        """
+        indexes = [
+            (table, column)
+            for table, columns in JSON_COLUMNS.items()
+            for column, path in columns
+        ]
+        indexes += [
+            (table, column)
+            for table, columns in JSON_INDEXES.items()
+            for column in columns
+        ]
+        return indexes
+
     def get_name_group_keys(self):
         """
         Return the defined names that have been assigned to a default grouping.
@@ -415,15 +873,17 @@ class DBAPI(DbGeneric):
         :type locale: A GrampsLocale object.
         """
         if sort_handles:
-            self.dbapi.execute(
+            handles = self._get_sorted_handles("Person", locale)
+            if handles is not None:
+                return handles
+            sql = (
                 "SELECT handle FROM person "
                 "ORDER BY surname "
                 'COLLATE "%s"' % self._collation(locale)
             )
         else:
-            self.dbapi.execute("SELECT handle FROM person")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+            sql = "SELECT handle FROM person"
+        return [row[0] for row in self._iter_rows(sql)]
 
     def get_family_handles(self, sort_handles=False, locale=glocale):
         """
@@ -436,6 +896,22 @@ class DBAPI(DbGeneric):
         :type locale: A GrampsLocale object.
         """
         if sort_handles:
+            collation = self._has_sort_keys(locale)
+            if collation is not None:
+                sql = (
+                    "SELECT family.handle FROM family "
+                    "LEFT JOIN sort_key AS father "
+                    "ON father.obj_class = 'Person' "
+                    "AND father.handle = family.father_handle "
+                    "AND father.collation = ? "
+                    "LEFT JOIN sort_key AS mother "
+                    "ON mother.obj_class = 'Person' "
+                    "AND mother.handle = family.mother_handle "
+                    "AND mother.collation = ? "
+                    "ORDER BY COALESCE(father.sort_key, mother.sort_key), "
+                    "COALESCE(father.sort_key2, mother.sort_key2)"
+                )
+                return [row[0] for row in self._iter_rows(sql, [collation] * 2)]
             sql = (
                 "SELECT family.handle "
                 + "FROM family "
@@ -453,20 +929,17 @@ class DBAPI(DbGeneric):
                 + "END) "
                 + 'COLLATE "%s"' % self._collation(locale)
             )
-            self.dbapi.execute(sql)
         else:
-            self.dbapi.execute("SELECT handle FROM family")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+            sql = "SELECT handle FROM family"
+        return [row[0] for row in self._iter_rows(sql)]
 
     def get_event_handles(self):
         """
         Return a list of database handles, one handle for each Event in the
         database.
         """
-        self.dbapi.execute("SELECT handle FROM event")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+        sql = "SELECT handle FROM event"
+        return [row[0] for row in self._iter_rows(sql)]
 
     def get_citation_handles(self, sort_handles=False, locale=glocale):
         """
@@ -479,15 +952,17 @@ class DBAPI(DbGeneric):
         :type locale: A GrampsLocale object.
         """
         if sort_handles:
-            self.dbapi.execute(
+            handles = self._get_sorted_handles("Citation", locale)
+            if handles is not None:
+                return handles
+            sql = (
                 "SELECT handle FROM citation "
                 "ORDER BY page "
                 'COLLATE "%s"' % self._collation(locale)
             )
         else:
-            self.dbapi.execute("SELECT handle FROM citation")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+            sql = "SELECT handle FROM citation"
+        return [row[0] for row in self._iter_rows(sql)]
 
     def get_source_handles(self, sort_handles=False, locale=glocale):
         """
@@ -500,15 +975,17 @@ class DBAPI(DbGeneric):
         :type locale: A GrampsLocale object.
         """
         if sort_handles:
-            self.dbapi.execute(
+            handles = self._get_sorted_handles("Source", locale)
+            if handles is not None:
+                return handles
+            sql = (
                 "SELECT handle FROM source "
                 "ORDER BY title "
                 'COLLATE "%s"' % self._collation(locale)
             )
         else:
-            self.dbapi.execute("SELECT handle from source")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+            sql = "SELECT handle from source"
+        return [row[0] for row in self._iter_rows(sql)]
 
     def get_place_handles(self, sort_handles=False, locale=glocale):
         """
@@ -521,24 +998,25 @@ class DBAPI(DbGeneric):
         :type locale: A GrampsLocale object.
         """
         if sort_handles:
-            self.dbapi.execute(
+            handles = self._get_sorted_handles("Place", locale)
+            if handles is not None:
+                return handles
+            sql = (
                 "SELECT handle FROM place "
                 "ORDER BY title "
                 'COLLATE "%s"' % self._collation(locale)
             )
         else:
-            self.dbapi.execute("SELECT handle FROM place")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+            sql = "SELECT handle FROM place"
+        return [row[0] for row in self._iter_rows(sql)]
 
     def get_repository_handles(self):
         """
         Return a list of database handles, one handle for each Repository in
         the database.
         """
-        self.dbapi.execute("SELECT handle FROM repository")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+        sql = "SELECT handle FROM repository"
+        return [row[0] for row in self._iter_rows(sql)]
 
     def get_media_handles(self, sort_handles=False, locale=glocale):
         """
@@ -551,24 +1029,25 @@ class DBAPI(DbGeneric):
         :type locale: A GrampsLocale object.
         """
         if sort_handles:
-            self.dbapi.execute(
+            handles = self._get_sorted_handles("Media", locale)
+            if handles is not None:
+                return handles
+            sql = (
                 "SELECT handle FROM media "
                 "ORDER BY desc "
                 'COLLATE "%s"' % self._collation(locale)
             )
         else:
-            self.dbapi.execute("SELECT handle FROM media")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+            sql = "SELECT handle FROM media"
+        return [row[0] for row in self._iter_rows(sql)]
 
     def get_note_handles(self):
         """
         Return a list of database handles, one handle for each Note in the
         database.
         """
-        self.dbapi.execute("SELECT handle FROM note")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+        sql = "SELECT handle FROM note"
+        return [row[0] for row in self._iter_rows(sql)]
 
     def get_tag_handles(self, sort_handles=False, locale=glocale):
         """
@@ -581,15 +1060,17 @@ class DBAPI(DbGeneric):
         :type locale: A GrampsLocale object.
         """
         if sort_handles:
-            self.dbapi.execute(
+            handles = self._get_sorted_handles("Tag", locale)
+            if handles is not None:
+                return handles
+            sql = (
                 "SELECT handle FROM tag "
                 "ORDER BY name "
                 'COLLATE "%s"' % self._collation(locale)
             )
         else:
-            self.dbapi.execute("SELECT handle FROM tag")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+            sql = "SELECT handle FROM tag"
+        return [row[0] for row in self._iter_rows(sql)]
 
     def get_tag_from_name(self, name):
         """
@@ -600,7 +1081,7 @@ class DBAPI(DbGeneric):
         self.dbapi.execute("SELECT blob_data FROM tag WHERE name = ?", [name])
         row = self.dbapi.fetchone()
         if row:
-            return Tag.create(pickle.loads(row[0]))
+            return self._create(Tag, self._decode(row[0]))
         return None
 
     def _get_number_of(self, obj_key):
@@ -646,29 +1127,223 @@ class DBAPI(DbGeneric):
         Commit the specified object to the database, storing the changes as
         part of the transaction.
         """
-        old_data = None
         obj.change = int(change_time or time.time())
         table = KEY_TO_NAME_MAP[obj_key]
-
-        if self._has_handle(obj_key, obj.handle):
-            old_data = self._get_raw_data(obj_key, obj.handle)
-            # update the object:
-            sql = "UPDATE %s SET blob_data = ? WHERE handle = ?" % table
-            self.dbapi.execute(sql, [pickle.dumps(obj.serialize()), obj.handle])
+        self._discard_cached_data(obj_key, obj.handle)
+
+        if self._bulk is not None:
+            return self._bulk_commit(obj, obj_key)
+
+        # Read the old data with the stored secondary values, so that only
+        # the values which changed are written
+        data = obj.serialize()
+        fields, values = self._get_secondary_values(obj)
+        values = self._sql_cast_list(values)
+        sql = "SELECT %s FROM %s WHERE handle = ?" % (
+            ", ".join(["blob_data"] + fields),
+            table,
+        )
+        self.dbapi.execute(sql, [obj.handle])
+        row = self.dbapi.fetchone()
+        if row is None:
+            old_data = None
+            changed = fields
         else:
-            # Insert the object:
-            sql = ("INSERT INTO %s (handle, blob_data) VALUES (?, ?)") % table
-            self.dbapi.execute(sql, [obj.handle, pickle.dumps(obj.serialize())])
-        self._update_secondary_values(obj)
+            old_data = self._decode(row[0])
+            changed = [
+                field
+                for field, old_value, value in zip(fields, row[1:], values)
+                if old_value != value
+            ]
+        sql = (
+            "INSERT INTO %s (%s) VALUES (%s) ON CONFLICT (handle) DO UPDATE SET %s"
+            % (
+                table,
+                ", ".join(["handle", "blob_data"] + fields),
+                ", ".join(["?"] * (len(fields) + 2)),
+                ", ".join(
+                    "%s = excluded.%s" % (field, field)
+                    for field in ["blob_data"] + changed
+                ),
+            )
+        )
+        self.dbapi.execute(sql, [obj.handle, self._encode(data)] + values)
+        if old_data is None or self._edges_changed(obj, old_data, data):
+            self._update_edges(obj)
+        self._update_text(obj, check=old_data is not None)
+        if old_data is None or set(changed) & set(
+            SORT_KEY_FIELDS.get(obj.__class__.__name__, ())
+        ):
+            self._update_sort_keys(obj)
         self._update_backlinks(obj, trans)
         if not trans.batch:
             if old_data:
-                trans.add(obj_key, TXNUPD, obj.handle, old_data, obj.serialize())
+                trans.add(obj_key, TXNUPD, obj.handle, old_data, data)
             else:
-                trans.add(obj_key, TXNADD, obj.handle, None, obj.serialize())
+                trans.add(obj_key, TXNADD, obj.handle, None, data)
+
+        return old_data
+
+    def commit_many(self, objects, trans, change_time=None):
+        """
+        Commit a sequence of primary objects, of any type, to the database,
+        storing the changes as part of the transaction.
+
+        In a batch transaction the objects are written in chunks of
+        BULKSIZE objects.  Each chunk needs one query per table to find the
+        existing rows, and one ``executemany`` each for the inserts, the
+        updates, the stale references and the new references.
+        """
+        if not trans.batch:
+            super().commit_many(objects, trans, change_time)
+            return
+        objects = iter(objects)
+        chunk = list(islice(objects, BULKSIZE))
+        while chunk:
+            self._bulk = BulkWrite()
+            try:
+                self._bulk_prefetch(chunk)
+                super().commit_many(chunk, trans, change_time)
+                self._bulk_flush()
+            finally:
+                self._bulk = None
+            chunk = list(islice(objects, BULKSIZE))
+
+    def _bulk_prefetch(self, objects):
+        """
+        Load the existing data for a chunk of objects about to be committed.
+        """
+        handles = defaultdict(list)
+        for obj in objects:
+            handles[CLASS_TO_KEY_MAP[obj.__class__.__name__]].append(obj.handle)
+        for obj_key, handle_list in handles.items():
+            table = KEY_TO_NAME_MAP[obj_key]
+            for start in range(0, len(handle_list), MAX_VARIABLES):
+                params = handle_list[start : start + MAX_VARIABLES]
+                sql = "SELECT handle, blob_data FROM %s WHERE handle IN (%s)" % (
+                    table,
+                    ", ".join(["?"] * len(params)),
+                )
+                self.dbapi.execute(sql, params)
+                for handle, blob in self.dbapi.fetchall():
+                    self._bulk.existing.add((obj_key, handle))
+                    self._bulk.old_data[(obj_key, handle)] = self._decode(blob)
+
+    def _bulk_commit(self, obj, obj_key):
+        """
+        Queue an object for the bulk write of the current chunk.
 
+        Returns the previously committed data of the object, if any.
+        """
+        old_data = self._bulk.old_data.get((obj_key, obj.handle))
+        data = obj.serialize()
+        fields, values = self._get_secondary_values(obj)
+        if self._deferred_references is not None:
+            self._deferred_references[obj_key].add(obj.handle)
+            refs = None
+        else:
+            refs = set(obj.get_referenced_handles_recursively())
+        self._bulk.fields[obj_key] = fields
+        if obj.__class__.__name__ in EDGE_TABLES and self._has_edge_tables():
+            self._bulk.edges[obj.__class__.__name__][obj.handle] = self._get_edges(obj)
+        if obj.__class__.__name__ in TEXT_CLASSES and self._has_text_index():
+            self._bulk.texts[(obj_key, obj.handle)] = [
+                obj.__class__.__name__,
+                obj.handle,
+                self._get_text(obj),
+            ]
+        if obj.__class__.__name__ in SORT_KEY_FIELDS and self._sort_locales:
+            self._bulk.sort_keys[(obj_key, obj.handle)] = self._get_sort_key_rows(obj)
+        self._bulk.rows[obj_key][obj.handle] = (
+            self._encode(data),
+            self._sql_cast_list(values),
+            refs,
+            obj.__class__.__name__,
+        )
+        self._bulk.old_data[(obj_key, obj.handle)] = data
         return old_data
 
+    def _bulk_flush(self):
+        """
+        Write the queued rows of the current chunk to the database.
+        """
+        for obj_key, rows in self._bulk.rows.items():
+            table = KEY_TO_NAME_MAP[obj_key]
+            fields = self._bulk.fields[obj_key]
+            inserts = []
+            updates = []
+            stale = []
+            references = []
+            for handle, (blob, values, refs, class_name) in rows.items():
+                # The old data may have been read since the object was queued
+                self._discard_cached_data(obj_key, handle)
+                if (obj_key, handle) in self._bulk.existing:
+                    updates.append([blob] + values + [handle])
+                else:
+                    inserts.append([handle, blob] + values)
+                if refs is None:
+                    # The references are rebuilt at the end of the transaction
+                    continue
+                if (obj_key, handle) in self._bulk.existing:
+                    stale.append([handle])
+                references.extend(
+                    [handle, class_name, ref_handle, ref_class_name]
+                    for ref_class_name, ref_handle in refs
+                )
+            if inserts:
+                sql = "INSERT INTO %s (%s) VALUES (%s)" % (
+                    table,
+                    ", ".join(["handle", "blob_data"] + fields),
+                    ", ".join(["?"] * (len(fields) + 2)),
+                )
+                self.dbapi.executemany(sql, inserts)
+            if updates:
+                sql = "UPDATE %s SET %s WHERE handle = ?" % (
+                    table,
+                    ", ".join("%s = ?" % field for field in ["blob_data"] + fields),
+                )
+                self.dbapi.executemany(sql, updates)
+            if stale:
+                self.dbapi.executemany(
+                    "DELETE FROM reference WHERE obj_handle = ?", stale
+                )
+            if references:
+                self.dbapi.executemany(
+                    "INSERT INTO reference "
+                    "(obj_handle, obj_class, ref_handle, ref_class) "
+                    "VALUES (?, ?, ?, ?)",
+                    references,
+                )
+        for class_name, edges in self._bulk.edges.items():
+            table, owner, columns = EDGE_TABLES[class_name]
+            obj_key = CLASS_TO_KEY_MAP[class_name]
+            self.dbapi.executemany(
+                "DELETE FROM %s WHERE %s = ?" % (table, owner),
+                [
+                    [handle]
+                    for handle in edges
+                    if (obj_key, handle) in self._bulk.existing
+                ],
+            )
+            self.dbapi.executemany(
+                "INSERT INTO %s (%s) VALUES (%s)"
+                % (table, ", ".join(columns), ", ".join(["?"] * len(columns))),
+                [row for rows in edges.values() for row in rows],
+            )
+        if self._bulk.texts:
+            self.dbapi.executemany(
+                "DELETE FROM text_data WHERE handle = ?",
+                [[key[1]] for key in self._bulk.texts if key in self._bulk.existing],
+            )
+            self.dbapi.executemany(
+                "INSERT INTO text_data (obj_class, handle, text) VALUES (?, ?, ?)",
+                list(self._bulk.texts.values()),
+            )
+        if self._bulk.sort_keys:
+            self._write_sort_keys(
+                [row for rows in self._bulk.sort_keys.values() for row in rows]
+            )
+
     def _commit_raw(self, data, obj_key):
         """
         Commit a serialized primary object to the database, storing the
@@ -676,96 +1351,136 @@ class DBAPI(DbGeneric):
         """
         table = KEY_TO_NAME_MAP[obj_key]
         handle = data[0]
+        self._discard_cached_data(obj_key, handle)
 
         if self._has_handle(obj_key, handle):
             # update the object:
             sql = "UPDATE %s SET blob_data = ? WHERE handle = ?" % table
-            self.dbapi.execute(sql, [pickle.dumps(data), handle])
+            self.dbapi.execute(sql, [self._encode(data), handle])
         else:
             # Insert the object:
             sql = ("INSERT INTO %s (handle, blob_data) VALUES (?, ?)") % table
-            self.dbapi.execute(sql, [handle, pickle.dumps(data)])
+            self.dbapi.execute(sql, [handle, self._encode(data)])
 
         return
 
     def _update_backlinks(self, obj, transaction):
-        if not transaction.batch:
-            # Find existing references
-            sql = (
-                "SELECT ref_class, ref_handle " + "FROM reference WHERE obj_handle = ?"
-            )
-            self.dbapi.execute(sql, [obj.handle])
-            existing_references = set(self.dbapi.fetchall())
-
-            # Once we have the list of rows that already have a reference
-            # we need to compare it with the list of objects that are
-            # still references from the primary object.
-            current_references = set(obj.get_referenced_handles_recursively())
-            no_longer_required_references = existing_references.difference(
-                current_references
-            )
-            new_references = current_references.difference(existing_references)
+        """
+        Bring the references of an object up to date, writing only the rows
+        which changed.
+        """
+        if transaction.batch and self._deferred_references is not None:
+            obj_key = CLASS_TO_KEY_MAP[obj.__class__.__name__]
+            self._deferred_references[obj_key].add(obj.handle)
+            return
 
-            # Delete the existing references
-            self.dbapi.execute(
-                "DELETE FROM reference WHERE obj_handle = ?", [obj.handle]
+        # Find existing references
+        self.dbapi.execute(
+            "SELECT ref_class, ref_handle FROM reference WHERE obj_handle = ?",
+            [obj.handle],
+        )
+        existing_references = set(self.dbapi.fetchall())
+
+        # Once we have the list of rows that already have a reference
+        # we need to compare it with the list of objects that are
+        # still references from the primary object.
+        current_references = set(obj.get_referenced_handles_recursively())
+        no_longer_required_references = existing_references.difference(
+            current_references
+        )
+        new_references = current_references.difference(existing_references)
+        obj_class = obj.__class__.__name__
+
+        # Delete the old references, and add the new ones
+        if no_longer_required_references:
+            self.dbapi.executemany(
+                "DELETE FROM reference "
+                "WHERE obj_handle = ? AND ref_handle = ? AND ref_class = ?",
+                [
+                    [obj.handle, ref_handle, ref_class_name]
+                    for ref_class_name, ref_handle in no_longer_required_references
+                ],
+            )
+        if new_references:
+            self.dbapi.executemany(
+                "INSERT INTO reference "
+                "(obj_handle, obj_class, ref_handle, ref_class) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    [obj.handle, obj_class, ref_handle, ref_class_name]
+                    for ref_class_name, ref_handle in new_references
+                ],
             )
+        if transaction.batch:
+            return
 
-            # Now, add the current ones
-            for ref_class_name, ref_handle in current_references:
-                sql = (
-                    "INSERT INTO reference "
-                    + "(obj_handle, obj_class, ref_handle, ref_class)"
-                    + "VALUES(?, ?, ?, ?)"
-                )
-                self.dbapi.execute(
-                    sql,
-                    [obj.handle, obj.__class__.__name__, ref_handle, ref_class_name],
-                )
+        # Add new references to the transaction
+        for ref_class_name, ref_handle in new_references:
+            key = (obj.handle, ref_handle)
+            data = (obj.handle, obj_class, ref_handle, ref_class_name)
+            transaction.add(REFERENCE_KEY, TXNADD, key, None, data)
 
-            # Add new references to the transaction
-            for ref_class_name, ref_handle in new_references:
-                key = (obj.handle, ref_handle)
-                data = (obj.handle, obj.__class__.__name__, ref_handle, ref_class_name)
-                transaction.add(REFERENCE_KEY, TXNADD, key, None, data)
-
-            # Add old references to the transaction
-            for ref_class_name, ref_handle in no_longer_required_references:
-                key = (obj.handle, ref_handle)
-                old_data = (
-                    obj.handle,
-                    obj.__class__.__name__,
-                    ref_handle,
-                    ref_class_name,
-                )
-                transaction.add(REFERENCE_KEY, TXNDEL, key, old_data, None)
-        else:  # batch mode
-            current_references = set(obj.get_referenced_handles_recursively())
+        # Add old references to the transaction
+        for ref_class_name, ref_handle in no_longer_required_references:
+            key = (obj.handle, ref_handle)
+            old_data = (obj.handle, obj_class, ref_handle, ref_class_name)
+            transaction.add(REFERENCE_KEY, TXNDEL, key, old_data, None)
 
-            # Delete the existing references
-            self.dbapi.execute(
-                "DELETE FROM reference WHERE obj_handle = ?", [obj.handle]
-            )
+    def _rebuild_deferred_references(self):
+        """
+        Rebuild the reference map of every object committed in a batch
+        transaction with deferred references.
 
-            # Now, add the current ones
-            for ref_class_name, ref_handle in current_references:
-                sql = (
-                    "INSERT INTO reference "
-                    + "(obj_handle, obj_class, ref_handle, ref_class)"
-                    + "VALUES(?, ?, ?, ?)"
+        The stale rows are deleted first, then the reference indexes are
+        dropped while the new rows are bulk inserted and created again
+        afterwards.
+        """
+        touched, self._deferred_references = self._deferred_references, None
+        self.dbapi.executemany(
+            "DELETE FROM reference WHERE obj_handle = ?",
+            [[handle] for handles in touched.values() for handle in handles],
+        )
+        self._drop_reference_indexes()
+        for obj_key, handles in touched.items():
+            table = KEY_TO_NAME_MAP[obj_key]
+            class_name = KEY_TO_CLASS_MAP[obj_key]
+            class_func = self._get_table_func(class_name, "class_func")
+            handles = list(handles)
+            for start in range(0, len(handles), MAX_VARIABLES):
+                params = handles[start : start + MAX_VARIABLES]
+                sql = "SELECT blob_data FROM %s WHERE handle IN (%s)" % (
+                    table,
+                    ", ".join(["?"] * len(params)),
                 )
-                self.dbapi.execute(
-                    sql,
-                    [obj.handle, obj.__class__.__name__, ref_handle, ref_class_name],
+                self.dbapi.execute(sql, params)
+                references = []
+                for (blob,) in self.dbapi.fetchall():
+                    obj = self._create(class_func, self._decode(blob))
+                    references.extend(
+                        [obj.handle, class_name, ref_handle, ref_class_name]
+                        for ref_class_name, ref_handle in set(
+                            obj.get_referenced_handles_recursively()
+                        )
+                    )
+                self.dbapi.executemany(
+                    "INSERT INTO reference "
+                    "(obj_handle, obj_class, ref_handle, ref_class) "
+                    "VALUES (?, ?, ?, ?)",
+                    references,
                 )
+        self._create_reference_indexes()
 
     def _do_remove(self, handle, transaction, obj_key):
         if self.readonly or not handle:
             return
         if self._has_handle(obj_key, handle):
             data = self._get_raw_data(obj_key, handle)
+            self._discard_cached_data(obj_key, handle)
             obj_class = KEY_TO_CLASS_MAP[obj_key]
             self._remove_backlinks(obj_class, handle, transaction)
+            self._delete_edges(obj_class, handle)
+            self._delete_text(obj_class, handle)
+            self._delete_sort_keys(obj_class, handle)
             table = KEY_TO_NAME_MAP[obj_key]
             sql = "DELETE FROM %s WHERE handle = ?" % table
             self.dbapi.execute(sql, [handle])
@@ -791,6 +1506,468 @@ class DBAPI(DbGeneric):
                 old_data = (obj_handle, obj_class, ref_handle, ref_class_name)
                 transaction.add(REFERENCE_KEY, TXNDEL, key, old_data, None)
 
+    def _has_edge_tables(self):
+        """
+        Return True if the tree has the tables of the parent and child edges.
+        """
+        if self._edge_tables is None:
+            self._edge_tables = self.dbapi.table_exists("family_parent")
+        return self._edge_tables
+
+    @staticmethod
+    def _get_edges(obj):
+        """
+        Return the rows of the edge table owned by a person or a family.
+        """
+        if isinstance(obj, Family):
+            return [
+                [obj.handle, parent]
+                for parent in (obj.father_handle, obj.mother_handle)
+                if parent
+            ]
+        return [
+            [family, obj.handle, int(index == 0)]
+            for index, family in enumerate(obj.parent_family_list)
+        ]
+
+    @staticmethod
+    def _edges_changed(obj, old_data, data):
+        """
+        Return True if the edge rows owned by an object may differ between
+        its old and new serialized data.
+        """
+        items = EDGE_DATA.get(obj.__class__.__name__)
+        return items is not None and old_data[items] != data[items]
+
+    def _update_edges(self, obj):
+        """
+        Replace the rows of the edge table owned by a person or a family.
+        """
+        class_name = obj.__class__.__name__
+        if class_name not in EDGE_TABLES or not self._has_edge_tables():
+            return
+        table, owner, columns = EDGE_TABLES[class_name]
+        self.dbapi.execute("DELETE FROM %s WHERE %s = ?" % (table, owner), [obj.handle])
+        rows = self._get_edges(obj)
+        if rows:
+            self.dbapi.executemany(
+                "INSERT INTO %s (%s) VALUES (%s)"
+                % (table, ", ".join(columns), ", ".join(["?"] * len(columns))),
+                rows,
+            )
+
+    def _delete_edges(self, class_name, handle):
+        """
+        Delete the rows of the edge table owned by a person or a family.
+        """
+        if class_name not in EDGE_TABLES or not self._has_edge_tables():
+            return
+        table, owner, columns = EDGE_TABLES[class_name]
+        self.dbapi.execute("DELETE FROM %s WHERE %s = ?" % (table, owner), [handle])
+
+    def _rebuild_edges(self):
+        """
+        Rebuild the edge tables from the people and families.
+        """
+        for class_name, objects in (
+            ("Family", self.iter_families()),
+            ("Person", self.iter_people()),
+        ):
+            table, owner, columns = EDGE_TABLES[class_name]
+            self.dbapi.execute("DELETE FROM %s" % table)
+            sql = "INSERT INTO %s (%s) VALUES (%s)" % (
+                table,
+                ", ".join(columns),
+                ", ".join(["?"] * len(columns)),
+            )
+            rows = []
+            for obj in objects:
+                rows.extend(self._get_edges(obj))
+                if len(rows) >= BULKSIZE:
+                    self.dbapi.executemany(sql, rows)
+                    rows = []
+            if rows:
+                self.dbapi.executemany(sql, rows)
+
+    def _walk_edges(self, handle, generations, up, main_family=False):
+        """
+        Return the set of the people reached from a person by a recursive
+        query on the edge tables, going up to the parents or down to the
+        children, not more than generations steps away.
+        """
+        if up:
+            join = (
+                "JOIN family_child ON family_child.person_handle = walk.handle "
+                "JOIN family_parent "
+                "ON family_parent.family_handle = family_child.family_handle"
+            )
+            if main_family:
+                join += " AND family_child.main = 1"
+            column = "family_parent.person_handle"
+        else:
+            join = (
+                "JOIN family_parent ON family_parent.person_handle = walk.handle "
+                "JOIN family_child "
+                "ON family_child.family_handle = family_parent.family_handle"
+            )
+            column = "family_child.person_handle"
+        if generations is None:
+            # Without a generation column, UNION stops at loops in the tree
+            sql = (
+                "WITH RECURSIVE walk(handle) AS "
+                "(SELECT ? UNION SELECT %s FROM walk %s) "
+                "SELECT handle FROM walk" % (column, join)
+            )
+            args = [handle]
+        else:
+            sql = (
+                "WITH RECURSIVE walk(handle, generation) AS "
+                "(SELECT ?, 0 UNION "
+                "SELECT %s, walk.generation + 1 FROM walk %s "
+                "WHERE walk.generation < ?) "
+                "SELECT DISTINCT handle FROM walk" % (column, join)
+            )
+            args = [handle, generations]
+        handles = {row[0] for row in self._iter_rows(sql, args)}
+        handles.discard(handle)
+        return handles
+
+    def get_ancestor_handles(self, handle, generations=None, main_family=False):
+        """
+        Return the set of the handles of the ancestors of a person, not more
+        than generations generations away, found with a recursive query.
+        """
+        if not self._has_edge_tables():
+            return None
+        return self._walk_edges(handle, generations, True, main_family)
+
+    def get_descendant_handles(self, handle, generations=None):
+        """
+        Return the set of the handles of the descendants of a person, not
+        more than generations generations away, found with a recursive
+        query.
+        """
+        if not self._has_edge_tables():
+            return None
+        return self._walk_edges(handle, generations, False)
+
+    def get_common_ancestor_handles(self, handle1, handle2):
+        """
+        Return the set of the handles of the people who are ancestors of
+        both people, or one of them and an ancestor of the other.
+        """
+        ancestors1 = self.get_ancestor_handles(handle1)
+        if ancestors1 is None:
+            return None
+        ancestors1.add(handle1)
+        ancestors2 = self.get_ancestor_handles(handle2)
+        ancestors2.add(handle2)
+        return ancestors1 & ancestors2
+
+    def get_reference_closure(self, handles, include_start=True, backlinks=None):
+        """
+        Return the handles of the objects reached from some objects by
+        following their references, and the references of the objects
+        reached, by class name, found with one query per class and step on
+        the reference table.
+        """
+        if self._deferred_references is not None:
+            # The reference table is rebuilt at the end of the transaction
+            return None
+        backlinks = backlinks or {}
+        closure = defaultdict(set)
+        visited = set()
+        frontier = []
+        for class_name, handle in handles:
+            if handle not in visited:
+                visited.add(handle)
+                frontier.append((class_name, handle))
+                if include_start:
+                    closure[class_name].add(handle)
+        while frontier:
+            reached = []
+            for class_name, handle_list in self._group_by_class(frontier).items():
+                reached.extend(self._get_references(handle_list))
+                if class_name in backlinks:
+                    reached.extend(
+                        self._get_references(handle_list, backlinks[class_name])
+                    )
+            frontier = []
+            for class_name, handle in reached:
+                closure[class_name].add(handle)
+                if handle not in visited:
+                    visited.add(handle)
+                    frontier.append((class_name, handle))
+        return dict(closure)
+
+    @staticmethod
+    def _group_by_class(objects):
+        """
+        Return the handles of (class_name, handle) pairs by class name.
+        """
+        groups = defaultdict(list)
+        for class_name, handle in objects:
+            groups[class_name].append(handle)
+        return groups
+
+    def _get_references(self, handles, backlink_classes=None):
+        """
+        Return the (class_name, handle) pairs of the objects referenced by
+        some objects or, if backlink_classes is given, of the objects of
+        those classes referring to them.
+        """
+        if backlink_classes is None:
+            sql = "SELECT ref_class, ref_handle FROM reference WHERE obj_handle IN (%s)"
+            extra = []
+        else:
+            sql = (
+                "SELECT obj_class, obj_handle FROM reference "
+                "WHERE ref_handle IN (%%s) AND obj_class IN (%s)"
+                % ", ".join(["?"] * len(backlink_classes))
+            )
+            extra = list(backlink_classes)
+        references = []
+        for start in range(0, len(handles), MAX_VARIABLES):
+            params = handles[start : start + MAX_VARIABLES]
+            self.dbapi.execute(
+                sql % ", ".join(["?"] * len(params)), list(params) + extra
+            )
+            references.extend(self.dbapi.fetchall())
+        return references
+
+    def _has_text_index(self):
+        """
+        Return True if the tree has the full-text index of the text data.
+        """
+        if self._text_index is None:
+            self._text_index = self.dbapi.table_exists("text_data")
+        return self._text_index
+
+    @staticmethod
+    def _get_text(obj):
+        """
+        Return the text data of an object and of its child objects, upper
+        cased, one item per line.
+        """
+        items = []
+        objects = [obj]
+        while objects:
+            item = objects.pop()
+            items.extend(text.upper() for text in item.get_text_data_list() if text)
+            objects.extend(item.get_text_data_child_list())
+        return "\n".join(items)
+
+    def _update_text(self, obj, check=False):
+        """
+        Replace the row of the text index of an object.  If check is True,
+        the row is kept if the text is unchanged.
+        """
+        class_name = obj.__class__.__name__
+        if class_name not in TEXT_CLASSES or not self._has_text_index():
+            return
+        text = self._get_text(obj)
+        if check:
+            self.dbapi.execute(
+                "SELECT text FROM text_data WHERE handle = ?", [obj.handle]
+            )
+            row = self.dbapi.fetchone()
+            if row is not None and row[0] == text:
+                return
+        self.dbapi.execute("DELETE FROM text_data WHERE handle = ?", [obj.handle])
+        self.dbapi.execute(
+            "INSERT INTO text_data (obj_class, handle, text) VALUES (?, ?, ?)",
+            [class_name, obj.handle, text],
+        )
+
+    def _delete_text(self, class_name, handle):
+        """
+        Delete the row of the text index of an object.
+        """
+        if class_name not in TEXT_CLASSES or not self._has_text_index():
+            return
+        self.dbapi.execute("DELETE FROM text_data WHERE handle = ?", [handle])
+
+    def _rebuild_text_index(self):
+        """
+        Rebuild the text index from the primary objects.
+        """
+        self.dbapi.execute("DELETE FROM text_data")
+        sql = "INSERT INTO text_data (obj_class, handle, text) VALUES (?, ?, ?)"
+        for class_name in TEXT_CLASSES:
+            rows = []
+            for obj in self._get_table_func(class_name, "iter_func")():
+                rows.append([class_name, obj.handle, self._get_text(obj)])
+                if len(rows) >= BULKSIZE:
+                    self.dbapi.executemany(sql, rows)
+                    rows = []
+            if rows:
+                self.dbapi.executemany(sql, rows)
+
+    def get_text_search(self, class_name, text):
+        """
+        Return an SQL condition for :meth:`select_handles` selecting the
+        objects of the given class whose text data, or that of their child
+        objects, contains text ignoring case.
+
+        The condition may select a few more objects, such as those where
+        the text spans two items, so the objects must still be checked.
+        Returns None if the text is too short for the index, or the tree
+        has no text index.
+        """
+        if (
+            class_name not in TEXT_CLASSES
+            or len(text) < MIN_TEXT_SEARCH
+            or not self._has_text_index()
+        ):
+            return None
+        return (
+            "handle IN (SELECT handle FROM text_data WHERE obj_class = ? "
+            "AND id IN (SELECT rowid FROM text_index WHERE text_index MATCH ?))",
+            [class_name, '"%s"' % text.upper().replace('"', '""')],
+        )
+
+    def _has_sort_key_table(self):
+        """
+        Return True if the tree has the table of the sort keys.
+        """
+        if self._sort_key_table is None:
+            self._sort_key_table = self.dbapi.table_exists("sort_key")
+        return self._sort_key_table
+
+    @staticmethod
+    def _get_collation_version(locale):
+        """
+        Return a digest of the sort keys of a few texts, which changes with
+        the rules of the collation.
+        """
+        keys = "\n".join(locale.sort_key(text) for text in SORT_KEY_PROBE)
+        return hashlib.sha1(keys.encode("utf-8", "surrogatepass")).hexdigest()
+
+    def _load_sort_keys(self):
+        """
+        Keep the sort keys of the collation of the user interface if they
+        were made by the same version of the collation, or make them.  Drop
+        all the other keys: their locales are not known.
+        """
+        collations = self._get_metadata("sort-keys", {})
+        collation = self._collation(glocale)
+        current = collations.get(collation) == self._get_collation_version(glocale)
+        stale = [name for name in collations if not current or name != collation]
+        if current and not stale:
+            self._sort_locales[collation] = glocale
+            return
+        self._txn_begin()
+        for name in stale:
+            self.dbapi.execute("DELETE FROM sort_key WHERE collation = ?", [name])
+            del collations[name]
+        if not current:
+            self._make_sort_keys(collation, glocale)
+            collations[collation] = self._get_collation_version(glocale)
+        self._txn_commit()
+        self._set_metadata("sort-keys", collations)
+        self._sort_locales[collation] = glocale
+
+    @staticmethod
+    def _make_sort_key_row(class_name, handle, collation, locale, values):
+        """
+        Return the row of the sort keys of an object for a collation.
+        """
+        keys = [locale.sort_key(value or "") for value in values]
+        return [class_name, handle, collation, keys[0], keys[1] if values[1:] else ""]
+
+    def _get_sort_key_rows(self, obj):
+        """
+        Return the rows of the sort keys of an object, one for each
+        collation with keys.
+        """
+        class_name = obj.__class__.__name__
+        if class_name == "Person":
+            given_name, surname = self._get_person_data(obj)
+            values = (surname, given_name)
+        else:
+            values = tuple(getattr(obj, field) for field in SORT_KEY_FIELDS[class_name])
+        return [
+            self._make_sort_key_row(class_name, obj.handle, collation, locale, values)
+            for collation, locale in self._sort_locales.items()
+        ]
+
+    def _write_sort_keys(self, rows):
+        """
+        Insert or replace rows of sort keys.
+        """
+        self.dbapi.executemany(
+            "INSERT INTO sort_key "
+            "(obj_class, handle, collation, sort_key, sort_key2) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (obj_class, handle, collation) DO UPDATE SET "
+            "sort_key = excluded.sort_key, sort_key2 = excluded.sort_key2",
+            rows,
+        )
+
+    def _update_sort_keys(self, obj):
+        """
+        Replace the rows of the sort keys of an object.
+        """
+        if obj.__class__.__name__ in SORT_KEY_FIELDS and self._sort_locales:
+            self._write_sort_keys(self._get_sort_key_rows(obj))
+
+    def _delete_sort_keys(self, class_name, handle):
+        """
+        Delete the rows of the sort keys of an object.
+        """
+        if class_name not in SORT_KEY_FIELDS or not self._has_sort_key_table():
+            return
+        self.dbapi.execute(
+            "DELETE FROM sort_key WHERE obj_class = ? AND handle = ?",
+            [class_name, handle],
+        )
+
+    def _make_sort_keys(self, collation, locale):
+        """
+        Make the sort keys of all the objects for a collation, from the
+        secondary columns.
+        """
+        self.dbapi.execute("DELETE FROM sort_key WHERE collation = ?", [collation])
+        for class_name, fields in SORT_KEY_FIELDS.items():
+            sql = "SELECT handle, %s FROM %s" % (", ".join(fields), class_name.lower())
+            rows = []
+            for row in self._iter_rows(sql):
+                rows.append(
+                    self._make_sort_key_row(
+                        class_name, row[0], collation, locale, row[1:]
+                    )
+                )
+                if len(rows) >= BULKSIZE:
+                    self._write_sort_keys(rows)
+                    rows = []
+            if rows:
+                self._write_sort_keys(rows)
+
+    def _has_sort_keys(self, locale):
+        """
+        Return the collation of a locale if the tree has sort keys for it,
+        or None.  The keys of the locale of the user interface are made when
+        the tree is loaded; other locales sort with the collation of SQLite.
+        """
+        collation = self._collation(locale)
+        if collation in self._sort_locales:
+            return collation
+        return None
+
+    def _get_sorted_handles(self, class_name, locale):
+        """
+        Return the handles of the objects of a class in the order of their
+        sort keys, or None if the tree has no sort keys for the locale.
+        """
+        collation = self._has_sort_keys(locale)
+        if collation is None:
+            return None
+        sql = (
+            "SELECT handle FROM sort_key WHERE collation = ? AND obj_class = ? "
+            "ORDER BY sort_key, sort_key2"
+        )
+        return [row[0] for row in self._iter_rows(sql, [collation, class_name])]
+
     def find_backlink_handles(self, handle, include_classes=None):
         """
         Find all objects that hold a reference to the object handle.
@@ -808,12 +1985,8 @@ class DBAPI(DbGeneric):
 
             result_list = list(find_backlink_handles(handle))
         """
-        self.dbapi.execute(
-            "SELECT obj_class, obj_handle " "FROM reference " "WHERE ref_handle = ?",
-            [handle],
-        )
-        rows = self.dbapi.fetchall()
-        for row in rows:
+        sql = "SELECT obj_class, obj_handle FROM reference WHERE ref_handle = ?"
+        for row in self._iter_rows(sql, [handle]):
             if (include_classes is None) or (row[0] in include_classes):
                 yield (row[0], row[1])
 
@@ -832,17 +2005,40 @@ class DBAPI(DbGeneric):
         if row:
             return self.get_person_from_handle(row[0])
 
+    def select_handles(self, class_name, where=None, args=None):
+        """
+        Return the handles of the objects of the given class matching an
+        SQL condition on the columns of their table, in table order.
+        """
+        table = KEY_TO_NAME_MAP[CLASS_TO_KEY_MAP[class_name]]
+        sql = "SELECT handle FROM %s" % table
+        if where:
+            sql += " WHERE %s" % where
+        return [row[0] for row in self._iter_rows(sql, args)]
+
     def _iter_handles(self, obj_key):
         """
         Return an iterator over handles in the database
         """
         table = KEY_TO_NAME_MAP[obj_key]
         sql = "SELECT handle FROM %s" % table
-        self.dbapi.execute(sql)
-        rows = self.dbapi.fetchall()
-        for row in rows:
+        for row in self._iter_rows(sql):
             yield row[0]
 
+    def _iter_rows(self, sql, args=None):
+        """
+        Return an iterator over the rows of a query.
+
+        The rows are read in batches from a dedicated cursor, so that the
+        caller may run other queries while iterating.
+        """
+        with self.dbapi.cursor() as cursor:
+            cursor.execute(sql, args or [])
+            rows = cursor.fetchmany()
+            while rows:
+                yield from rows
+                rows = cursor.fetchmany()
+
     def _iter_raw_data(self, obj_key):
         """
         Return an iterator over raw data in the database.
@@ -854,22 +2050,25 @@ class DBAPI(DbGeneric):
             rows = cursor.fetchmany()
             while rows:
                 for row in rows:
-                    yield (row[0], pickle.loads(row[1]))
+                    yield (row[0], self._decode(row[1]))
                 rows = cursor.fetchmany()
 
     def _iter_raw_place_tree_data(self):
         """
         Return an iterator over raw data in the place hierarchy.
         """
-        to_do = [""]
-        sql = "SELECT handle, blob_data FROM place WHERE enclosed_by = ?"
-        while to_do:
-            handle = to_do.pop()
-            self.dbapi.execute(sql, [handle])
-            rows = self.dbapi.fetchall()
-            for row in rows:
-                to_do.append(row[0])
-                yield (row[0], pickle.loads(row[1]))
+        # The rows come out in the order they are queued, so every place
+        # follows the place enclosing it
+        sql = (
+            "WITH RECURSIVE tree(handle, blob_data) AS ("
+            "SELECT handle, blob_data FROM place WHERE enclosed_by = '' "
+            "UNION ALL "
+            "SELECT place.handle, place.blob_data FROM tree "
+            "JOIN place ON place.enclosed_by = tree.handle) "
+            "SELECT handle, blob_data FROM tree"
+        )
+        for row in self._iter_rows(sql):
+            yield (row[0], self._decode(row[1]))
 
     def reindex_reference_map(self, callback):
         """
@@ -911,7 +2110,7 @@ class DBAPI(DbGeneric):
             logging.info("Rebuilding %s reference map", class_func.__name__)
             with cursor_func() as cursor:
                 for found_handle, val in cursor:
-                    obj = class_func.create(val)
+                    obj = self._create(class_func, val)
                     references = set(obj.get_referenced_handles_recursively())
                     # handle addition of new references
                     for ref_class_name, ref_handle in references:
@@ -971,6 +2170,15 @@ class DBAPI(DbGeneric):
                 obj = self.method("get_%s_from_handle", obj_type)(handle)
                 self._update_secondary_values(obj)
                 self.update()
+        if not self._has_edge_tables():
+            self._create_edge_tables()
+            self._edge_tables = None
+        self._rebuild_edges()
+        if self._has_text_index() or self._create_text_index():
+            self._text_index = None
+            self._rebuild_text_index()
+        for collation, locale in self._sort_locales.items():
+            self._make_sort_keys(collation, locale)
         self._txn_commit()
 
         # Next, rebuild stats:
@@ -992,9 +2200,7 @@ class DBAPI(DbGeneric):
     def _get_gramps_ids(self, obj_key):
         table = KEY_TO_NAME_MAP[obj_key]
         sql = "SELECT gramps_id FROM %s" % table
-        self.dbapi.execute(sql)
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+        return [row[0] for row in self._iter_rows(sql)]
 
     def _get_raw_data(self, obj_key, handle):
         table = KEY_TO_NAME_MAP[obj_key]
@@ -1002,7 +2208,7 @@ class DBAPI(DbGeneric):
         self.dbapi.execute(sql, [handle])
         row = self.dbapi.fetchone()
         if row:
-            return pickle.loads(row[0])
+            return self._decode(row[0])
 
     def _get_raw_from_id_data(self, obj_key, gramps_id):
         table = KEY_TO_NAME_MAP[obj_key]
@@ -1010,7 +2216,7 @@ class DBAPI(DbGeneric):
         self.dbapi.execute(sql, [gramps_id])
         row = self.dbapi.fetchone()
         if row:
-            return pickle.loads(row[0])
+            return self._decode(row[0])
 
     def get_gender_stats(self):
         """
@@ -1062,15 +2268,21 @@ class DBAPI(DbGeneric):
         if data is None:
             sql = "DELETE FROM %s WHERE handle = ?" % table
             self.dbapi.execute(sql, [handle])
+            self._delete_edges(cls, handle)
+            self._delete_text(cls, handle)
+            self._delete_sort_keys(cls, handle)
         else:
             if self._has_handle(obj_key, handle):
                 sql = "UPDATE %s SET blob_data = ? WHERE handle = ?" % table
-                self.dbapi.execute(sql, [pickle.dumps(data), handle])
+                self.dbapi.execute(sql, [self._encode(data), handle])
             else:
                 sql = "INSERT INTO %s (handle, blob_data) VALUES (?, ?)" % table
-                self.dbapi.execute(sql, [handle, pickle.dumps(data)])
-            obj = self._get_table_func(cls)["class_func"].create(data)
+                self.dbapi.execute(sql, [handle, self._encode(data)])
+            obj = self._create(self._get_table_func(cls)["class_func"], data)
             self._update_secondary_values(obj)
+            self._update_edges(obj)
+            self._update_text(obj)
+            self._update_sort_keys(obj)
 
     def get_surname_list(self):
         """
@@ -1125,34 +2337,43 @@ class DBAPI(DbGeneric):
                         % (table_name, field, sql_type)
                     )
 
-    def _update_secondary_values(self, obj):
+    def _get_secondary_values(self, obj):
         """
-        Given a primary object update its secondary field values
-        in the database.
-        Does not commit.
+        Given a primary object return the names and values of its secondary
+        fields, including the derived ones.
         """
         table = obj.__class__.__name__
-        fields = [field[0] for field in obj.get_secondary_fields()]
-        sets = []
-        values = []
-        for field in fields:
-            sets.append("%s = ?" % field)
-            values.append(getattr(obj, field))
+        fields = [
+            field[0] for field in obj.get_secondary_fields() if field[0] != "handle"
+        ]
+        values = [getattr(obj, field) for field in fields]
 
         # Derived fields
         if table == "Person":
             given_name, surname = self._get_person_data(obj)
-            sets.append("given_name = ?")
-            values.append(given_name)
-            sets.append("surname = ?")
-            values.append(surname)
+            fields += ["given_name", "surname"]
+            values += [given_name, surname]
         if table == "Place":
             handle = self._get_place_data(obj)
-            sets.append("enclosed_by = ?")
+            fields.append("enclosed_by")
             values.append(handle)
+        if self._json_data is None:
+            self._json_data = self.get_json_data()
+        if self._json_data:
+            fields.append("json_data")
+            values.append(to_json(obj))
+        return fields, values
 
+    def _update_secondary_values(self, obj):
+        """
+        Given a primary object update its secondary field values
+        in the database.
+        Does not commit.
+        """
+        fields, values = self._get_secondary_values(obj)
         if len(values) > 0:
-            table_name = table.lower()
+            table_name = obj.__class__.__name__.lower()
+            sets = ["%s = ?" % field for field in fields]
             self.dbapi.execute(
                 "UPDATE %s SET %s where handle = ?" % (table_name, ", ".join(sets)),
                 self._sql_cast_list(values) + [obj.handle],
@@ -32,6 +32,9 @@ import sqlite3
 import os
 import re
 import logging
+import threading
+from time import perf_counter
+from urllib.request import pathname2url
 
 # -------------------------------------------------------------------------
 #
@@ -44,8 +47,56 @@ from gramps.gen.const import GRAMPS_LOCALE as glocale
 
 _ = glocale.translation.gettext
 
+LOG = logging.getLogger(".sqlite")
+
 sqlite3.paramstyle = "qmark"
 
+# -------------------------------------------------------------------------
+#
+# Connection profiles
+#
+# -------------------------------------------------------------------------
+# Named sets of the PRAGMA settings applied when a tree is opened.
+PROFILES = {
+    # The stock SQLite settings: rollback journal, full syncs.
+    "safe": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "temp_store": "DEFAULT",
+        "mmap_size": 0,
+    },
+    # Large batch writes, with no syncs at all: a crash of the operating
+    # system or a power loss may corrupt the tree.
+    "fast-import": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -262144,
+        "temp_store": "MEMORY",
+        "mmap_size": 268435456,
+    },
+    # The batch transactions of any tree, which keep its journal mode:
+    # larger caches and fewer syncs than FULL; a power loss may lose the
+    # last batch.
+    "batch": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -262144,
+        "temp_store": "MEMORY",
+        "mmap_size": 268435456,
+    },
+    # Large trees that are mostly browsed and reported on.
+    "read-mostly": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,
+        "temp_store": "MEMORY",
+        "mmap_size": 1073741824,
+    },
+}
+DEFAULT_PROFILE = "safe"
+PRAGMAS = ("journal_mode", "synchronous", "cache_size", "temp_store", "mmap_size")
+
 
 # -------------------------------------------------------------------------
 #
@@ -53,6 +104,9 @@ sqlite3.paramstyle = "qmark"
 #
 # -------------------------------------------------------------------------
 class SQLite(DBAPI):
+    # Profile used for the duration of batch transactions, or None
+    batch_profile = "batch"
+
     def get_summary(self):
         """
         Return a dictionary of information about this database backend.
@@ -63,6 +117,7 @@ class SQLite(DBAPI):
                 _("Database version"): sqlite3.sqlite_version,
                 _("Database module version"): sqlite3.version,
                 _("Database module location"): sqlite3.__file__,
+                _("Connection profile"): str(self.get_connection_profile()),
             }
         )
         return summary
@@ -73,6 +128,104 @@ class SQLite(DBAPI):
         else:
             path_to_db = os.path.join(directory, "sqlite.db")
         self.dbapi = Connection(path_to_db)
+        self.dbapi.stats = self._query_stats
+        profile = DEFAULT_PROFILE
+        if self.dbapi.table_exists("metadata"):
+            profile = self._get_metadata("connection-profile", DEFAULT_PROFILE)
+        try:
+            self._profile = self._profile_settings(profile)
+        except ValueError as err:
+            LOG.warning(str(err))
+            self._profile = PROFILES[DEFAULT_PROFILE]
+        # The journal mode cannot be changed on a read-only file
+        self.dbapi.set_pragmas(self._profile, journal=not self.readonly)
+        self._path = path_to_db
+        self._update_read_pool()
+
+    def _update_read_pool(self):
+        """
+        Create or remove the pool of read-only connections.
+
+        Readers only get their own snapshot in WAL mode; with a rollback
+        journal a long running reader would block the writer, so all
+        readers then share the main connection.
+        """
+        use_pool = self._path != ":memory:" and self.dbapi.journal_mode() == "wal"
+        if use_pool and self._read_pool is None:
+            self._read_pool = ConnectionPool(self._path, self._profile)
+            self._read_pool.stats = self._query_stats
+        elif use_pool:
+            self._read_pool.settings = self._profile
+        elif self._read_pool is not None:
+            self._read_pool.close()
+            self._read_pool = None
+
+    @staticmethod
+    def _profile_settings(profile):
+        """
+        Return the PRAGMA settings of a connection profile.
+
+        :param profile: the name of one of the PROFILES, or a dictionary of
+                        settings overriding those of the default profile.
+        :type profile: str or dict
+        :returns: the PRAGMA settings.
+        :rtype: dict
+        """
+        if isinstance(profile, dict):
+            settings = dict(PROFILES[DEFAULT_PROFILE])
+            settings.update(profile)
+            return settings
+        if profile not in PROFILES:
+            raise ValueError("Unknown connection profile: %s" % profile)
+        return PROFILES[profile]
+
+    def get_connection_profile(self):
+        """
+        Return the connection profile of this tree, either a profile name or
+        a dictionary of PRAGMA settings.
+        """
+        return self._get_metadata("connection-profile", DEFAULT_PROFILE)
+
+    def set_connection_profile(self, profile):
+        """
+        Store the connection profile of this tree and apply it.
+
+        :param profile: the name of one of the PROFILES, or a dictionary of
+                        settings overriding those of the default profile.
+        :type profile: str or dict
+        """
+        self._profile = self._profile_settings(profile)
+        self._set_metadata("connection-profile", profile)
+        self.dbapi.set_pragmas(self._profile)
+        self._update_read_pool()
+
+    def transaction_begin(self, transaction):
+        """
+        Switch to the batch profile for the duration of a batch transaction.
+        """
+        if transaction.batch and self.batch_profile:
+            self.dbapi.set_pragmas(PROFILES[self.batch_profile], journal=False)
+        return super().transaction_begin(transaction)
+
+    def transaction_commit(self, txn):
+        """
+        Restore the profile of the tree after a batch transaction.
+        """
+        try:
+            super().transaction_commit(txn)
+        finally:
+            if txn.batch and self.batch_profile:
+                self.dbapi.set_pragmas(self._profile, journal=False)
+
+    def transaction_abort(self, txn):
+        """
+        Restore the profile of the tree after a batch transaction.
+        """
+        try:
+            super().transaction_abort(txn)
+        finally:
+            if txn.batch and self.batch_profile:
+                self.dbapi.set_pragmas(self._profile, journal=False)
 
 
 # -------------------------------------------------------------------------
@@ -100,9 +253,13 @@ class Connection:
         :type kwargs: list
         """
         self.log = logging.getLogger(".sqlite")
+        # The QueryStats recording the statements, or None
+        self.stats = None
         self.__connection = sqlite3.connect(*args, **kwargs)
         self.__cursor = self.__connection.cursor()
+        self.__sql = None
         self.__connection.create_function("regexp", 2, regexp)
+        self.__connection.create_function("match_substring", 2, match_substring)
         self.__collations = []
         self.__tmap = str.maketrans("-.@=;", "_____")
         self.check_collation(glocale)
@@ -133,21 +290,89 @@ class Connection:
         :type kwargs: list
         """
         self.log.debug(args)
+        if self.stats is None:
+            self.__cursor.execute(*args, **kwargs)
+            return
+        start = perf_counter()
         self.__cursor.execute(*args, **kwargs)
+        self.__sql = args[0]
+        self.stats.record(
+            self.__sql, perf_counter() - start, max(self.__cursor.rowcount, 0)
+        )
+
+    def set_pragmas(self, settings, journal=True):
+        """
+        Apply PRAGMA settings to the connection.
+
+        Settings which cannot be changed at the moment, such as the
+        synchronous flag inside a transaction, are skipped with a warning.
+
+        :param settings: PRAGMA names and their values.
+        :type settings: dict
+        :param journal: whether to apply the journal mode as well.
+        :type journal: bool
+        """
+        for pragma, value in settings.items():
+            if pragma not in PRAGMAS:
+                raise ValueError("Unsupported PRAGMA: %s" % pragma)
+            if pragma == "journal_mode" and not journal:
+                continue
+            if not isinstance(value, int) and not str(value).isalpha():
+                raise ValueError("Invalid value for PRAGMA %s: %s" % (pragma, value))
+            try:
+                self.execute("PRAGMA %s = %s" % (pragma, value))
+                self.__cursor.fetchall()
+            except sqlite3.OperationalError as err:
+                self.log.warning("PRAGMA %s = %s: %s", pragma, value, err)
+
+    def executemany(self, sql, seq_of_params):
+        """
+        Executes an SQL statement against all parameter sequences.
+
+        :param sql: the SQL statement to be executed.
+        :type sql: str
+        :param seq_of_params: the parameters for each execution.
+        :type seq_of_params: list
+        """
+        self.log.debug(sql)
+        if self.stats is None:
+            self.__cursor.executemany(sql, seq_of_params)
+            return
+        start = perf_counter()
+        self.__cursor.executemany(sql, seq_of_params)
+        self.__sql = sql
+        self.stats.record(sql, perf_counter() - start, max(self.__cursor.rowcount, 0))
 
     def fetchone(self):
         """
         Fetches the next row of a query result set, returning a single sequence,
         or None when no more data is available.
         """
-        return self.__cursor.fetchone()
+        if self.stats is None:
+            return self.__cursor.fetchone()
+        start = perf_counter()
+        row = self.__cursor.fetchone()
+        self.stats.record(self.__sql, perf_counter() - start, int(row is not None), 0)
+        return row
+
+    def journal_mode(self):
+        """
+        Return the journal mode of the database, in lower case.
+        """
+        self.execute("PRAGMA journal_mode")
+        return self.fetchone()[0].lower()
 
     def fetchall(self):
         """
         Fetches the next set of rows of a query result, returning a list. An
         empty list is returned when no more rows are available.
         """
-        return self.__cursor.fetchall()
+        if self.stats is None:
+            return self.__cursor.fetchall()
+        start = perf_counter()
+        rows = self.__cursor.fetchall()
+        self.stats.record(self.__sql, perf_counter() - start, len(rows), 0)
+        return rows
 
     def begin(self):
         """
@@ -187,6 +412,43 @@ class Connection:
         )
         return self.fetchone()[0] != 0
 
+    def column_exists(self, table, column):
+        """
+        Test whether the specified column, generated or not, exists in a
+        table.
+
+        :param table: table name to check.
+        :type table: str
+        :param column: column name to check.
+        :type column: str
+        :returns: True if the column exists, false otherwise.
+        :rtype: bool
+        """
+        self.execute(
+            "SELECT COUNT(*) "
+            "FROM pragma_table_xinfo('%s') "
+            "WHERE name='%s';" % (table, column)
+        )
+        return self.fetchone()[0] != 0
+
+    def has_trigram_index(self):
+        """
+        Test whether the SQLite library supports FTS5 full-text indexes with
+        the trigram tokenizer, added in SQLite 3.34.
+
+        :returns: True if trigram indexes can be created, false otherwise.
+        :rtype: bool
+        """
+        try:
+            self.execute(
+                "CREATE VIRTUAL TABLE temp.trigram_test "
+                "USING fts5(text, tokenize = 'trigram')"
+            )
+            self.execute("DROP TABLE temp.trigram_test")
+        except sqlite3.OperationalError:
+            return False
+        return True
+
     def close(self):
         """
         Close the current database.
@@ -198,7 +460,74 @@ class Connection:
         """
         Return a new cursor.
         """
-        return Cursor(self.__connection)
+        return Cursor(self.__connection, self.stats)
+
+
+# -------------------------------------------------------------------------
+#
+# ConnectionPool class
+#
+# -------------------------------------------------------------------------
+class ConnectionPool:
+    """
+    A pool of read-only connections to a database file, each used for one
+    snapshot at a time.
+    """
+
+    def __init__(self, path, settings, size=4):
+        """
+        Create a new pool.
+
+        :param path: path of the database file.
+        :type path: str
+        :param settings: PRAGMA settings for new connections.
+        :type settings: dict
+        :param size: maximum number of idle connections kept open.
+        :type size: int
+        """
+        self.uri = "file:%s?mode=ro" % pathname2url(os.path.abspath(path))
+        self.settings = settings
+        # The QueryStats given to the connections, or None
+        self.stats = None
+        self.size = size
+        self.__idle = []
+        self.__lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Return a connection with a read transaction started, pinning the
+        snapshot of the database it sees.
+        """
+        with self.__lock:
+            connection = self.__idle.pop() if self.__idle else None
+        if connection is None:
+            connection = Connection(self.uri, uri=True, check_same_thread=False)
+            connection.set_pragmas(self.settings, journal=False)
+        connection.stats = self.stats
+        connection.begin()
+        connection.execute("SELECT COUNT(*) FROM sqlite_master")
+        connection.fetchone()
+        return connection
+
+    def release(self, connection):
+        """
+        End the snapshot of a connection and return it to the pool.
+        """
+        connection.rollback()
+        with self.__lock:
+            if len(self.__idle) < self.size:
+                self.__idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        """
+        Close all the idle connections.
+        """
+        with self.__lock:
+            idle, self.__idle = self.__idle, []
+        for connection in idle:
+            connection.close()
 
 
 # -------------------------------------------------------------------------
@@ -207,8 +536,10 @@ class Connection:
 #
 # -------------------------------------------------------------------------
 class Cursor:
-    def __init__(self, connection):
+    def __init__(self, connection, stats=None):
         self.__connection = connection
+        self.__stats = stats
+        self.__sql = None
 
     def __enter__(self):
         self.__cursor = self.__connection.cursor()
@@ -227,14 +558,25 @@ class Cursor:
         :param kwargs: arguments to be passed to the sqlite3 execute statement
         :type kwargs: list
         """
+        if self.__stats is None:
+            self.__cursor.execute(*args, **kwargs)
+            return
+        start = perf_counter()
         self.__cursor.execute(*args, **kwargs)
+        self.__sql = args[0]
+        self.__stats.record(self.__sql, perf_counter() - start)
 
     def fetchmany(self):
         """
         Fetches the next set of rows of a query result, returning a list. An
         empty list is returned when no more rows are available.
         """
-        return self.__cursor.fetchmany()
+        if self.__stats is None:
+            return self.__cursor.fetchmany()
+        start = perf_counter()
+        rows = self.__cursor.fetchmany()
+        self.__stats.record(self.__sql, perf_counter() - start, len(rows), 0)
+        return rows
 
 
 def regexp(expr, value):
@@ -251,3 +593,20 @@ def regexp(expr, value):
     :rtype: bool
     """
     return re.search(expr, value, re.MULTILINE) is not None
+
+
+def match_substring(text, value):
+    """
+    A user defined function that can be called from within an SQL statement.
+
+    Like Rule.match_substring, test whether the text is a case insensitive
+    substring of the value.
+
+    :param text: substring to look for.
+    :type text: str
+    :param value: the string to search.
+    :type value: str
+    :returns: True if the text exists within the value, false otherwise.
+    :rtype: bool
+    """
+    return str(value).upper().find(text.upper()) != -1
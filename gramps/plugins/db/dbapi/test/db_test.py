@@ -24,14 +24,20 @@
 #
 # -------------------------------------------------------------------------
 import unittest
+import tempfile
+import threading
 
 # -------------------------------------------------------------------------
 #
 # Gramps modules
 #
 # -------------------------------------------------------------------------
+from gramps.gen.config import config
 from gramps.gen.db import DbTxn
+from gramps.gen.db.codec import decode, encode_compact, get_codec
+from gramps.gen.db.querystats import QueryStats
 from gramps.gen.db.utils import make_database
+from gramps.gen.utils.id import create_id
 from gramps.gen.lib import (
     Person,
     Family,
@@ -45,7 +51,12 @@ from gramps.gen.lib import (
     Tag,
     Researcher,
     Surname,
+    NoteType,
+    ChildRef,
+    PlaceName,
+    PlaceRef,
 )
+from gramps.gen.utils.location import get_location_list
 
 
 # -------------------------------------------------------------------------
@@ -826,6 +837,58 @@ class DbEmptyTest(unittest.TestCase):
     def test_get_total(self):
         self.assertEqual(self.db.get_total(), 0)
 
+    ################################################################
+    #
+    # Test query statistics
+    #
+    ################################################################
+
+    def test_query_stats(self):
+        stats = QueryStats()
+        self.db.set_query_stats(stats)
+        try:
+            note = Note("Text")
+            with DbTxn("Add note", self.db) as trans:
+                self.db.add_note(note, trans)
+            self.db.get_note_from_handle(note.handle)
+            self.assertEqual(self.db.get_number_of_notes(), 1)
+            self.assertIn("Queries", self.db.get_summary())
+            with DbTxn("Remove note", self.db) as trans:
+                self.db.remove_note(note.handle, trans)
+        finally:
+            self.db.set_query_stats(None)
+        totals = stats.get_totals()
+        self.assertGreater(totals["runs"], 0)
+        self.assertGreater(totals["decodes"], 0)
+        self.assertGreater(totals["creates"], 0)
+        statements = {item[0]: item[1:] for item in stats.get_statements()}
+        runs, _seconds, rows = statements["SELECT count(1) FROM note"]
+        self.assertGreaterEqual(runs, 1)
+        self.assertEqual(rows, runs)
+        self.assertNotIn("Queries", self.db.get_summary())
+
+    ################################################################
+    #
+    # Test connection profiles
+    #
+    ################################################################
+    def __synchronous(self):
+        self.db.dbapi.execute("PRAGMA synchronous")
+        return self.db.dbapi.fetchone()[0]
+
+    def test_connection_profile(self):
+        self.assertEqual(self.db.get_connection_profile(), "safe")
+        self.db.set_connection_profile("read-mostly")
+        self.assertEqual(self.db.get_connection_profile(), "read-mostly")
+        self.assertEqual(self.__synchronous(), 1)  # NORMAL
+        self.db.set_connection_profile({"synchronous": "FULL"})
+        self.assertEqual(self.__synchronous(), 2)
+        with DbTxn("Batch", self.db, batch=True):
+            self.assertEqual(self.__synchronous(), 1)
+        self.assertEqual(self.__synchronous(), 2)
+        self.assertRaises(ValueError, self.db.set_connection_profile, "unknown")
+        self.db.set_connection_profile("safe")
+
 
 # -------------------------------------------------------------------------
 #
@@ -899,5 +962,649 @@ class DbPersonTest(unittest.TestCase):
         self.assertEqual(saved["Mary"], (1, 3, 1))
 
 
+# -------------------------------------------------------------------------
+#
+# DbGrampsIdTest class
+#
+# -------------------------------------------------------------------------
+class DbGrampsIdTest(unittest.TestCase):
+    """
+    Tests for the allocation of Gramps IDs.
+    """
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+
+    def tearDown(self):
+        self.db.close(update=False)
+
+    def __add_people(self, gramps_ids):
+        with DbTxn("Add people", self.db) as trans:
+            for gramps_id in gramps_ids:
+                person = Person()
+                person.set_gramps_id(gramps_id)
+                self.db.add_person(person, trans)
+
+    def __next_ids(self, count):
+        return [self.db.find_next_person_gramps_id() for _index in range(count)]
+
+    def test_skip_used(self):
+        self.__add_people(["I0000", "I0001", "I0003", "I2"])
+        self.assertEqual(self.__next_ids(3), ["I0002", "I0004", "I0005"])
+
+    def test_added_later(self):
+        self.assertEqual(self.__next_ids(1), ["I0000"])
+        self.__add_people(["I0001", "I0002", "I0004"])
+        self.assertEqual(self.__next_ids(2), ["I0003", "I0005"])
+
+    def test_reset(self):
+        self.__add_people(["I0000", "I0002"])
+        self.assertEqual(self.__next_ids(2), ["I0001", "I0003"])
+        self.db.pmap_index = 0
+        self.assertEqual(self.__next_ids(1), ["I0001"])
+
+    def test_prefix_change(self):
+        self.__add_people(["I0000", "P0", "P1"])
+        self.db.set_person_id_prefix("P%d")
+        self.assertEqual(self.__next_ids(1), ["P2"])
+        self.db.set_person_id_prefix("I%04d")
+        self.db.pmap_index = 0
+        self.assertEqual(self.__next_ids(1), ["I0001"])
+
+
+# -------------------------------------------------------------------------
+#
+# DbCacheTest class
+#
+# -------------------------------------------------------------------------
+class DbCacheTest(unittest.TestCase):
+    """
+    Tests for the cache of the object data.
+    """
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+        self.note = Note("First")
+        with DbTxn("Add note", self.db) as trans:
+            self.db.add_note(self.note, trans)
+
+    def tearDown(self):
+        self.db.close(update=False)
+
+    def __get_text(self):
+        return self.db.get_note_from_handle(self.note.handle).get()
+
+    def __commit(self, text):
+        self.note.set(text)
+        with DbTxn("Edit note", self.db) as trans:
+            self.db.commit_note(self.note, trans)
+
+    def test_hits(self):
+        before = self.db.get_cache_stats()
+        note = self.db.get_note_from_handle(self.note.handle)
+        note.set("Changed")
+        self.assertEqual(self.__get_text(), "First")
+        after = self.db.get_cache_stats()
+        self.assertEqual(after["misses"] - before["misses"], 1)
+        self.assertEqual(after["hits"] - before["hits"], 1)
+        self.assertEqual(after["objects"], 1)
+        self.assertGreater(after["size"], 0)
+
+    def test_commit_and_undo(self):
+        self.assertEqual(self.__get_text(), "First")
+        self.__commit("Second")
+        self.assertEqual(self.__get_text(), "Second")
+        self.db.undo()
+        self.assertEqual(self.__get_text(), "First")
+        self.db.redo()
+        self.assertEqual(self.__get_text(), "Second")
+        with DbTxn("Remove note", self.db) as trans:
+            self.db.remove_note(self.note.handle, trans)
+        self.assertIsNone(self.db.get_raw_note_data(self.note.handle))
+
+    def test_abort(self):
+        self.assertEqual(self.__get_text(), "First")
+        with self.assertRaises(ValueError):
+            with DbTxn("Edit note", self.db) as trans:
+                self.note.set("Aborted")
+                self.db.commit_note(self.note, trans)
+                self.assertEqual(self.__get_text(), "Aborted")
+                raise ValueError
+        self.assertEqual(self.__get_text(), "First")
+
+
+# -------------------------------------------------------------------------
+#
+# DbUndoTest class
+#
+# -------------------------------------------------------------------------
+class DbUndoTest(unittest.TestCase):
+    """
+    Tests for the limits of the undo log.
+    """
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+        self.note = Note("0")
+        with DbTxn("Add note", self.db) as trans:
+            self.db.add_note(self.note, trans)
+
+    def tearDown(self):
+        self.db.close(update=False)
+
+    def __set_config(self, key, value):
+        self.addCleanup(config.set, key, config.get(key))
+        config.set(key, value)
+
+    def __commit(self, text):
+        self.note.set(text)
+        with DbTxn("Edit note", self.db) as trans:
+            self.db.commit_note(self.note, trans)
+
+    def __get_text(self):
+        return self.db.get_note_from_handle(self.note.handle).get()
+
+    def test_entries(self):
+        self.__set_config("database.undo-entries", 2)
+        for text in ("1", "2", "3"):
+            self.__commit(text)
+        undodb = self.db.get_undodb()
+        self.assertEqual(undodb.undo_count, 2)
+        self.assertEqual(len(undodb), 2)
+        self.assertTrue(self.db.undo())
+        self.assertTrue(self.db.undo())
+        self.assertFalse(self.db.undo())
+        self.assertEqual(self.__get_text(), "1")
+        self.assertTrue(self.db.redo())
+        self.assertEqual(self.__get_text(), "2")
+
+    def test_size(self):
+        self.__set_config("database.undo-size", 1)
+        self.__commit("x" * (1 << 20))
+        self.__commit("".join(create_id() for _i in range(100000)))
+        undodb = self.db.get_undodb()
+        self.assertEqual(undodb.undo_count, 1)
+        self.assertTrue(self.db.undo())
+        self.assertEqual(self.__get_text(), "x" * (1 << 20))
+
+
+# -------------------------------------------------------------------------
+#
+# DbPlaceTest class
+#
+# -------------------------------------------------------------------------
+class DbPlaceTest(unittest.TestCase):
+    """
+    Tests for the place hierarchy.
+    """
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+        self.country = self.__add_place("England")
+        self.county = self.__add_place("Kent", self.country)
+        self.town = self.__add_place("Dover", self.county)
+
+    def tearDown(self):
+        self.db.close(update=False)
+
+    def __add_place(self, name, enclosed_by=None):
+        place = Place()
+        place.set_name(PlaceName(value=name))
+        if enclosed_by is not None:
+            placeref = PlaceRef()
+            placeref.ref = enclosed_by.handle
+            place.add_placeref(placeref)
+        with DbTxn("Add place", self.db) as trans:
+            self.db.add_place(place, trans)
+        return place
+
+    def __get_names(self, place):
+        return [name for name, _type in get_location_list(self.db, place)]
+
+    def test_tree_cursor(self):
+        with self.db.get_place_tree_cursor() as cursor:
+            handles = [handle for handle, _data in cursor]
+        self.assertEqual(
+            handles, [self.country.handle, self.county.handle, self.town.handle]
+        )
+
+    def test_hierarchy(self):
+        hierarchy = self.db.get_place_hierarchy(self.town.handle)
+        self.assertEqual(
+            [place.handle for place in hierarchy],
+            [self.town.handle, self.county.handle, self.country.handle],
+        )
+        self.assertIs(self.db.get_place_hierarchy(self.town.handle), hierarchy)
+        self.assertEqual(self.__get_names(self.town), ["Dover", "Kent", "England"])
+
+    def test_commit(self):
+        self.assertEqual(self.__get_names(self.town), ["Dover", "Kent", "England"])
+        self.county.set_name(PlaceName(value="Sussex"))
+        with DbTxn("Edit place", self.db) as trans:
+            self.db.commit_place(self.county, trans)
+        self.assertEqual(self.__get_names(self.town), ["Dover", "Sussex", "England"])
+        self.db.undo()
+        self.assertEqual(self.__get_names(self.town), ["Dover", "Kent", "England"])
+
+    def test_loop(self):
+        placeref = PlaceRef()
+        placeref.ref = self.town.handle
+        self.country.add_placeref(placeref)
+        with DbTxn("Edit place", self.db) as trans:
+            self.db.commit_place(self.country, trans)
+        self.assertEqual(self.__get_names(self.town), ["Dover", "Kent", "England"])
+        self.assertEqual(self.__get_names(self.county), ["Kent", "England", "Dover"])
+
+
+# -------------------------------------------------------------------------
+#
+# DbSortKeyTest class
+#
+# -------------------------------------------------------------------------
+class DbSortKeyTest(unittest.TestCase):
+    """
+    Tests for the sort keys of the sorted handle lists.
+    """
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+        self.smith = self.__add_person("Smith", "John")
+        self.adams = self.__add_person("Adams", "Mary")
+        self.brown = self.__add_person("Brown", "Anne")
+
+    def tearDown(self):
+        self.db.close(update=False)
+
+    def __add_person(self, surname, given_name):
+        person = Person()
+        surname1 = Surname()
+        surname1.set_surname(surname)
+        person.primary_name.set_surname_list([surname1])
+        person.primary_name.set_first_name(given_name)
+        with DbTxn("Add person", self.db) as trans:
+            self.db.add_person(person, trans)
+        return person
+
+    def test_made_at_load(self):
+        # the keys are there before the first sorted read
+        self.db.dbapi.execute(
+            "SELECT count(*) FROM sort_key WHERE obj_class = 'Person'"
+        )
+        self.assertEqual(self.db.dbapi.fetchone()[0], 3)
+
+    def test_person(self):
+        self.assertEqual(
+            self.db.get_person_handles(sort_handles=True),
+            [self.adams.handle, self.brown.handle, self.smith.handle],
+        )
+        self.adams.primary_name.get_primary_surname().set_surname("Young")
+        with DbTxn("Edit person", self.db) as trans:
+            self.db.commit_person(self.adams, trans)
+        self.assertEqual(
+            self.db.get_person_handles(sort_handles=True),
+            [self.brown.handle, self.smith.handle, self.adams.handle],
+        )
+        with DbTxn("Remove person", self.db) as trans:
+            self.db.remove_person(self.brown.handle, trans)
+        self.assertEqual(
+            self.db.get_person_handles(sort_handles=True),
+            [self.smith.handle, self.adams.handle],
+        )
+
+    def test_family(self):
+        family1 = Family()
+        family1.set_father_handle(self.smith.handle)
+        family2 = Family()
+        family2.set_mother_handle(self.brown.handle)
+        with DbTxn("Add families", self.db) as trans:
+            self.db.add_family(family1, trans)
+            self.db.add_family(family2, trans)
+        self.assertEqual(
+            self.db.get_family_handles(sort_handles=True),
+            [family2.handle, family1.handle],
+        )
+
+    def test_tag(self):
+        tags = []
+        with DbTxn("Add tags", self.db) as trans:
+            for name in ("Beta", "Alpha", "Gamma"):
+                tag = Tag()
+                tag.set_name(name)
+                self.db.add_tag(tag, trans)
+                tags.append(tag)
+        self.assertEqual(
+            self.db.get_tag_handles(sort_handles=True),
+            [tags[1].handle, tags[0].handle, tags[2].handle],
+        )
+
+
+# -------------------------------------------------------------------------
+#
+# DbBulkTest class
+#
+# -------------------------------------------------------------------------
+class DbBulkTest(unittest.TestCase):
+    """
+    Tests for committing many objects at once.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = make_database("sqlite")
+        cls.db.load(":memory:")
+
+    def setUp(self):
+        self.note = Note()
+        self.note.set_handle(create_id())
+        self.people = []
+        for surname in ("Allen", "Baker", "Clark"):
+            person = Person()
+            person.set_handle(create_id())
+            person.set_gramps_id(self.db.find_next_person_gramps_id())
+            surname1 = Surname()
+            surname1.surname = surname
+            person.primary_name.set_surname_list([surname1])
+            person.add_note(self.note.handle)
+            self.people.append(person)
+
+    def tearDown(self):
+        with DbTxn("Remove test objects", self.db) as trans:
+            for handle in self.db.get_person_handles():
+                self.db.remove_person(handle, trans)
+            for handle in self.db.get_note_handles():
+                self.db.remove_note(handle, trans)
+
+    def __check_people(self):
+        self.assertEqual(self.db.get_number_of_people(), len(self.people))
+        for person in self.people:
+            saved = self.db.get_person_from_gramps_id(person.gramps_id)
+            self.assertEqual(saved.serialize(), person.serialize())
+        handles = [person.handle for person in self.people]
+        self.assertEqual(self.db.get_person_handles(sort_handles=True), handles)
+
+    def test_commit_many_batch(self):
+        with DbTxn("Bulk add", self.db, batch=True) as trans:
+            self.db.commit_many([self.note] + self.people, trans)
+        self.__check_people()
+        backlinks = set(self.db.find_backlink_handles(self.note.handle))
+        self.assertEqual(
+            backlinks, {("Person", person.handle) for person in self.people}
+        )
+
+        for person in self.people:
+            person.set_note_list([])
+        with DbTxn("Bulk update", self.db, batch=True) as trans:
+            self.db.commit_many(self.people, trans)
+        self.__check_people()
+        self.assertEqual(list(self.db.find_backlink_handles(self.note.handle)), [])
+
+    def test_deferred_references(self):
+        with DbTxn("Deferred add", self.db, batch=True, defer_references=True) as trans:
+            self.db.add_note(self.note, trans)
+            for person in self.people[:2]:
+                self.db.add_person(person, trans)
+            self.db.commit_many(self.people[2:], trans)
+            self.assertEqual(list(self.db.find_backlink_handles(self.note.handle)), [])
+        self.__check_people()
+        backlinks = set(self.db.find_backlink_handles(self.note.handle))
+        self.assertEqual(
+            backlinks, {("Person", person.handle) for person in self.people}
+        )
+
+    def test_commit_many(self):
+        with DbTxn("Add", self.db) as trans:
+            self.db.commit_many([self.note] + self.people, trans)
+        self.__check_people()
+        self.db.undo()
+        self.assertEqual(self.db.get_number_of_people(), 0)
+        self.assertEqual(self.db.get_number_of_notes(), 0)
+
+    def __codecs(self):
+        self.db.dbapi.execute("SELECT blob_data FROM person")
+        return {get_codec(row[0]) for row in self.db.dbapi.fetchall()}
+
+    def test_blob_codec(self):
+        with DbTxn("Add", self.db) as trans:
+            self.db.commit_many([self.note] + self.people, trans)
+        self.assertEqual(self.db.get_blob_codec(), "pickle")
+        self.db.set_blob_codec("compact")
+        self.assertEqual(self.db.get_blob_codec(), "compact")
+        self.assertEqual(self.__codecs(), {"compact"})
+        self.__check_people()
+        self.db.set_blob_codec("pickle")
+        self.assertEqual(self.__codecs(), {"pickle"})
+        self.__check_people()
+        self.assertRaises(ValueError, self.db.set_blob_codec, "unknown")
+
+    def test_new_tree_codec(self):
+        self.addCleanup(config.set, "database.blob-codec", "pickle")
+        config.set("database.blob-codec", "compact")
+        db = make_database("sqlite")
+        db.load(":memory:")
+        try:
+            self.assertEqual(db.get_blob_codec(), "compact")
+            with DbTxn("Add", db) as trans:
+                db.add_note(Note("Text"), trans)
+            db.dbapi.execute("SELECT blob_data FROM note")
+            self.assertEqual(get_codec(db.dbapi.fetchone()[0]), "compact")
+        finally:
+            db.close(update=False)
+
+    def test_json_data(self):
+        with DbTxn("Add", self.db) as trans:
+            self.db.commit_many([self.note] + self.people, trans)
+        self.assertFalse(self.db.get_json_data())
+        self.db.set_json_data(True)
+        self.assertTrue(self.db.get_json_data())
+        self.db.dbapi.execute(
+            "SELECT json_extract(json_data, "
+            "'$.primary_name.surname_list[0].surname') FROM person"
+        )
+        surnames = sorted(row[0] for row in self.db.dbapi.fetchall())
+        self.assertEqual(surnames, ["Allen", "Baker", "Clark"])
+
+        self.note.set_type(NoteType.RESEARCH)
+        with DbTxn("Edit", self.db) as trans:
+            self.db.commit_note(self.note, trans)
+        self.db.dbapi.execute(
+            "SELECT handle FROM note WHERE note_type = ?", [NoteType.RESEARCH]
+        )
+        self.assertEqual(self.db.dbapi.fetchall(), [(self.note.handle,)])
+
+        self.db.set_json_data(False)
+        self.assertFalse(self.db.get_json_data())
+        self.db.dbapi.execute("SELECT COUNT(*) FROM person WHERE json_data IS NULL")
+        self.assertEqual(self.db.dbapi.fetchone()[0], len(self.people))
+
+    def test_compact_round_trip(self):
+        for person in self.people:
+            data = person.serialize()
+            self.assertEqual(decode(encode_compact(data)), data)
+        for data in (-(2**70), 2**70, 1.5, "é", (3, "x"), [True, False, None]):
+            self.assertEqual(decode(encode_compact(data)), data)
+
+    def __check_ancestry(self, grandparent, parent, child):
+        self.assertEqual(
+            self.db.get_ancestor_handles(child.handle),
+            {parent.handle, grandparent.handle},
+        )
+        self.assertEqual(self.db.get_ancestor_handles(child.handle, 1), {parent.handle})
+        self.assertEqual(
+            self.db.get_descendant_handles(grandparent.handle),
+            {parent.handle, child.handle},
+        )
+        self.assertEqual(
+            self.db.get_common_ancestor_handles(child.handle, parent.handle),
+            {parent.handle, grandparent.handle},
+        )
+
+    def test_ancestry(self):
+        grandparent, parent, child = self.people
+        families = []
+        for father, son in ((grandparent, parent), (parent, child)):
+            family = Family()
+            family.set_handle(create_id())
+            family.set_father_handle(father.handle)
+            child_ref = ChildRef()
+            child_ref.set_reference_handle(son.handle)
+            family.add_child_ref(child_ref)
+            father.add_family_handle(family.handle)
+            son.add_parent_family_handle(family.handle)
+            families.append(family)
+        with DbTxn("Add", self.db, batch=True) as trans:
+            self.db.commit_many([self.note] + families + self.people, trans)
+        self.__check_ancestry(grandparent, parent, child)
+
+        with DbTxn("Remove", self.db) as trans:
+            self.db.remove_family(families[0].handle, trans)
+        self.assertEqual(self.db.get_ancestor_handles(child.handle), {parent.handle})
+        self.db.undo()
+        self.__check_ancestry(grandparent, parent, child)
+
+        self.db._txn_begin()
+        self.db.dbapi.execute("DELETE FROM family_parent")
+        self.db._txn_commit()
+        self.db.rebuild_secondary()
+        self.__check_ancestry(grandparent, parent, child)
+
+        with DbTxn("Remove", self.db) as trans:
+            for family in families:
+                self.db.remove_family(family.handle, trans)
+
+    def test_commit_changes(self):
+        allen, baker, clark = self.people
+        with DbTxn("Add", self.db) as trans:
+            self.db.add_note(self.note, trans)
+            for person in self.people:
+                self.db.add_person(person, trans)
+        other = Note()
+        other.set_handle(create_id())
+        with DbTxn("Edit", self.db) as trans:
+            self.db.add_note(other, trans)
+            allen.set_note_list([other.handle])
+            allen.primary_name.get_primary_surname().set_surname("Young")
+            self.db.commit_person(allen, trans)
+        self.assertEqual(
+            list(self.db.find_backlink_handles(other.handle)),
+            [("Person", allen.handle)],
+        )
+        backlinks = self.db.find_backlink_handles(self.note.handle)
+        self.assertEqual(
+            {handle for _class, handle in backlinks}, {baker.handle, clark.handle}
+        )
+        self.assertEqual(
+            self.db.get_person_handles(sort_handles=True),
+            [baker.handle, clark.handle, allen.handle],
+        )
+
+        self.db.undo()
+        self.assertEqual(list(self.db.find_backlink_handles(other.handle)), [])
+        self.assertEqual(len(list(self.db.find_backlink_handles(self.note.handle))), 3)
+        self.assertEqual(
+            self.db.get_person_handles(sort_handles=True),
+            [allen.handle, baker.handle, clark.handle],
+        )
+
+    def __search(self, class_name, text):
+        where, args = self.db.get_text_search(class_name, text)
+        return set(self.db.select_handles(class_name, where, args))
+
+    def test_text_search(self):
+        if self.db.get_text_search("Note", "text") is None:
+            self.skipTest("SQLite has no trigram tokenizer")
+        allen, baker, clark = self.people
+        self.note.set("Baptised in Zürich")
+        with DbTxn("Add", self.db, batch=True) as trans:
+            self.db.commit_many([self.note] + self.people, trans)
+        self.assertEqual(self.__search("Person", "bake"), {baker.handle})
+        self.assertEqual(self.__search("Note", "ZÜRICH"), {self.note.handle})
+        self.assertIsNone(self.db.get_text_search("Note", "zü"))
+
+        self.note.set("Buried in Bern")
+        with DbTxn("Edit", self.db) as trans:
+            self.db.commit_note(self.note, trans)
+        self.assertEqual(self.__search("Note", "zürich"), set())
+        self.db.undo()
+        self.assertEqual(self.__search("Note", "zürich"), {self.note.handle})
+
+        with DbTxn("Remove", self.db) as trans:
+            self.db.remove_person(baker.handle, trans)
+        self.assertEqual(self.__search("Person", "bake"), set())
+        self.db.undo()
+        self.assertEqual(self.__search("Person", "bake"), {baker.handle})
+
+        self.db._txn_begin()
+        self.db.dbapi.execute("DELETE FROM text_data")
+        self.db._txn_commit()
+        self.db.rebuild_secondary()
+        self.assertEqual(self.__search("Person", "bake"), {baker.handle})
+
+    def test_text_search_update(self):
+        if self.db.get_text_search("Note", "text") is None:
+            self.skipTest("SQLite has no trigram tokenizer")
+        with DbTxn("Add", self.db, batch=True) as trans:
+            self.db.commit_many([self.note] + self.people, trans)
+        for person in self.people:
+            person.primary_name.get_primary_surname().set_surname("Walker")
+        with DbTxn("Edit", self.db, batch=True) as trans:
+            self.db.commit_many(self.people, trans)
+        for surname in ("Allen", "Baker", "Clark"):
+            self.assertEqual(self.__search("Person", surname), set())
+        self.assertEqual(
+            self.__search("Person", "walker"),
+            {person.handle for person in self.people},
+        )
+
+
+# -------------------------------------------------------------------------
+#
+# DbSnapshotTest class
+#
+# -------------------------------------------------------------------------
+class DbSnapshotTest(unittest.TestCase):
+    """
+    Tests for read snapshots in worker threads.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db = make_database("sqlite")
+        self.db.load(self.directory.name)
+        self.db.set_connection_profile("read-mostly")
+        with DbTxn("Add person", self.db) as trans:
+            self.db.add_person(Person(), trans)
+
+    def tearDown(self):
+        self.db.close(update=False)
+        self.directory.cleanup()
+
+    def test_snapshot(self):
+        started = threading.Event()
+        written = threading.Event()
+        counts = []
+
+        def report():
+            with self.db.read_snapshot() as snapshot:
+                counts.append(snapshot.get_number_of_people())
+                started.set()
+                written.wait()
+                counts.append(snapshot.get_number_of_people())
+
+        worker = threading.Thread(target=report)
+        worker.start()
+        started.wait()
+        with DbTxn("Add person", self.db) as trans:
+            self.db.add_person(Person(), trans)
+        written.set()
+        worker.join()
+        self.assertEqual(counts, [1, 1])
+        self.assertEqual(self.db.get_number_of_people(), 2)
+
+
 if __name__ == "__main__":
     unittest.main()
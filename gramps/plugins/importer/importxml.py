@@ -1047,7 +1047,9 @@ class GrampsParser(UpdateCallback):
         :param ifile: must be a file handle that is already open, with position
                       at the start of the file
         """
-        with DbTxn(_("Gramps XML import"), self.db, batch=True) as self.trans:
+        with DbTxn(
+            _("Gramps XML import"), self.db, batch=True, defer_references=True
+        ) as self.trans:
             self.set_total(linecount)
 
             self.db.disable_signals()
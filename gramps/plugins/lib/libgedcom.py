@@ -3103,7 +3103,12 @@ class GedcomParser(UpdateCallback):
           0 TRLR                                          {1:1}
 
         """
-        with DbTxn(_("GEDCOM import"), self.dbase, not use_trans) as self.trans:
+        with DbTxn(
+            _("GEDCOM import"),
+            self.dbase,
+            not use_trans,
+            defer_references=not use_trans,
+        ) as self.trans:
             self.dbase.disable_signals()
             self.__parse_header_head()
             self.want_parse_warnings = False
@@ -46,7 +46,7 @@ from gramps.gen.lib import (
     StyledTextTagType,
 )
 from gramps.gen.display.name import displayer as name_displayer
-from gramps.gen.utils.alive import probably_alive
+from gramps.gen.utils.alive import get_bulk_probably_alive
 from gramps.gen.proxy import LivingProxyDb
 
 # ------------------------------------------------------------------------
@@ -140,6 +140,7 @@ def find_records(
 
     today = datetime.date.today()
     today_date = Date(today.year, today.month, today.day)
+    alive = get_bulk_probably_alive(db)
 
     # Person records
     person_youngestliving = []
@@ -198,7 +199,7 @@ def find_records(
         )
 
         if death_date is None:
-            if probably_alive(unfil_person, db):
+            if alive.probably_alive(unfil_person):
                 # Still living, look for age records
                 _record(
                     person_youngestliving,
@@ -410,8 +411,8 @@ def find_records(
         name = name.replace("%(mother)s", mother_name)
 
         if living_mode == LivingProxyDb.MODE_INCLUDE_ALL or (
-            not probably_alive(unfil_father, db)
-            and not probably_alive(unfil_mother, db)
+            not alive.probably_alive(unfil_father)
+            and not alive.probably_alive(unfil_mother)
         ):
             _record(
                 None,
@@ -492,11 +493,11 @@ def find_records(
             # Divorced but date unknown or inexact
             continue
 
-        if not probably_alive(unfil_father, db) and not _good_date(father_death_date):
+        if not alive.probably_alive(unfil_father) and not _good_date(father_death_date):
             # Father died but death date unknown or inexact
             continue
 
-        if not probably_alive(unfil_mother, db) and not _good_date(mother_death_date):
+        if not alive.probably_alive(unfil_mother) and not _good_date(mother_death_date):
             # Mother died but death date unknown or inexact
             continue
 
@@ -506,7 +507,9 @@ def find_records(
             and mother_death_date is None
         ):
             # Still married and alive
-            if probably_alive(unfil_father, db) and probably_alive(unfil_mother, db):
+            if alive.probably_alive(unfil_father) and alive.probably_alive(
+                unfil_mother
+            ):
                 _record(
                     family_youngestmarried,
                     family_oldestmarried,
@@ -116,7 +116,7 @@ class ChangeTypes(tool.BatchTool, ManagedWindow):
         fromtype = self.options.handler.options_dict["fromtype"]
         totype = self.options.handler.options_dict["totype"]
 
-        modified = 0
+        changed = []
 
         with DbTxn(_("Change types"), self.db, batch=True) as self.trans:
             self.db.disable_signals()
@@ -127,9 +127,10 @@ class ChangeTypes(tool.BatchTool, ManagedWindow):
                     event = self.db.get_event_from_handle(event_handle)
                     if event.get_type().xml_str() == fromtype:
                         event.type.set_from_xml_str(totype)
-                        modified += 1
-                        self.db.commit_event(event, self.trans)
+                        changed.append(event)
                         step()
+            self.db.commit_many(changed, self.trans)
+        modified = len(changed)
         self.db.enable_signals()
         self.db.request_rebuild()
 
@@ -0,0 +1,113 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Compare the blob codecs: encode and decode throughput on the serialized
+objects of the example tree, then the on-disk size and the time to read
+every object of a scaled up copy stored with each codec.
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard python modules
+#
+# -------------------------------------------------------------------------
+import argparse
+import os
+import tempfile
+
+# -------------------------------------------------------------------------
+#
+# Gramps modules
+#
+# -------------------------------------------------------------------------
+from gramps.gen.db.codec import CODECS, decode, get_encoder
+
+# -------------------------------------------------------------------------
+#
+# Local modules
+#
+# -------------------------------------------------------------------------
+from scaled_tree import ITER_FUNCS, load_example, new_database, populate, timed
+
+
+def encode_all(encoder, data_list):
+    """
+    Encode every object.
+    """
+    for data in data_list:
+        encoder(data)
+
+
+def decode_all(blobs):
+    """
+    Decode every blob.
+    """
+    for blob in blobs:
+        decode(blob)
+
+
+def read_all(db):
+    """
+    Read every object in the tree.
+    """
+    for cls, iter_func in ITER_FUNCS:
+        for obj in getattr(db, iter_func)():
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--copies", type=int, default=20, help="number of copies of the example"
+    )
+    parser.add_argument(
+        "--rounds", type=int, default=10, help="rounds of the codec microbenchmark"
+    )
+    args = parser.parse_args()
+
+    example = load_example()
+    data_list = [data for cls, data in example] * args.rounds
+    print(
+        "%-8s %10s %10s %12s %12s %10s"
+        % ("codec", "encode s", "decode s", "blob bytes", "file bytes", "read s")
+    )
+    for codec in CODECS:
+        encoder = get_encoder(codec)
+        blobs = [encoder(data) for data in data_list]
+        encode = timed(encode_all, encoder, data_list)
+        decode_time = timed(decode_all, blobs)
+        size = sum(len(blob) for blob in blobs) // args.rounds
+        with tempfile.TemporaryDirectory() as directory:
+            db = new_database(directory)
+            populate(db, example, args.copies)
+            db.set_blob_codec(codec)
+            db.dbapi.execute("VACUUM")
+            file_size = os.path.getsize(os.path.join(directory, "sqlite.db"))
+            read = timed(read_all, db)
+            db.close(update=False)
+        print(
+            "%-8s %10.2f %10.2f %12d %12d %10.2f"
+            % (codec, encode, decode_time, size, file_size, read)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Compare the throughput of per-object commits with DbGeneric.commit_many in
+a batch transaction, writing a scaled up copy of the example tree.
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard python modules
+#
+# -------------------------------------------------------------------------
+import argparse
+import tempfile
+
+# -------------------------------------------------------------------------
+#
+# Local modules
+#
+# -------------------------------------------------------------------------
+from scaled_tree import load_example, new_database, populate, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--copies", type=int, default=20, help="number of copies of the example"
+    )
+    parser.add_argument(
+        "--memory", action="store_true", help="use an in-memory database"
+    )
+    args = parser.parse_args()
+
+    example = load_example()
+    total = len(example) * args.copies
+    print("Writing %d objects" % total)
+    for label, bulk in (("commit_*", False), ("commit_many", True)):
+        with tempfile.TemporaryDirectory() as directory:
+            db = new_database(":memory:" if args.memory else directory)
+            elapsed = timed(populate, db, example, args.copies, bulk=bulk)
+            db.close(update=False)
+        print("%-12s %8.2f s %10.0f objects/s" % (label, elapsed, total / elapsed))
+
+
+if __name__ == "__main__":
+    main()
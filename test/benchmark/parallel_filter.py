@@ -0,0 +1,97 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Measure how a person filter scales with the number of worker processes,
+on a scaled up copy of the example tree stored in a temporary directory.
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard python modules
+#
+# -------------------------------------------------------------------------
+import argparse
+import os
+import tempfile
+
+# -------------------------------------------------------------------------
+#
+# Gramps modules
+#
+# -------------------------------------------------------------------------
+from gramps.gen.filters import GenericFilterFactory
+from gramps.gen.filters.rules.person import ProbablyAlive, RegExpName
+
+# -------------------------------------------------------------------------
+#
+# Local modules
+#
+# -------------------------------------------------------------------------
+from scaled_tree import load_example, new_database, populate, timed
+
+
+def make_filter():
+    """
+    Return a filter with rules that are costly for every person.
+    """
+    filter_ = GenericFilterFactory("Person")()
+    filter_.set_logical_op("or")
+    filter_.add_rule(ProbablyAlive(["1900-01-01"]))
+    filter_.add_rule(RegExpName(["^[A-M].*son$"], use_regex=True))
+    return filter_
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--copies", type=int, default=20, help="number of copies of the example"
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=os.cpu_count(),
+        help="largest number of worker processes",
+    )
+    args = parser.parse_args()
+
+    example = load_example()
+    with tempfile.TemporaryDirectory() as directory:
+        db = new_database(directory)
+        populate(db, example, args.copies)
+        print("%d people" % db.get_number_of_people())
+        print("%-10s %10s %10s %10s" % ("processes", "matches", "time s", "speedup"))
+        single = None
+        for processes in range(1, args.processes + 1):
+            result = []
+            elapsed = timed(
+                lambda: result.extend(make_filter().apply(db, processes=processes))
+            )
+            if single is None:
+                single = elapsed
+            print(
+                "%-10d %10d %10.2f %10.2f"
+                % (processes, len(result), elapsed, single / elapsed)
+            )
+        db.close(update=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Time the XML and GEDCOM exports of a scaled up copy of the example tree
+through the privacy, living and referenced proxies of the export
+options, with and without memoizing the proxy stack.
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard python modules
+#
+# -------------------------------------------------------------------------
+import argparse
+import os
+import tempfile
+
+# -------------------------------------------------------------------------
+#
+# Gramps modules
+#
+# -------------------------------------------------------------------------
+from gramps.gen.proxy import (
+    LivingProxyDb,
+    PrivateProxyDb,
+    ReferencedBySelectionProxyDb,
+)
+from gramps.gen.user import User
+from gramps.plugins.export.exportgedcom import GedcomWriter
+from gramps.plugins.export.exportxml import XmlWriter
+
+# -------------------------------------------------------------------------
+#
+# Local modules
+#
+# -------------------------------------------------------------------------
+from scaled_tree import load_example, new_database, populate, timed
+
+
+def proxy_stack(db, memoize):
+    """
+    Return the proxies applied by the export options to the database.
+    """
+    proxy = PrivateProxyDb(db)
+    proxy = LivingProxyDb(proxy, LivingProxyDb.MODE_INCLUDE_LAST_NAME_ONLY)
+    proxy = ReferencedBySelectionProxyDb(proxy, all_people=True)
+    if memoize:
+        proxy.memoize()
+    return proxy
+
+
+def export_xml(db, filename):
+    """
+    Write the database to an uncompressed Gramps XML file.
+    """
+    XmlWriter(db, User(), 0, compress=0).write(filename)
+
+
+def export_gedcom(db, filename):
+    """
+    Write the database to a GEDCOM file.
+    """
+    GedcomWriter(db, User()).write_gedcom_file(filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--copies", type=int, default=20, help="number of copies of the example"
+    )
+    args = parser.parse_args()
+
+    example = load_example()
+    db = new_database()
+    populate(db, example, args.copies)
+    print("%-8s %-10s %10s %12s" % ("export", "memoize", "export s", "file bytes"))
+    with tempfile.TemporaryDirectory() as directory:
+        for name, export in (("xml", export_xml), ("gedcom", export_gedcom)):
+            for memoize in (False, True):
+                filename = os.path.join(directory, "%s-%s" % (name, memoize))
+                elapsed = timed(export, proxy_stack(db, memoize), filename)
+                size = os.path.getsize(filename)
+                print("%-8s %-10s %10.2f %12d" % (name, memoize, elapsed, size))
+    db.close(update=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Helpers shared by the database benchmarks in this directory.
+
+The benchmarks are plain scripts, run from the root of the source tree::
+
+    PYTHONPATH=. python3 test/benchmark/<name>.py --help
+
+They build large trees by copying the objects of example/gramps/example.gramps
+several times, giving every copy its own handles and Gramps IDs.
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard python modules
+#
+# -------------------------------------------------------------------------
+import os
+import time
+
+# -------------------------------------------------------------------------
+#
+# Gramps modules
+#
+# -------------------------------------------------------------------------
+from gramps.gen.const import ROOT_DIR
+from gramps.gen.db import DbTxn
+from gramps.gen.db.utils import import_as_dict, make_database
+from gramps.gen.user import User
+from gramps.gen.lib import (
+    Person,
+    Family,
+    Event,
+    Place,
+    Repository,
+    Source,
+    Citation,
+    Media,
+    Note,
+    Tag,
+)
+
+EXAMPLE = os.path.join(ROOT_DIR, "..", "example", "gramps", "example.gramps")
+
+ITER_FUNCS = (
+    (Tag, "iter_tags"),
+    (Note, "iter_notes"),
+    (Repository, "iter_repositories"),
+    (Source, "iter_sources"),
+    (Citation, "iter_citations"),
+    (Media, "iter_media"),
+    (Place, "iter_places"),
+    (Event, "iter_events"),
+    (Family, "iter_families"),
+    (Person, "iter_people"),
+)
+
+
+def load_example():
+    """
+    Return the serialized objects of the example tree as a list of
+    (class, data) tuples.
+    """
+    db = import_as_dict(EXAMPLE, User())
+    result = []
+    for cls, iter_func in ITER_FUNCS:
+        for obj in getattr(db, iter_func)():
+            result.append((cls, obj.serialize()))
+    db.close()
+    return result
+
+
+def _remap(data, handles, suffix):
+    """
+    Recursively append the suffix to every handle found in the data,
+    including those of the links of notes.
+    """
+    if isinstance(data, (tuple, list)):
+        return type(data)(_remap(item, handles, suffix) for item in data)
+    if isinstance(data, str) and data in handles:
+        return data + suffix
+    if isinstance(data, str) and data.startswith("gramps://"):
+        # the link of a note to an object, gramps://<class>/handle/<handle>
+        head, sep, handle = data.rpartition("/")
+        if handle in handles:
+            return head + sep + handle + suffix
+    return data
+
+
+def scaled_objects(example, copies):
+    """
+    Yield the example objects copies times over, each copy with its own
+    handles and Gramps IDs.
+    """
+    handles = {data[0] for cls, data in example}
+    for copy in range(copies):
+        suffix = "_%d" % copy
+        for cls, data in example:
+            data = _remap(data, handles, suffix)
+            obj = cls.create(data)
+            if cls is not Tag:
+                obj.gramps_id += suffix
+            yield obj
+
+
+def new_database(directory=":memory:"):
+    """
+    Return a new, empty SQLite database.
+    """
+    db = make_database("sqlite")
+    db.load(directory)
+    return db
+
+
+def populate(db, example, copies, bulk=True):
+    """
+    Write a scaled copy of the example tree in one batch transaction.
+    """
+    with DbTxn("Benchmark", db, batch=True) as trans:
+        if bulk:
+            db.commit_many(scaled_objects(example, copies), trans)
+        else:
+            for obj in scaled_objects(example, copies):
+                db.method("commit_%s", obj.__class__.__name__)(obj, trans)
+
+
+def timed(func, *args, **kwargs):
+    """
+    Call the function and return its elapsed wall clock time in seconds.
+    """
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
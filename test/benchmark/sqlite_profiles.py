@@ -0,0 +1,102 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Measure the effect of the SQLite connection profiles on a batch import,
+on a series of small edits and on reading every object of a scaled up copy
+of the example tree.
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard python modules
+#
+# -------------------------------------------------------------------------
+import argparse
+import tempfile
+
+# -------------------------------------------------------------------------
+#
+# Gramps modules
+#
+# -------------------------------------------------------------------------
+from gramps.gen.db import DbTxn
+from gramps.plugins.db.dbapi.sqlite import PROFILES
+
+# -------------------------------------------------------------------------
+#
+# Local modules
+#
+# -------------------------------------------------------------------------
+from scaled_tree import ITER_FUNCS, load_example, new_database, populate, timed
+
+
+def edit_people(db, count):
+    """
+    Commit count people, one transaction each, like interactive editing.
+    """
+    for handle in db.get_person_handles()[:count]:
+        person = db.get_person_from_handle(handle)
+        with DbTxn("Edit", db) as trans:
+            db.commit_person(person, trans)
+
+
+def read_all(db):
+    """
+    Read every object in the tree.
+    """
+    for cls, iter_func in ITER_FUNCS:
+        for obj in getattr(db, iter_func)():
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--copies", type=int, default=20, help="number of copies of the example"
+    )
+    parser.add_argument(
+        "--edits", type=int, default=500, help="number of single-object edits"
+    )
+    args = parser.parse_args()
+
+    example = load_example()
+    print(
+        "%-12s %-12s %10s %10s %10s"
+        % ("profile", "batch", "import s", "edits s", "read s")
+    )
+    for profile in PROFILES:
+        for batch_profile in (None, "batch"):
+            with tempfile.TemporaryDirectory() as directory:
+                db = new_database(directory)
+                db.set_connection_profile(profile)
+                db.batch_profile = batch_profile
+                load = timed(populate, db, example, args.copies)
+                edits = timed(edit_people, db, args.edits)
+                read = timed(read_all, db)
+                db.close(update=False)
+            print(
+                "%-12s %-12s %10.2f %10.2f %10.2f"
+                % (profile, batch_profile, load, edits, read)
+            )
+
+
+if __name__ == "__main__":
+    main()
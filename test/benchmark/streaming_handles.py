@@ -0,0 +1,132 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Measure the peak memory and the time to the first handle when iterating
+over the handles of a synthetic tree with a large number of events.
+
+Every measurement runs in a fresh process, as the peak resident set size
+of a process never decreases.
+"""
+
+# -------------------------------------------------------------------------
+#
+# Standard python modules
+#
+# -------------------------------------------------------------------------
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+# -------------------------------------------------------------------------
+#
+# Gramps modules
+#
+# -------------------------------------------------------------------------
+from gramps.gen.db import DbTxn
+from gramps.gen.lib import Event, EventType
+from gramps.gen.utils.id import create_id
+
+# -------------------------------------------------------------------------
+#
+# Local modules
+#
+# -------------------------------------------------------------------------
+from scaled_tree import new_database
+
+
+def fetchall_handles(db):
+    """
+    Iterate over the event handles the way the DBAPI iterators used to:
+    fetch every row, then yield.
+    """
+    db.dbapi.execute("SELECT handle FROM event")
+    rows = db.dbapi.fetchall()
+    for row in rows:
+        yield row[0]
+
+
+MODES = {
+    "fetchall": fetchall_handles,
+    "iter_event_handles": lambda db: db.iter_event_handles(),
+    "get_event_handles": lambda db: iter(db.get_event_handles()),
+}
+
+
+def make_events(count):
+    """
+    Yield count minimal events.
+    """
+    for index in range(count):
+        event = Event()
+        event.set_handle(create_id())
+        event.set_gramps_id("E%07d" % index)
+        event.set_type(EventType.BIRTH)
+        yield event
+
+
+def measure(directory, mode):
+    """
+    Iterate over the handles and print the peak RSS increase in MiB and the
+    seconds to the first handle and to the last.
+    """
+    db = new_database(directory)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    first = None
+    for handle in MODES[mode](db):
+        if first is None:
+            first = time.perf_counter() - start
+    total = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    db.close(update=False)
+    print("%.1f %.3f %.2f" % ((peak - baseline) / 1024, first, total))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=2000000, help="number of events")
+    parser.add_argument("--measure", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(*args.measure)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = new_database(directory)
+        with DbTxn("Benchmark", db, batch=True) as trans:
+            db.commit_many(make_events(args.events), trans)
+        db.close(update=False)
+        print("%-20s %12s %12s %10s" % ("mode", "peak MiB", "first s", "total s"))
+        for mode in MODES:
+            output = subprocess.check_output(
+                [sys.executable, __file__, "--measure", directory, mode],
+                universal_newlines=True,
+            )
+            peak, first, total = output.split()
+            print("%-20s %12s %12s %10s" % (mode, peak, first, total))
+
+
+if __name__ == "__main__":
+    main()